@@ -9,7 +9,12 @@ Usage:
         python <module_name>.py
 """
 
-from poultry_manager import create_app
+from dotenv import load_dotenv
+
+# Load environment variables from a .env file before the configuration is read
+load_dotenv()
+
+from poultry_manager import create_app  # noqa: E402
 
 # Create an instance of the Flask application
 app = create_app()
@@ -0,0 +1,94 @@
+"""
+Login Throughput Benchmark
+
+Simulates a shift-change login storm: `--clients` threads each log in `--logins` times through
+the JSON session endpoint, once per hashing configuration, and reports throughput, latency
+percentiles and the number of fast 503 rejections.
+
+Each configuration is `rounds:workers:max_pending`; `workers=0` hashes inline in the request
+thread, which is how logins were handled before the hashing pool.
+
+Usage:
+    SECRET_KEY=x python benchmarks/login_throughput.py --clients 16 --logins 4 12:0:0 12:2:8 10:2:8
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values, fraction):
+    """Return the value below which `fraction` of the sorted values fall."""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def run(app, clients, logins):
+    """Run the login storm and return (elapsed seconds, latencies of successful logins, rejected count)."""
+    latencies, rejected = [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients)
+
+    def client_loop():
+        client = app.test_client()
+        barrier.wait()
+        for _ in range(logins):
+            started = time.perf_counter()
+            response = client.post('/api/v1/session', json={'username': 'bench', 'password': 'password'})
+            elapsed = time.perf_counter() - started
+            with lock:
+                (latencies if response.status_code == 200 else rejected).append(elapsed)
+
+    threads = [threading.Thread(target=client_loop) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, latencies, len(rejected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('configs', nargs='*', default=['12:0:0', '12:2:8', '10:2:8'],
+                        help='rounds:workers:max_pending configurations to compare')
+    parser.add_argument('--clients', type=int, default=16, help='concurrent clients')
+    parser.add_argument('--logins', type=int, default=4, help='logins per client')
+    args = parser.parse_args()
+
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    os.environ['TIME_SOURCE'] = 'local'
+    database = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    os.environ['DATABASE_URL'] = f'sqlite:///{database.name}'
+
+    from poultry_manager import create_app, db
+    from poultry_manager.models.user import User
+    from poultry_manager.services.hashing import password_hasher
+
+    app = create_app()
+    print(f"{'config':>10} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'503s':>5}")
+    try:
+        for config in args.configs:
+            rounds, workers, max_pending = (int(part) for part in config.split(':'))
+            password_hasher.configure(rounds=rounds, workers=workers, max_pending=max_pending or 1, timeout=30)
+            with app.app_context():
+                db.drop_all()
+                db.create_all()
+                db.session.add(User(username='bench', email='bench@example.com', password='password'))
+                db.session.commit()
+
+            elapsed, latencies, rejected = run(app, args.clients, args.logins)
+            print(f"{config:>10} {len(latencies) / elapsed:9.1f} {statistics.median(latencies or [0]) * 1000:8.0f} "
+                  f"{percentile(latencies, 0.95) * 1000:8.0f} {percentile(latencies, 0.99) * 1000:8.0f} {rejected:5d}")
+    finally:
+        os.unlink(database.name)
+
+
+if __name__ == '__main__':
+    main()
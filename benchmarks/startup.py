@@ -0,0 +1,103 @@
+"""
+Application Startup Benchmark
+
+Measures how long a fresh process takes to import `poultry_manager` and build the application,
+which is what every gunicorn master, `flask` CLI command and test run pays before doing any work.
+
+Each run starts a new interpreter with `python -X importtime`, creates the application with the
+given configuration and reports the wall time of the import and of the first and second
+`create_app()` calls, then the modules with the largest cumulative import time (taken from the
+median run; `-X importtime` itself inflates every figure somewhat). Only modules at most
+`--depth` levels deep are listed, so the report names the packages worth deferring rather than
+their internals.
+
+Usage:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 10 --top 25 --config production
+    python benchmarks/startup.py --json startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from poultry_manager import create_app
+imported = time.perf_counter()
+create_app(sys.argv[1])
+created = time.perf_counter()
+create_app(sys.argv[1])
+again = time.perf_counter()
+print(json.dumps({'import_ms': (imported - started) * 1000, 'create_app_ms': (created - imported) * 1000,
+                  'create_app_again_ms': (again - created) * 1000}))
+"""
+
+
+def parse_importtime(output):
+    """
+        Parse `-X importtime` output into (cumulative microseconds, depth, module) tuples.
+
+        Args:
+            output (str): The interpreter's standard error.
+
+        Returns:
+            list: One tuple per imported module, in import order.
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((int(cumulative), depth, name.strip()))
+    return modules
+
+
+def run_once(config):
+    """Start a fresh interpreter and return (timings dict, parsed import times)."""
+    env = dict(os.environ)
+    env.setdefault('SECRET_KEY', 'benchmark')
+    env.setdefault('DATABASE_URL', 'sqlite://')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE, config], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]), parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to start')
+    parser.add_argument('--top', type=int, default=15, help='modules to list')
+    parser.add_argument('--depth', type=int, default=2, help='deepest import nesting to list')
+    parser.add_argument('--config', default='testing', help="configuration name passed to create_app()")
+    parser.add_argument('--json', dest='json_path', help='write the results to this file')
+    args = parser.parse_args()
+
+    runs = [run_once(args.config) for _ in range(args.runs)]
+    timings = {key: statistics.median(run[0][key] for run in runs) for key in runs[0][0]}
+    median_run = sorted(runs, key=lambda run: run[0]['import_ms'])[len(runs) // 2]
+    modules = sorted((entry for entry in median_run[1] if entry[1] <= args.depth), reverse=True)[:args.top]
+
+    print(f"config={args.config} runs={args.runs} (medians)")
+    for key, value in timings.items():
+        print(f"{key:<22} {value:8.1f}")
+    print()
+    print(f"{'cumulative ms':>13}  module")
+    for cumulative, depth, name in modules:
+        print(f"{cumulative / 1000:13.1f}  {'  ' * depth}{name}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as handle:
+            json.dump({'config': args.config, 'timings': timings,
+                       'modules': [{'module': name, 'cumulative_ms': cumulative / 1000}
+                                   for cumulative, _, name in modules]}, handle, indent=2)
+
+
+if __name__ == '__main__':
+    main()
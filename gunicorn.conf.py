@@ -0,0 +1,88 @@
+"""
+Gunicorn Production Profile
+
+Gunicorn loads this file automatically from the working directory (the `Procfile` also names it
+explicitly). Every setting can be overridden from the environment:
+
+    GUNICORN_WORKER_CLASS   'gthread' (default), 'sync' or 'gevent'
+    GUNICORN_WORKERS        worker processes; default depends on the worker class (see below)
+    GUNICORN_THREADS        request threads per gthread worker (default 4)
+    GUNICORN_CONNECTIONS    concurrent requests per gevent worker (default 100)
+    GUNICORN_TIMEOUT        seconds before a silent worker is killed and replaced (default 30)
+    GUNICORN_MAX_REQUESTS   requests before a worker is recycled, with jitter (default 1000)
+    PORT                    port to bind (default 8000)
+
+Defaults, as measured with `benchmarks/gunicorn_profile.py`: FowlTrak requests spend most of
+their time waiting on the database, and password hashing runs on its own thread pool, so a few
+processes with several threads each (`gthread`, one worker per CPU plus one) serve the most
+requests per second for the memory used; `sync` needs `2 * CPUs + 1` processes to overlap the
+same waits, and `gevent` (`pip install gevent psycogreen`) suits many slow, mostly idle clients.
+
+The application is preloaded in the master so routes, models and templates are imported once
+and shared copy-on-write; each worker then disposes the connection pool it inherited, because
+database sockets must never be shared across processes. The connection pool is sized from
+`GUNICORN_THREADS` (see `poultry_manager/services/db_pool.py`), which this file exports before
+the application is loaded.
+"""
+
+import glob
+import multiprocessing
+import os
+
+cpu_count = multiprocessing.cpu_count()
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class == 'gthread':
+    threads = int(os.getenv('GUNICORN_THREADS', '4'))
+    default_workers = cpu_count + 1
+elif worker_class == 'gevent':
+    threads = 1
+    worker_connections = int(os.getenv('GUNICORN_CONNECTIONS', '100'))
+    default_workers = cpu_count
+else:
+    threads = 1
+    default_workers = 2 * cpu_count + 1
+workers = int(os.getenv('GUNICORN_WORKERS', str(default_workers)))
+
+# The application sizes its connection pool from the request concurrency of one worker
+os.environ['GUNICORN_THREADS'] = str(threads)
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+preload_app = True
+
+# Kill workers stuck for longer than a request may take, and let them finish in-flight requests on reload
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers periodically to bound memory growth; the jitter keeps them from restarting together
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = max_requests // 10
+
+errorlog = '-'
+accesslog = os.getenv('GUNICORN_ACCESS_LOG')
+
+
+def on_starting(server):
+    """Forget the metrics of a previous run; workers report into METRICS_DIR (see services/metrics.py)."""
+    directory = os.getenv('METRICS_DIR')
+    if directory:
+        for path in glob.glob(os.path.join(directory, '*.json')):
+            os.remove(path)
+
+
+def post_fork(server, worker):
+    """Give the worker its own database connections instead of the ones inherited from the master."""
+    if worker_class == 'gevent':
+        try:
+            from psycogreen.gevent import patch_psycopg
+        except ImportError:
+            server.log.warning('psycogreen is not installed; database calls will block the gevent worker')
+        else:
+            patch_psycopg()
+
+    from poultry_manager import db
+    app = server.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,67 @@
+"""Daily rollup tables
+
+Revision ID: 3c1f9a7d2b10
+Revises: afa432de2663
+Create Date: 2026-10-18 09:12:41.503118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f9a7d2b10'
+down_revision = 'afa432de2663'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('rollup_daily_production',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('records', sa.Integer(), nullable=False),
+    sa.Column('eggs_collected', sa.Integer(), nullable=False),
+    sa.Column('eggs_sold', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table('rollup_daily_flock_stock',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('breed', sa.String(length=50), nullable=False),
+    sa.Column('records', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('deaths', sa.Integer(), nullable=False),
+    sa.Column('sold', sa.Integer(), nullable=False),
+    sa.Column('live_birds', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'breed')
+    )
+    op.create_table('rollup_daily_symptom_cases',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('symptom', sa.String(length=200), nullable=False),
+    sa.Column('records', sa.Integer(), nullable=False),
+    sa.Column('birds_sick', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'symptom')
+    )
+
+    # Backfill from the existing records (equivalent to `flask rollups rebuild`)
+    op.execute(
+        "INSERT INTO rollup_daily_production (day, records, eggs_collected, eggs_sold) "
+        "SELECT date(date_collected), count(id), sum(number_eggs_collected), sum(coalesce(eggs_sold, 0)) "
+        "FROM production GROUP BY date(date_collected)"
+    )
+    op.execute(
+        "INSERT INTO rollup_daily_flock_stock (day, breed, records, quantity, deaths, sold, live_birds) "
+        "SELECT date(entry_date), breed, count(id), sum(quantity), sum(coalesce(deaths, 0)), "
+        "sum(coalesce(sold, 0)), sum(quantity - coalesce(deaths, 0) - coalesce(sold, 0)) "
+        "FROM flocks GROUP BY date(entry_date), breed"
+    )
+    op.execute(
+        "INSERT INTO rollup_daily_symptom_cases (day, symptom, records, birds_sick) "
+        "SELECT date(date_reported), symptom, count(id), sum(coalesce(number_sick, 0)) "
+        "FROM health_records GROUP BY date(date_reported), symptom"
+    )
+
+
+def downgrade():
+    op.drop_table('rollup_daily_symptom_cases')
+    op.drop_table('rollup_daily_flock_stock')
+    op.drop_table('rollup_daily_production')
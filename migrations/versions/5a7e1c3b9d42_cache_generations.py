@@ -0,0 +1,28 @@
+"""Per-model write generations for the response cache
+
+Revision ID: 5a7e1c3b9d42
+Revises: 8e4b2d6c9f31
+Create Date: 2026-10-18 11:26:53.410972
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a7e1c3b9d42'
+down_revision = '8e4b2d6c9f31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cache_generations',
+    sa.Column('model', sa.String(length=50), nullable=False),
+    sa.Column('generation', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('model')
+    )
+
+
+def downgrade():
+    op.drop_table('cache_generations')
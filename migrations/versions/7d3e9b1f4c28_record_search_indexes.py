@@ -0,0 +1,64 @@
+"""Full-text search indexes for health records, flocks and inventory
+
+Revision ID: 7d3e9b1f4c28
+Revises: 5a7e1c3b9d42
+Create Date: 2026-10-18 14:02:37.118406
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7d3e9b1f4c28'
+down_revision = '5a7e1c3b9d42'
+branch_labels = None
+depends_on = None
+
+# Source table -> searched columns, as in poultry_manager/services/search.py at this revision
+SOURCES = {
+    'health_records': ('symptom', 'medication_given'),
+    'flocks': ('breed',),
+    'inventory': ('item_name', 'purchase_order_number'),
+}
+
+
+def sqlite_statements(source, columns):
+    fts = f'{source}_search'
+    names = ', '.join(columns)
+    new = ', '.join(f'new.{name}' for name in columns)
+    old = ', '.join(f'old.{name}' for name in columns)
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='{source}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {fts} (rowid, {names}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {fts} ({fts}, rowid, {names}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER {fts}_update AFTER UPDATE OF {names} ON {source} BEGIN "
+        f"INSERT INTO {fts} ({fts}, rowid, {names}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts} (rowid, {names}) VALUES (new.id, {new}); END",
+        # Index the rows written before this migration
+        f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')",
+    ]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for source, columns in SOURCES.items():
+        if dialect == 'postgresql':
+            text = " || ' ' || ".join(f"coalesce({name}, '')" for name in columns)
+            op.execute(f"CREATE INDEX ix_{source}_search ON {source} USING gin (to_tsvector('simple', {text}))")
+        elif dialect == 'sqlite':
+            for statement in sqlite_statements(source, columns):
+                op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    for source in SOURCES:
+        if dialect == 'postgresql':
+            op.execute(f'DROP INDEX IF EXISTS ix_{source}_search')
+        elif dialect == 'sqlite':
+            for suffix in ('insert', 'delete', 'update'):
+                op.execute(f'DROP TRIGGER IF EXISTS {source}_search_{suffix}')
+            op.execute(f'DROP TABLE IF EXISTS {source}_search')
@@ -0,0 +1,43 @@
+"""Composite indexes for date- and user-scoped listings
+
+Revision ID: 8e4b2d6c9f31
+Revises: 3c1f9a7d2b10
+Create Date: 2026-10-18 10:41:07.218334
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4b2d6c9f31'
+down_revision = '3c1f9a7d2b10'
+branch_labels = None
+depends_on = None
+
+
+# (table, index name, columns) in creation order
+INDEXES = [
+    ('production', 'ix_production_date_collected_id', ['date_collected', 'id']),
+    ('production', 'ix_production_user_id_date_collected_id', ['user_id', 'date_collected', 'id']),
+    ('flocks', 'ix_flocks_entry_date_id', ['entry_date', 'id']),
+    ('flocks', 'ix_flocks_user_id_entry_date_id', ['user_id', 'entry_date', 'id']),
+    ('flocks', 'ix_flocks_breed_entry_date_id', ['breed', 'entry_date', 'id']),
+    ('health_records', 'ix_health_records_date_reported_id', ['date_reported', 'id']),
+    ('health_records', 'ix_health_records_user_id_date_reported_id', ['user_id', 'date_reported', 'id']),
+    ('health_records', 'ix_health_records_symptom_date_reported_id', ['symptom', 'date_reported', 'id']),
+    ('inventory', 'ix_inventory_purchase_date_id', ['purchase_date', 'id']),
+    ('inventory', 'ix_inventory_user_id_purchase_date_id', ['user_id', 'purchase_date', 'id']),
+    ('inventory', 'ix_inventory_category_purchase_date_id', ['category', 'purchase_date', 'id']),
+]
+
+
+def upgrade():
+    for table, name, columns in INDEXES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(name, columns, unique=False)
+
+
+def downgrade():
+    for table, name, columns in reversed(INDEXES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(name)
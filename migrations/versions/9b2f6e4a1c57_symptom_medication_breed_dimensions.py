@@ -0,0 +1,194 @@
+"""Symptom, medication and breed dimension tables keyed by integer IDs
+
+Revision ID: 9b2f6e4a1c57
+Revises: 7d3e9b1f4c28
+Create Date: 2026-10-18 15:47:09.362851
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# The backfilled keys must be the ones the application computes for new records
+from poultry_manager.services.dimensions import canonical_key, display_name
+
+
+# revision identifiers, used by Alembic.
+revision = '9b2f6e4a1c57'
+down_revision = '7d3e9b1f4c28'
+branch_labels = None
+depends_on = None
+
+# Dimension table -> (record table, text column, foreign key column)
+LINKS = {
+    'symptoms': ('health_records', 'symptom', 'symptom_id'),
+    'medications': ('health_records', 'medication_given', 'medication_id'),
+    'breeds': ('flocks', 'breed', 'breed_id'),
+}
+
+# Search triggers of migration 7d3e9b1f4c28; SQLite drops them when batch mode rebuilds the table
+SEARCH_COLUMNS = {
+    'health_records': ('symptom', 'medication_given'),
+    'flocks': ('breed',),
+}
+
+
+def search_triggers(source):
+    fts = f'{source}_search'
+    columns = SEARCH_COLUMNS[source]
+    names = ', '.join(columns)
+    new = ', '.join(f'new.{name}' for name in columns)
+    old = ', '.join(f'old.{name}' for name in columns)
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {fts} (rowid, {names}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {fts} ({fts}, rowid, {names}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {names} ON {source} BEGIN "
+        f"INSERT INTO {fts} ({fts}, rowid, {names}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts} (rowid, {names}) VALUES (new.id, {new}); END",
+    ]
+
+
+def restore_search_triggers():
+    if op.get_bind().dialect.name == 'sqlite':
+        for source in SEARCH_COLUMNS:
+            for statement in search_triggers(source):
+                op.execute(statement)
+
+
+def backfill(dimension, source, column, foreign_key):
+    """Create the dimension rows of every distinct value and point the records at them."""
+    connection = op.get_bind()
+    dimension_table = sa.table(dimension, sa.column('id'), sa.column('key'), sa.column('name'),
+                               sa.column('records'))
+    source_table = sa.table(source, sa.column(column), sa.column(foreign_key))
+    values = connection.execute(sa.select(source_table.c[column]).distinct()).scalars().all()
+
+    names = {}
+    for value in values:
+        names.setdefault(canonical_key(value), display_name(value))
+    if names:
+        op.bulk_insert(dimension_table, [{'key': key, 'name': name, 'records': 0} for key, name in names.items()])
+    ids = dict(connection.execute(sa.select(dimension_table.c.key, dimension_table.c.id)).all())
+    if values:
+        connection.execute(
+            source_table.update().where(source_table.c[column] == sa.bindparam('value'))
+            .values({foreign_key: sa.bindparam('dimension_id')}),
+            [{'value': value, 'dimension_id': ids[canonical_key(value)]} for value in values]
+        )
+    op.execute(
+        f"UPDATE {dimension} SET records = "
+        f"(SELECT count(*) FROM {source} WHERE {source}.{foreign_key} = {dimension}.id)"
+    )
+
+
+def upgrade():
+    for dimension in LINKS:
+        op.create_table(dimension,
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=200), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('records', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('key')
+        )
+
+    with op.batch_alter_table('health_records', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('symptom_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('medication_id', sa.Integer(), nullable=True))
+    with op.batch_alter_table('flocks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('breed_id', sa.Integer(), nullable=True))
+
+    for dimension, (source, column, foreign_key) in LINKS.items():
+        backfill(dimension, source, column, foreign_key)
+
+    with op.batch_alter_table('health_records', schema=None) as batch_op:
+        batch_op.alter_column('symptom_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('medication_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_health_records_symptom_id_symptoms', 'symptoms', ['symptom_id'], ['id'])
+        batch_op.create_foreign_key('fk_health_records_medication_id_medications', 'medications',
+                                    ['medication_id'], ['id'])
+    with op.batch_alter_table('flocks', schema=None) as batch_op:
+        batch_op.alter_column('breed_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_flocks_breed_id_breeds', 'breeds', ['breed_id'], ['id'])
+    restore_search_triggers()
+
+    # Re-key the rollups by dimension ID (equivalent to `flask rollups rebuild` for these tables)
+    op.drop_table('rollup_daily_symptom_cases')
+    op.drop_table('rollup_daily_flock_stock')
+    op.create_table('rollup_daily_flock_stock',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('breed_id', sa.Integer(), nullable=False),
+    sa.Column('records', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('deaths', sa.Integer(), nullable=False),
+    sa.Column('sold', sa.Integer(), nullable=False),
+    sa.Column('live_birds', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['breed_id'], ['breeds.id'], ),
+    sa.PrimaryKeyConstraint('day', 'breed_id')
+    )
+    op.create_table('rollup_daily_symptom_cases',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('symptom_id', sa.Integer(), nullable=False),
+    sa.Column('records', sa.Integer(), nullable=False),
+    sa.Column('birds_sick', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['symptom_id'], ['symptoms.id'], ),
+    sa.PrimaryKeyConstraint('day', 'symptom_id')
+    )
+    op.execute(
+        "INSERT INTO rollup_daily_flock_stock (day, breed_id, records, quantity, deaths, sold, live_birds) "
+        "SELECT date(entry_date), breed_id, count(id), sum(quantity), sum(coalesce(deaths, 0)), "
+        "sum(coalesce(sold, 0)), sum(quantity - coalesce(deaths, 0) - coalesce(sold, 0)) "
+        "FROM flocks GROUP BY date(entry_date), breed_id"
+    )
+    op.execute(
+        "INSERT INTO rollup_daily_symptom_cases (day, symptom_id, records, birds_sick) "
+        "SELECT date(date_reported), symptom_id, count(id), sum(coalesce(number_sick, 0)) "
+        "FROM health_records GROUP BY date(date_reported), symptom_id"
+    )
+
+
+def downgrade():
+    op.drop_table('rollup_daily_symptom_cases')
+    op.drop_table('rollup_daily_flock_stock')
+    op.create_table('rollup_daily_flock_stock',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('breed', sa.String(length=50), nullable=False),
+    sa.Column('records', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('deaths', sa.Integer(), nullable=False),
+    sa.Column('sold', sa.Integer(), nullable=False),
+    sa.Column('live_birds', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'breed')
+    )
+    op.create_table('rollup_daily_symptom_cases',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('symptom', sa.String(length=200), nullable=False),
+    sa.Column('records', sa.Integer(), nullable=False),
+    sa.Column('birds_sick', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'symptom')
+    )
+    op.execute(
+        "INSERT INTO rollup_daily_flock_stock (day, breed, records, quantity, deaths, sold, live_birds) "
+        "SELECT date(entry_date), breed, count(id), sum(quantity), sum(coalesce(deaths, 0)), "
+        "sum(coalesce(sold, 0)), sum(quantity - coalesce(deaths, 0) - coalesce(sold, 0)) "
+        "FROM flocks GROUP BY date(entry_date), breed"
+    )
+    op.execute(
+        "INSERT INTO rollup_daily_symptom_cases (day, symptom, records, birds_sick) "
+        "SELECT date(date_reported), symptom, count(id), sum(coalesce(number_sick, 0)) "
+        "FROM health_records GROUP BY date(date_reported), symptom"
+    )
+
+    with op.batch_alter_table('flocks', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_flocks_breed_id_breeds', type_='foreignkey')
+        batch_op.drop_column('breed_id')
+    with op.batch_alter_table('health_records', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_health_records_medication_id_medications', type_='foreignkey')
+        batch_op.drop_constraint('fk_health_records_symptom_id_symptoms', type_='foreignkey')
+        batch_op.drop_column('medication_id')
+        batch_op.drop_column('symptom_id')
+    restore_search_triggers()
+
+    for dimension in reversed(list(LINKS)):
+        op.drop_table(dimension)
@@ -0,0 +1,150 @@
+"""Inventory stock ledger with running balances and FIFO lots
+
+Revision ID: e4c81a5d2f63
+Revises: 9b2f6e4a1c57
+Create Date: 2026-10-18 16:32:05.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# The backfilled items must be matched the way the application matches new purchases
+from poultry_manager.services.stock import item_key
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4c81a5d2f63'
+down_revision = '9b2f6e4a1c57'
+branch_labels = None
+depends_on = None
+
+
+def backfill():
+    """Post every existing inventory purchase as a purchase movement with an open lot.
+
+    Like live postings, a movement is dated when its purchase was recorded (`created_at`), so the
+    ledger order is the order the purchases were entered; the purchase date is kept alongside.
+    """
+    connection = op.get_bind()
+    inventory = sa.table('inventory', sa.column('id'), sa.column('item_name'), sa.column('category'),
+                         sa.column('quantity'), sa.column('unit'), sa.column('cost'), sa.column('currency'),
+                         sa.column('purchase_date'), sa.column('created_at'), sa.column('user_id'),
+                         sa.column('created_by_username'))
+    items = sa.table('stock_items', sa.column('id'), sa.column('key'), sa.column('unit'), sa.column('currency'),
+                     sa.column('name'), sa.column('category'), sa.column('unit_label'), sa.column('on_hand'),
+                     sa.column('fifo_value'), sa.column('average_value'), sa.column('last_movement_at'))
+    purchases = connection.execute(
+        sa.select(inventory).order_by(inventory.c.created_at, inventory.c.id)).mappings().all()
+    if not purchases:
+        return
+
+    balances = {}
+    for purchase in purchases:
+        key = item_key(purchase['item_name'], purchase['unit'], purchase['currency'])
+        balance = balances.setdefault(key, {
+            'key': key[0], 'unit': key[1], 'currency': key[2], 'name': ' '.join(purchase['item_name'].split()),
+            'category': purchase['category'], 'unit_label': purchase['unit'].strip(), 'on_hand': 0,
+            'fifo_value': 0.0, 'average_value': 0.0, 'movements': [],
+        })
+        value = round(purchase['quantity'] * purchase['cost'], 6)
+        balance['on_hand'] += purchase['quantity']
+        balance['fifo_value'] = balance['average_value'] = round(balance['fifo_value'] + value, 6)
+        balance['last_movement_at'] = purchase['created_at']
+        balance['movements'].append({
+            'kind': 'purchase', 'quantity': purchase['quantity'], 'unit_cost': purchase['cost'],
+            'fifo_value': value, 'average_value': value, 'on_hand': balance['on_hand'],
+            'fifo_balance': balance['fifo_value'], 'average_balance': balance['average_value'],
+            'occurred_at': purchase['created_at'], 'purchase_date': purchase['purchase_date'],
+            'inventory_id': purchase['id'],
+            'user_id': purchase['user_id'], 'created_by_username': purchase['created_by_username'],
+        })
+
+    movements = sa.table('stock_movements', *(sa.column(name) for name in (
+        'id', 'item_id', 'kind', 'quantity', 'unit_cost', 'fifo_value', 'average_value', 'on_hand', 'fifo_balance',
+        'average_balance', 'occurred_at', 'purchase_date', 'inventory_id', 'user_id', 'created_by_username')))
+    op.bulk_insert(items, [{name: value for name, value in balance.items() if name != 'movements'}
+                           for balance in balances.values()])
+    ids = {tuple(row[:3]): row[3] for row in connection.execute(
+        sa.select(items.c.key, items.c.unit, items.c.currency, items.c.id))}
+    for key, balance in balances.items():
+        for movement in balance['movements']:
+            movement['item_id'] = ids[key]
+        op.bulk_insert(movements, balance['movements'])
+    # Nothing was issued yet, so every purchase is still a whole open lot
+    op.execute(
+        "INSERT INTO stock_lots (item_id, movement_id, unit_cost, remaining) "
+        "SELECT item_id, id, unit_cost, quantity FROM stock_movements ORDER BY item_id, id"
+    )
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('stock_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(length=200), nullable=False),
+    sa.Column('unit', sa.String(length=200), nullable=False),
+    sa.Column('currency', sa.String(length=10), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('unit_label', sa.String(length=50), nullable=False),
+    sa.Column('on_hand', sa.Integer(), nullable=False),
+    sa.Column('fifo_value', sa.Float(), nullable=False),
+    sa.Column('average_value', sa.Float(), nullable=False),
+    sa.Column('last_movement_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('key', 'unit', 'currency', name='unique_stock_item')
+    )
+    op.create_table('stock_movements',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_cost', sa.Float(), nullable=False),
+    sa.Column('fifo_value', sa.Float(), nullable=False),
+    sa.Column('average_value', sa.Float(), nullable=False),
+    sa.Column('on_hand', sa.Integer(), nullable=False),
+    sa.Column('fifo_balance', sa.Float(), nullable=False),
+    sa.Column('average_balance', sa.Float(), nullable=False),
+    sa.Column('occurred_at', sa.DateTime(), nullable=False),
+    sa.Column('purchase_date', sa.DateTime(), nullable=True),
+    sa.Column('note', sa.String(length=200), nullable=True),
+    sa.Column('inventory_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('created_by_username', sa.String(length=100), nullable=True),
+    sa.ForeignKeyConstraint(['inventory_id'], ['inventory.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['item_id'], ['stock_items.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('stock_movements', schema=None) as batch_op:
+        batch_op.create_index('ix_stock_movements_item_id_occurred_at_id', ['item_id', 'occurred_at', 'id'], unique=False)
+
+    op.create_table('stock_lots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('movement_id', sa.Integer(), nullable=False),
+    sa.Column('unit_cost', sa.Float(), nullable=False),
+    sa.Column('remaining', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['item_id'], ['stock_items.id'], ),
+    sa.ForeignKeyConstraint(['movement_id'], ['stock_movements.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('stock_lots', schema=None) as batch_op:
+        batch_op.create_index('ix_stock_lots_item_id_id', ['item_id', 'id'], unique=False)
+
+    # ### end Alembic commands ###
+    backfill()
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('stock_lots', schema=None) as batch_op:
+        batch_op.drop_index('ix_stock_lots_item_id_id')
+
+    op.drop_table('stock_lots')
+    with op.batch_alter_table('stock_movements', schema=None) as batch_op:
+        batch_op.drop_index('ix_stock_movements_item_id_occurred_at_id')
+
+    op.drop_table('stock_movements')
+    op.drop_table('stock_items')
+    # ### end Alembic commands ###
@@ -4,38 +4,81 @@ This module initializes and configures the FowlTrak application.
 It sets up the Flask app, configures extensions like SQLAlchemy for database interaction,
 Flask-Migrate for handling database migrations, Flask-Bcrypt for password hashing,
 and Flask-Login for user session management.
+
+Flask-Migrate imports Alembic, which costs more than the rest of the application together,
+so it is only wired up when the app is created by the `flask` command (`flask db ...`).
+Run `python benchmarks/startup.py` for an import-time report of `create_app`.
 """
 
+import os
+
+import click
 from flask import Flask
-from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
-from .config import Config
+from .config import CONFIGS
+from .live_time import NetworkTime
 from flask_login import LoginManager
 
 # Instantiate the extensions without binding them to the app yet
 db = SQLAlchemy()
-migrate = Migrate()
 bcrypt = Bcrypt()
 login_manager = LoginManager()
 
 
-def create_app():
+def init_migrations(app):
+    """
+    Register Flask-Migrate for the `flask db` commands.
+
+    Args:
+        app (Flask): The application.
+    """
+    from flask_migrate import Migrate
+    Migrate(app, db)
+
+
+def create_app(config_name=None):
     """
     Create and configure the Flask application for FowlTrak.
 
     This function sets up the application configuration, initializes Flask extensions,
     imports routes and models, and registers blueprints.
 
+    Args:
+        config_name (str): 'development', 'testing' or 'production'; defaults to `FLASK_ENV`.
+
     Returns:
         app (Flask): Configured Flask application instance.
     """
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(CONFIGS[config_name or os.getenv('FLASK_ENV', 'production')])
+    if not app.config['SECRET_KEY']:
+        raise RuntimeError("SECRET_KEY environment variable not set")
+
+    # Configure the time source used for record timestamps (no network access here)
+    NetworkTime.configure(
+        source=app.config['TIME_SOURCE'],
+        server=app.config['NTP_SERVER'],
+        refresh_interval=app.config['NTP_REFRESH_SECONDS']
+    )
+
+    # Size and health-check the connection pool from the DB_* settings
+    from poultry_manager.services.db_pool import engine_options, apply_transaction_settings, pool_metrics
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
 
     # Initialize the extensions with the app
     db.init_app(app)
-    migrate.init_app(app, db)
+    with app.app_context():
+        pool_metrics.instrument(db.engine)
+        apply_transaction_settings(db.engine, app.config)
+    # Migrations are only needed by the flask command; skipping them keeps workers and tests light
+    if click.get_current_context(silent=True) is not None:
+        init_migrations(app)
+
+    # Count and time the SQL statements of every request (Server-Timing header, log line, query budget)
+    from poultry_manager.middleware.query_stats import init_query_stats
+    with app.app_context():
+        init_query_stats(app, db.engine)
     bcrypt.init_app(app)
 
     # Initialize Flask-Login and configure login view and message category
@@ -45,12 +88,59 @@ def create_app():
 
     # Import routes and models
     from . import routes
-    from poultry_manager.models import base_model, user, flock, production, health_record, inventory
+    from poultry_manager.models import (base_model, user, flock, production, health_record, inventory, dimension,
+                                        rollup, cache_generation, stock)
+
+    # Lazy relationship loads raise when STRICT_LOADING is set, so N+1 access patterns fail in tests
+    from poultry_manager.services import loading
+
+    # Cache the identity loaded by Flask-Login for every authenticated request
+    user.user_cache.configure(ttl=app.config['USER_CACHE_TTL'], maxsize=app.config['USER_CACHE_SIZE'])
+
+    # Hash passwords on a bounded pool so login storms get a fast 503 instead of a pile-up
+    from poultry_manager.services.hashing import password_hasher
+    password_hasher.configure(
+        rounds=app.config['BCRYPT_LOG_ROUNDS'],
+        workers=app.config['HASH_POOL_WORKERS'],
+        max_pending=app.config['HASH_POOL_MAX_PENDING'],
+        timeout=app.config['HASH_POOL_TIMEOUT']
+    )
+
+    # Canonicalize written symptoms, medications and breeds into their dimension tables
+    from poultry_manager.services import dimensions
+
+    # Post inventory purchases to the stock ledger
+    from poultry_manager.services import stock as stock_ledger
+
+    # Keep the daily rollup tables in step with record writes and expose their CLI
+    from poultry_manager.services.rollups import rollups_cli
+    app.cli.add_command(rollups_cli)
+
+    # Cache chart responses, invalidated by the per-model write generations
+    from poultry_manager.services.response_cache import response_cache, load_backend
+    response_cache.configure(
+        backend=load_backend(app.config['RESPONSE_CACHE_BACKEND'], maxsize=app.config['RESPONSE_CACHE_SIZE']),
+        ttl=app.config['RESPONSE_CACHE_TTL']
+    )
+
+    # Request, pool and cache metrics for /metrics, shared between gunicorn workers through METRICS_DIR
+    from poultry_manager.services.metrics import request_metrics
+    request_metrics.configure(directory=app.config['METRICS_DIR'], flush_interval=app.config['METRICS_FLUSH_SECONDS'])
+    request_metrics.init_app(app)
+
+    # Bulk record import command (flask import-records)
+    from poultry_manager.services.bulk_import import import_command
+    app.cli.add_command(import_command)
 
     # Register blueprints after initializing extensions and models
     from .routes import bp
     app.register_blueprint(bp)
 
+    # JSON API for field clients; unauthenticated API calls get a 401 instead of a login redirect
+    from .api import api_bp
+    app.register_blueprint(api_bp)
+    login_manager.blueprint_login_views[api_bp.name] = None
+
     # Disable strict slashes for URL routing (e.g., /route and /route/ are treated the same)
     app.url_map.strict_slashes = False
 
@@ -0,0 +1,354 @@
+"""
+Versioned JSON API (v1)
+
+This module defines the `api_v1` blueprint, a JSON API over the inventory, production,
+flock and health record models for field clients that sync many records at once.
+
+Every collection accepts a single object or a batch (`{"items": [...]}`) on create and
+update, and a list of ids on delete; a batch is validated with the same WTForms classes as
+the HTML forms and applied in one transaction, so it either succeeds completely or changes
+nothing. Reads are keyset paginated and carry an ETag so unchanged data is answered with
+`304 Not Modified`.
+
+Routes (all under `/api/v1`):
+    POST   /session                  log in with `{"username", "password"}`
+    GET    /<model>                  list (`from`, `to`, `worker`, `category`, `per_page`, `after`)
+    GET    /<model>/<id>             read one record
+    POST   /<model>                  create one record or a batch
+    PATCH  /<model>                  update a batch of `{"id": ..., <fields>}` items
+    PATCH  /<model>/<id>             update one record
+    DELETE /<model>                  delete `{"ids": [...]}`
+    DELETE /<model>/<id>             delete one record
+"""
+
+from datetime import date, datetime
+
+from flask import Blueprint, jsonify, request, abort
+from flask_login import login_user, login_required, current_user
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from werkzeug.exceptions import HTTPException
+
+from poultry_manager import db
+from poultry_manager.models.user import User, user_cache
+from poultry_manager.middleware.access_control import admin_required, admin_or_worker_required
+from poultry_manager.services.bulk_import import IMPORTERS, RecordImporter
+from poultry_manager.services.listing import LISTINGS, ListingFilters
+from poultry_manager.services.records import RECORD_TYPES
+from poultry_manager.services.stock import InsufficientStock
+
+api_bp = Blueprint('api_v1', __name__, url_prefix='/api/v1')
+
+MAX_BATCH_SIZE = 500
+
+
+@api_bp.errorhandler(HTTPException)
+def json_error(error):
+    """
+        Return HTTP errors raised by the API as JSON instead of HTML pages.
+
+        Args:
+            error (HTTPException): The raised error.
+
+        Returns:
+            JSON body `{"error": description}` with the error's status code and headers (e.g. `Retry-After`).
+    """
+    headers = [(name, value) for name, value in error.get_headers() if name != 'Content-Type']
+    return jsonify({'error': error.description}), error.code, headers
+
+
+def serialize(record):
+    """
+        Convert a record into a JSON-compatible dict of its columns.
+
+        Args:
+            record (BaseModel): The record to serialize.
+
+        Returns:
+            dict: Column name to value, with dates in ISO 8601 format.
+    """
+    data = {}
+    for column in record.__table__.columns:
+        value = getattr(record, column.key)
+        data[column.key] = value.isoformat() if isinstance(value, (date, datetime)) else value
+    return data
+
+
+def conditional(payload):
+    """
+        Build a JSON response with an ETag, answering `If-None-Match` hits with 304.
+
+        Args:
+            payload (dict): The response body.
+
+        Returns:
+            Response: The JSON response, or an empty 304 if the client's copy is current.
+    """
+    response = jsonify(payload)
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def get_model(model):
+    """Return the model class for a slug, aborting with 404 for unknown slugs."""
+    if model not in IMPORTERS:
+        abort(404, description=f"Unknown model: {model}")
+    return IMPORTERS[model][0]
+
+
+def batch_items(payload, key='items'):
+    """
+        Extract the batch from a request body.
+
+        Args:
+            payload (dict): The decoded JSON body.
+            key (str): The key holding the batch when several records are sent.
+
+        Returns:
+            tuple: `(items, is_batch)`; a single object is returned as a one-item batch.
+    """
+    if not isinstance(payload, dict):
+        abort(400, description='Expected a JSON object')
+    if key not in payload:
+        return [payload], False
+    items = payload[key]
+    if not isinstance(items, list) or not items:
+        abort(400, description=f"'{key}' must be a non-empty list")
+    if len(items) > MAX_BATCH_SIZE:
+        abort(400, description=f"At most {MAX_BATCH_SIZE} items per request")
+    return items, True
+
+
+def form_values(record, fields):
+    """Return a record's current values in the raw format the importer accepts (ISO dates keep their time)."""
+    values = {}
+    for name in fields:
+        value = getattr(record, name)
+        values[name] = value.isoformat() if isinstance(value, (date, datetime)) else value
+    return values
+
+
+def reject(errors):
+    """Abort a batch with its per-item errors; nothing has been committed."""
+    db.session.rollback()
+    response = jsonify({'error': 'Validation failed', 'errors': errors})
+    response.status_code = 422
+    abort(response)
+
+
+def duplicate_errors(validator, items):
+    """
+        Return per-item errors for validated items repeating a unique key of the batch or the table.
+
+        Args:
+            validator (RecordImporter): The importer the items were validated with.
+            items (list): `(index, values)` pairs of validated items.
+
+        Returns:
+            list: `{"index": ..., "errors": ...}` items, in batch order.
+    """
+    return [{'index': index, 'errors': {'__all__': [message]}}
+            for index, message in validator.duplicates(items).items()]
+
+
+@api_bp.route('/session', methods=['POST'])
+def create_session():
+    """
+        Log in with a JSON body of `username` and `password` (and optional `remember`).
+
+        Returns:
+            JSON description of the logged-in user, or 401 if the credentials are wrong.
+    """
+    payload = request.get_json(silent=True) or {}
+    user = User.query.filter_by(username=payload.get('username')).first()
+    if not user or not user.check_password(payload.get('password') or ''):
+        abort(401, description='Invalid username or password')
+    if user.rehash_password(payload['password']):
+        db.session.commit()
+        user_cache.invalidate(user.id)
+    login_user(user, remember=bool(payload.get('remember')))
+    return jsonify({'id': user.id, 'username': user.username, 'role': user.role.value})
+
+
+@api_bp.route('/<model>', methods=['GET'])
+@login_required
+@admin_required
+def list_records(model):
+    """
+        List one page of records, newest first.
+
+        Args:
+            model (str): The type of record to list (e.g., 'inventory', 'production').
+
+        Returns:
+            JSON `{"items": [...], "next": cursor}` with an ETag.
+    """
+    get_model(model)
+    page = LISTINGS[model].paginate(ListingFilters.from_args(request.args), after=request.args.get('after'),
+                                    full_rows=True)
+    return conditional({'items': [serialize(record) for record in page.items], 'next': page.next_cursor})
+
+
+@api_bp.route('/<model>/<int:record_id>', methods=['GET'])
+@login_required
+@admin_required
+def get_record(model, record_id):
+    """
+        Read one record.
+
+        Args:
+            model (str): The type of record.
+            record_id (int): The ID of the record.
+
+        Returns:
+            JSON record with an ETag, or 404 if it does not exist.
+    """
+    record = db.get_or_404(get_model(model), record_id)
+    return conditional(serialize(record))
+
+
+@api_bp.route('/<model>', methods=['POST'])
+@login_required
+@admin_or_worker_required
+def create_records(model):
+    """
+        Create one record or a batch of records in a single transaction.
+
+        Args:
+            model (str): The type of record to create.
+
+        Returns:
+            201 with the created record (or `{"items": [...]}` for a batch), or 422 with per-item errors
+            (including items repeating a unique key, e.g. an inventory item name and purchase date).
+    """
+    model_class = get_model(model)
+    items, is_batch = batch_items(request.get_json(silent=True))
+    validator = RecordImporter(model, user=current_user)
+
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        values, item_errors = validator.validate(item)
+        if item_errors:
+            errors.append({'index': index, 'errors': item_errors})
+        else:
+            valid.append((index, values))
+    errors.extend(duplicate_errors(validator, valid))
+    if errors:
+        reject(sorted(errors, key=lambda error: error['index']))
+
+    records = [model_class(**values) for _, values in valid]
+    db.session.add_all(records)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another request inserted the same unique key after the check; find the items it now collides with
+        db.session.rollback()
+        reject(duplicate_errors(validator, valid)
+               or [{'index': index, 'errors': {'__all__': ['Record conflicts with an existing record']}}
+                   for index, _ in valid])
+    created = [serialize(record) for record in records]
+    return jsonify({'items': created} if is_batch else created[0]), 201
+
+
+@api_bp.route('/<model>', methods=['PATCH'])
+@api_bp.route('/<model>/<int:record_id>', methods=['PATCH'])
+@login_required
+@admin_required
+def update_records(model, record_id=None):
+    """
+        Partially update one record or a batch of `{"id": ..., <fields>}` items in a single transaction.
+
+        Args:
+            model (str): The type of record to update.
+            record_id (int): The ID of the record when updating a single record.
+
+        Returns:
+            The updated record (or `{"items": [...]}` for a batch), 404 for unknown ids, 422 with per-item errors
+            or 409 if an inventory edit would remove stock that was already issued.
+    """
+    model_class = get_model(model)
+    payload = request.get_json(silent=True)
+    if record_id is not None:
+        if not isinstance(payload, dict):
+            abort(400, description='Expected a JSON object')
+        items, is_batch = [dict(payload, id=record_id)], False
+    else:
+        items, is_batch = batch_items(payload)
+
+    # Only integer ids are looked up; anything else (a list, a string, a bool) is reported as not found
+    ids = [item.get('id') if isinstance(item, dict) else None for item in items]
+    ids = [value if isinstance(value, int) and not isinstance(value, bool) else None for value in ids]
+    query = model_class.query.filter(model_class.id.in_([value for value in ids if value is not None]))
+    found = {record.id: record for record in query}
+    validator = RecordImporter(model)
+
+    updated, errors = [], []
+    for index, item in enumerate(items):
+        record = found.get(ids[index])
+        if record is None:
+            errors.append({'index': index, 'errors': {'id': ['Record not found.']}})
+            continue
+        raw = form_values(record, validator.fields)
+        raw.update({key: value for key, value in item.items() if key != 'id'})
+        values, item_errors = validator.validate(raw)
+        if item_errors:
+            errors.append({'index': index, 'errors': item_errors})
+            continue
+        for name, value in values.items():
+            setattr(record, name, value)
+        updated.append(record)
+    if errors:
+        if record_id is not None and not found:
+            abort(404, description='Record not found')
+        reject(errors)
+
+    try:
+        db.session.commit()
+    except InsufficientStock as error:
+        db.session.rollback()
+        abort(409, description=str(error))
+    result = [serialize(record) for record in updated]
+    return jsonify({'items': result} if is_batch else result[0])
+
+
+@api_bp.route('/<model>', methods=['DELETE'])
+@api_bp.route('/<model>/<int:record_id>', methods=['DELETE'])
+@login_required
+@admin_required
+def delete_records(model, record_id=None):
+    """
+        Delete one record or the records listed in `{"ids": [...]}` in a single transaction.
+
+        Args:
+            model (str): The type of record to delete.
+            record_id (int): The ID of the record when deleting a single record.
+
+        Returns:
+            JSON `{"deleted": [ids]}`, 404 listing the ids that do not exist, or 409 if deleting a
+            purchase would remove stock that was already issued.
+    """
+    model_class = get_model(model)
+    if record_id is not None:
+        ids = [record_id]
+    else:
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict) or 'ids' not in payload:
+            abort(400, description="Expected a JSON object with 'ids'")
+        ids, _ = batch_items(payload, key='ids')
+        if not all(isinstance(value, int) for value in ids):
+            abort(400, description="'ids' must be a list of integers")
+
+    # One DELETE for the whole list; if some ids do not exist nothing is deleted
+    ids = set(ids)
+    record_type = RECORD_TYPES[model]
+    try:
+        deleted = record_type.delete_where(record_type.selection(ids=list(ids)))
+    except InsufficientStock as error:
+        db.session.rollback()
+        abort(409, description=str(error))
+    if deleted != len(ids):
+        db.session.rollback()
+        existing = {row.id for row in db.session.execute(select(model_class.id).where(model_class.id.in_(ids)))}
+        abort(404, description=f"Records not found: {sorted(ids - existing)}")
+    db.session.commit()
+    return jsonify({'deleted': sorted(ids)})
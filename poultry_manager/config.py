@@ -1,12 +1,14 @@
 """
     Configuration file for FowlTrak
+
+    Settings are read from the environment. The `.env` file is loaded by the entry points
+    (`app.py`, `promote_to_admin.py`, and the `flask` command itself) before the application
+    package is imported, so importing the package in tests or tools has no side effects.
+
+    `create_app(config_name)` picks one of `CONFIGS`; without a name it uses `FLASK_ENV`.
 """
 
 import os
-from dotenv import load_dotenv
-
-# Load environment variables from a .env file
-load_dotenv()
 
 
 class Config:
@@ -17,13 +19,112 @@ class Config:
         SECRET_KEY (str): Secret key used for security purposes such as session management.
         SQLALCHEMY_DATABASE_URI (str): Database connection URI for SQLAlchemy.
         SQLALCHEMY_TRACK_MODIFICATIONS (bool): Flag to disable SQLAlchemy event notifications.
-        FLASK_ENV (str): Defines the environment in which the app runs (development or production).
+        FLASK_ENV (str): Environment the app runs in (development, testing or production); selects the config class.
+        TIME_SOURCE (str): 'ntp' to correct timestamps with a cached NTP offset, 'local' for offline sites.
+        NTP_SERVER (str): NTP server queried in the background when `TIME_SOURCE` is 'ntp'.
+        NTP_REFRESH_SECONDS (int): Seconds between background refreshes of the NTP offset.
+        USER_CACHE_TTL (float): Seconds a loaded user identity is cached per process; 0 disables the cache.
+        USER_CACHE_SIZE (int): Maximum number of user identities cached per process.
+        BCRYPT_LOG_ROUNDS (int): bcrypt cost factor for new password hashes; older hashes are upgraded on login.
+        HASH_POOL_WORKERS (int): Threads per process hashing passwords; 0 hashes in the request thread.
+        HASH_POOL_MAX_PENDING (int): Hashes queued or running per process before new logins get a 503.
+        HASH_POOL_TIMEOUT (float): Seconds a request waits for its hash before giving up with a 503.
+        DB_POOL_SIZE (int): Persistent connections per process; defaults to one per request thread plus a spare.
+        DB_MAX_OVERFLOW (int): Extra connections a process may open above `DB_POOL_SIZE` under bursts.
+        DB_POOL_TIMEOUT (float): Seconds a request waits for a free connection before failing.
+        DB_POOL_RECYCLE (int): Seconds after which a pooled connection is replaced, below server idle timeouts.
+        DB_POOL_PRE_PING (bool): Test connections on checkout so stale ones are replaced transparently.
+        DB_STATEMENT_TIMEOUT_MS (int): Postgres statement timeout in milliseconds; 0 disables it.
+        DB_PGBOUNCER (bool): Behind PgBouncer transaction pooling: no client-side pool, per-transaction settings.
+        RESPONSE_CACHE_BACKEND (str): 'memory' or `package.module:ClassName` of a response cache backend.
+        RESPONSE_CACHE_TTL (float): Seconds a cached chart response is kept; 0 keeps only ETag revalidation.
+        RESPONSE_CACHE_SIZE (int): Maximum number of responses kept by the memory backend.
+        QUERY_STATS_ENABLED (bool): Count and time the SQL statements of every request.
+        QUERY_STATS_HEADER (bool): Report them in a `Server-Timing` response header.
+        QUERY_STATS_SLOWEST (int): Number of slowest statements included in the per-request log line.
+        SLOW_QUERY_MS (float): Statements slower than this many milliseconds are logged as warnings.
+        QUERY_BUDGET (int): Statements a request may issue before a warning; 0 disables the check.
+        QUERY_BUDGET_STRICT (bool): Fail requests over their query budget instead of warning (tests).
+        STRICT_LOADING (bool): Raise on lazy relationship loads instead of issuing per-row queries (tests).
+        METRICS_DIR (str): Directory shared by the gunicorn workers for `/metrics`; unset reports one process.
+        METRICS_FLUSH_SECONDS (float): Minimum seconds between two writes of a worker's metrics file.
+        METRICS_TOKEN (str): Bearer token accepted by `/metrics` for scrapers; admins can always read it.
     """
 
     SECRET_KEY = os.getenv('SECRET_KEY')
-    if not SECRET_KEY:
-        raise RuntimeError("SECRET_KEY environment variable not set")
 
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     FLASK_ENV = os.getenv('FLASK_ENV', 'production')
+
+    TIME_SOURCE = os.getenv('TIME_SOURCE', 'ntp')
+    NTP_SERVER = os.getenv('NTP_SERVER', 'time.windows.com')
+    NTP_REFRESH_SECONDS = int(os.getenv('NTP_REFRESH_SECONDS', '3600'))
+
+    USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', '60'))
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '1024'))
+
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', '12'))
+    HASH_POOL_WORKERS = int(os.getenv('HASH_POOL_WORKERS', '2'))
+    HASH_POOL_MAX_PENDING = int(os.getenv('HASH_POOL_MAX_PENDING', '32'))
+    HASH_POOL_TIMEOUT = float(os.getenv('HASH_POOL_TIMEOUT', '5'))
+
+    # Connection pool settings, turned into SQLALCHEMY_ENGINE_OPTIONS in `create_app`
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', str(int(os.getenv('GUNICORN_THREADS', '1')) + 1)))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '2'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', '1').lower() in ('1', 'true', 'yes')
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '0'))
+    DB_PGBOUNCER = os.getenv('DB_PGBOUNCER', '0').lower() in ('1', 'true', 'yes')
+
+    RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'memory')
+    RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', '300'))
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '512'))
+
+    # Per-request SQL instrumentation (poultry_manager/middleware/query_stats.py)
+    QUERY_STATS_ENABLED = os.getenv('QUERY_STATS_ENABLED', '1').lower() in ('1', 'true', 'yes')
+    QUERY_STATS_HEADER = os.getenv('QUERY_STATS_HEADER', '1').lower() in ('1', 'true', 'yes')
+    QUERY_STATS_SLOWEST = int(os.getenv('QUERY_STATS_SLOWEST', '3'))
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '100'))
+    QUERY_BUDGET = int(os.getenv('QUERY_BUDGET', '20'))
+    QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', '0').lower() in ('1', 'true', 'yes')
+    STRICT_LOADING = os.getenv('STRICT_LOADING', '0').lower() in ('1', 'true', 'yes')
+
+    # Prometheus metrics (poultry_manager/services/metrics.py); empty METRICS_DIR when the server starts
+    METRICS_DIR = os.getenv('METRICS_DIR') or None
+    METRICS_FLUSH_SECONDS = float(os.getenv('METRICS_FLUSH_SECONDS', '1'))
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN') or None
+
+
+class DevelopmentConfig(Config):
+    """Settings for the local development server (`python app.py`)."""
+
+    DEBUG = True
+
+
+class TestingConfig(Config):
+    """
+    Settings for the test suite: an in-memory database, no NTP traffic and cheap password hashes.
+
+    Attributes:
+        SQLALCHEMY_DATABASE_URI (str): `TEST_DATABASE_URL`, or an in-memory SQLite database.
+    """
+
+    TESTING = True
+    SECRET_KEY = os.getenv('SECRET_KEY', 'testing')
+    SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URL', 'sqlite://')
+    TIME_SOURCE = 'local'
+    BCRYPT_LOG_ROUNDS = 4
+
+
+class ProductionConfig(Config):
+    """Settings for gunicorn deployments; every value comes from the environment."""
+
+
+# Configuration classes by environment name (`FLASK_ENV` or the `create_app` argument)
+CONFIGS = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
+}
@@ -1,12 +1,14 @@
 """
 This module defines forms for the FowlTrak application, handling user registration,
 login, account settings, inventory management, production data entry, flock management,
-and health record tracking. These forms use Flask-WTF and WTForms to manage form validation.
+health record tracking, stock movements, bulk record imports and bulk record actions. These forms use Flask-WTF
+and WTForms to manage form validation.
 """
 
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileRequired, FileAllowed
 from wtforms import StringField, PasswordField, SubmitField, FloatField, IntegerField
-from wtforms import SelectField, DateField
+from wtforms import SelectField, DateField, BooleanField
 from wtforms.validators import DataRequired, Email, Length, EqualTo, ValidationError, NumberRange, Optional
 from poultry_manager.models.user import User
 from flask_login import current_user
@@ -166,3 +168,59 @@ class HealthRecordForm(FlaskForm):
     medication_given = StringField('Medication Given', validators=[Length(max=200), DataRequired()])
     date_reported = DateField('Date Reported', format='%Y-%m-%d', validators=[DataRequired()])
     submit = SubmitField('Submit Record')
+
+
+class StockMovementForm(FlaskForm):
+    """
+        Form for posting a consumption or a stock adjustment to an item's stock ledger. Consumption is
+        entered as the quantity used; adjustments are signed (negative for losses).
+
+        Methods:
+            validate_quantity: Ensures consumption is positive and adjustments are not zero.
+    """
+    kind = SelectField('Movement', choices=[('consumption', 'Consumption'), ('adjustment', 'Adjustment')],
+                       validators=[DataRequired()])
+    quantity = IntegerField('Quantity', validators=[DataRequired(message="Must be a non-zero value")])
+    unit_cost = FloatField('Unit Cost (added stock, defaults to the average cost)',
+                           validators=[Optional(), NumberRange(min=0, message="Must be a non-negative value")])
+    note = StringField('Note', validators=[Optional(), Length(max=200)])
+    submit = SubmitField('Post Movement')
+
+    def validate_quantity(self, quantity):
+        """
+            Validates the quantity against the movement kind.
+
+            :param quantity: The quantity input.
+            :raises ValidationError: If consumption is not positive.
+        """
+        if self.kind.data == 'consumption' and quantity.data is not None and quantity.data < 1:
+            raise ValidationError('Consumption must be at least 1.')
+
+
+class RecordImportForm(FlaskForm):
+    """
+        Form for bulk importing records from a CSV, NDJSON or JSON file.
+    """
+    model = SelectField('Record Type', choices=[('production', 'Production'), ('flock', 'Flock'),
+                                                ('health_record', 'Health Record'), ('inventory', 'Inventory')],
+                        validators=[DataRequired()])
+    file = FileField('File (.csv, .ndjson, .json)',
+                     validators=[FileRequired(), FileAllowed(['csv', 'ndjson', 'jsonl', 'json'], 'CSV or JSON files only')])
+    strict = BooleanField('Import nothing if any row is invalid')
+    submit = SubmitField('Import Records')
+
+
+class BulkActionForm(FlaskForm):
+    """
+        Form for deleting or editing a selection of records at once. The selected IDs (`ids`) and the
+        listing filters (`from`, `to`, `worker`, `category`) are read from the same submission.
+    """
+    scope = SelectField('Apply To', choices=[('selected', 'Selected rows'),
+                                             ('filtered', 'All records matching the filters')],
+                        validators=[DataRequired()])
+    action = SelectField('Action', choices=[('delete', 'Delete'), ('update', 'Set a field')],
+                         validators=[DataRequired()])
+    field = SelectField('Field', choices=[], validate_choice=False, validators=[Optional()])
+    value = StringField('New Value', validators=[Optional()])
+    expected = IntegerField('Previewed Count', validators=[Optional()])
+    submit = SubmitField('Apply')
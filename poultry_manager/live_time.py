@@ -1,46 +1,154 @@
 """
-This module defines the `NetworkTime` class, which is responsible for retrieving the current time
-from an NTP (Network Time Protocol) server. If the NTP server request fails, it falls back to the
-local system time. The primary use case is to ensure that the system gets accurate network time
-when available, and otherwise defaults to the local system time in UTC.
+This module defines the `NetworkTime` class, the application's time source. It keeps a cached
+offset between the local clock and an NTP (Network Time Protocol) server and applies it to the
+local system time, so reading the time never waits on the network.
+
+The offset is refreshed in a background thread whenever it is older than the refresh interval;
+until the first refresh completes (or when the server is unreachable) the last known offset,
+initially zero, is used. In `local` mode no NTP request is ever made, which suits offline sites.
+
+`NetworkTime.now` is a plain callable and is used as the per-row default for timestamp columns.
 
 Dependencies:
     - datetime: For managing time and date objects.
     - ntplib: For making requests to an NTP server to retrieve network time.
+    - threading: For refreshing the offset without blocking callers.
 """
 
-from datetime import datetime, timezone
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 
 import ntplib
 
+DEFAULT_NTP_SERVER = 'time.windows.com'
+DEFAULT_REFRESH_SECONDS = 3600
+DEFAULT_TIMEOUT_SECONDS = 2
+TIME_SOURCES = ('ntp', 'local')
+
 
 class NetworkTime:
     """
-        A class that retrieves the current time from an NTP (Network Time Protocol) server.
-        If the request fails, it falls back to the local system time.
+        Time source combining the local clock with a cached, background-refreshed NTP offset.
+
+        Attributes:
+            source (str): 'ntp' to correct the local clock with an NTP offset, 'local' to use it as is.
+            server (str): The NTP server queried for the offset.
+            refresh_interval (int): Seconds after which the cached offset is refreshed.
+            timeout (int): Seconds to wait for an NTP response in the background thread.
     """
-    @staticmethod
-    def network_time() -> datetime:
+    source = 'ntp'
+    server = DEFAULT_NTP_SERVER
+    refresh_interval = DEFAULT_REFRESH_SECONDS
+    timeout = DEFAULT_TIMEOUT_SECONDS
+
+    _offset = 0.0
+    _refreshed_at = None
+    _refreshing = False
+    _lock = threading.Lock()
+
+    @classmethod
+    def configure(cls, source='ntp', server=DEFAULT_NTP_SERVER, refresh_interval=DEFAULT_REFRESH_SECONDS,
+                  timeout=DEFAULT_TIMEOUT_SECONDS):
         """
-            Retrieve the current time from the 'time.windows.com' NTP server.
-           If the request to the server fails, the local system time is returned instead.
+            Configure the time source.
 
-           Returns:
-               datetime: The current time as a timezone-aware UTC datetime object.
+            Args:
+                source (str): 'ntp' or 'local'.
+                server (str): The NTP server to query.
+                refresh_interval (int): Seconds between offset refreshes.
+                timeout (int): NTP request timeout in seconds.
+
+            Raises:
+                ValueError: If the source is not one of `TIME_SOURCES`.
         """
-        try:
-            # Create an NTP client instance
-            client = ntplib.NTPClient()
+        if source not in TIME_SOURCES:
+            raise ValueError(f"Invalid time source: {source}")
+        with cls._lock:
+            cls.source = source
+            cls.server = server
+            cls.refresh_interval = refresh_interval
+            cls.timeout = timeout
+            if source == 'local':
+                cls._offset = 0.0
+                cls._refreshed_at = None
 
-            # Send a request to the NTP server and get the response
-            response = client.request('time.windows.com', version=3)
+    @classmethod
+    def now(cls) -> datetime:
+        """
+            Return the current time, corrected by the cached NTP offset.
+
+            Never blocks on the network: if the offset is stale, a background refresh is started
+            and the previous offset is used for this call.
 
-            # Convert the NTP time (response.tx_time) to a UTC datetime object
-            network_time = datetime.fromtimestamp(
-                response.tx_time, timezone.utc)
-            return network_time
+            Returns:
+                datetime: The current time as a timezone-aware UTC datetime object.
+        """
+        if cls.source == 'ntp':
+            cls._schedule_refresh()
+        return datetime.now(timezone.utc) + timedelta(seconds=cls._offset)
 
+    @classmethod
+    def network_time(cls) -> datetime:
+        """
+            Return the current network-corrected time.
+
+            Kept for callers of the previous API; equivalent to `now`.
+
+            Returns:
+                datetime: The current time as a timezone-aware UTC datetime object.
+        """
+        return cls.now()
+
+    @classmethod
+    def offset(cls) -> float:
+        """
+            Return the cached offset between the NTP server and the local clock.
+
+            Returns:
+                float: Offset in seconds (0.0 until a refresh succeeds or in local mode).
+        """
+        return cls._offset
+
+    @classmethod
+    def refresh(cls) -> bool:
+        """
+            Query the NTP server and update the cached offset synchronously.
+
+            Returns:
+                bool: True if the offset was updated, False if the request failed.
+        """
+        try:
+            response = ntplib.NTPClient().request(cls.server, version=3, timeout=cls.timeout)
         except Exception:
-            # If an error occurs, fall back to the local system time in UTC
-            network_time = datetime.now(timezone.utc)
-            return network_time
+            # Keep the last known offset; the local clock is the fallback
+            return False
+        finally:
+            with cls._lock:
+                cls._refreshed_at = time.monotonic()
+                cls._refreshing = False
+        cls._offset = response.offset
+        return True
+
+    @classmethod
+    def _schedule_refresh(cls):
+        """Start a background refresh if the cached offset is stale and none is running."""
+        refreshed_at = cls._refreshed_at
+        if refreshed_at is not None and time.monotonic() - refreshed_at < cls.refresh_interval:
+            return
+        with cls._lock:
+            if cls._refreshing or cls.source != 'ntp':
+                return
+            cls._refreshing = True
+        threading.Thread(target=cls.refresh, name='ntp-refresh', daemon=True).start()
+
+
+def _reset_after_fork():
+    """Forget any refresh that was in flight in the parent; its thread does not survive a fork."""
+    NetworkTime._lock = threading.Lock()
+    NetworkTime._refreshing = False
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,167 @@
+"""
+Per-Request SQL Instrumentation
+
+This module counts and times the SQL statements issued while handling each request. SQLAlchemy
+`before_cursor_execute`/`after_cursor_execute` listeners feed a `RequestQueryStats` object kept
+on `flask.g`, and an `after_request` hook reports it:
+
+- a `Server-Timing: db;dur=<ms>;desc="<n> queries"` header, visible in the browser dev tools,
+- one structured (JSON) log line per request on the `poultry_manager.query_stats` logger,
+  including the slowest statements,
+- a warning for every statement slower than `SLOW_QUERY_MS`,
+- a warning when a request issues more statements than its query budget (`QUERY_BUDGET`,
+  or the value set with the `query_budget` decorator); with `QUERY_BUDGET_STRICT` (used by the
+  tests) the request fails with `QueryBudgetExceeded` instead.
+
+Usage:
+    init_query_stats(app, db.engine)
+
+    @bp.route('/admin-dashboard')
+    @query_budget(6)
+    def admin_dashboard():
+        ...
+"""
+
+import json
+import logging
+import time
+
+from flask import g, request, current_app, has_app_context
+from sqlalchemy import event
+
+logger = logging.getLogger('poultry_manager.query_stats')
+
+STATEMENT_PREVIEW = 300
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode when a request issues more statements than its budget."""
+
+
+class RequestQueryStats:
+    """
+    SQL statistics of one request.
+
+    Attributes:
+        count (int): Number of statements executed.
+        total_seconds (float): Time spent executing them.
+        slowest (list): Up to `keep` `(seconds, statement)` pairs, slowest first.
+        keep (int): Number of slowest statements kept.
+    """
+
+    def __init__(self, keep=3):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest = []
+        self.keep = keep
+
+    def record(self, statement, seconds):
+        """Add one executed statement."""
+        self.count += 1
+        self.total_seconds += seconds
+        if self.keep and (len(self.slowest) < self.keep or seconds > self.slowest[-1][0]):
+            self.slowest.append((seconds, ' '.join(statement.split())[:STATEMENT_PREVIEW]))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[self.keep:]
+
+    @property
+    def total_ms(self):
+        """Time spent in the database, in milliseconds."""
+        return self.total_seconds * 1000
+
+
+def query_budget(limit):
+    """
+    Decorator setting the maximum number of SQL statements a view may issue per request.
+
+    Args:
+        limit (int): The view's query budget, overriding `QUERY_BUDGET`.
+
+    Returns:
+        function: The decorator.
+    """
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def current_stats():
+    """Return the statistics of the current request, or None outside an instrumented request."""
+    if not has_app_context():
+        return None
+    return g.get('query_stats')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started_at'].pop()
+    elapsed = time.perf_counter() - started
+    stats = current_stats()
+    if stats is None:
+        return
+    stats.record(statement, elapsed)
+    if elapsed * 1000 >= current_app.config['SLOW_QUERY_MS']:
+        logger.warning('slow query %.1fms on %s: %s', elapsed * 1000, request.path if request else '-',
+                       ' '.join(statement.split())[:STATEMENT_PREVIEW])
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_started_at'):
+        connection.info['query_started_at'].pop()
+
+
+def _start_request():
+    g.query_stats = RequestQueryStats(keep=current_app.config['QUERY_STATS_SLOWEST'])
+
+
+def _report_request(response):
+    stats = current_stats()
+    if stats is None:
+        return response
+
+    config = current_app.config
+    view = current_app.view_functions.get(request.endpoint)
+    budget = getattr(view, 'query_budget', config['QUERY_BUDGET'])
+
+    if config['QUERY_STATS_HEADER']:
+        response.headers.add('Server-Timing', f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"')
+    logger.info(json.dumps({
+        'method': request.method,
+        'path': request.path,
+        'endpoint': request.endpoint,
+        'status': response.status_code,
+        'queries': stats.count,
+        'db_ms': round(stats.total_ms, 2),
+        'slowest': [{'ms': round(seconds * 1000, 2), 'sql': statement} for seconds, statement in stats.slowest],
+    }))
+
+    if budget and stats.count > budget:
+        message = f'{request.endpoint} issued {stats.count} queries, over its budget of {budget}'
+        if config['QUERY_BUDGET_STRICT']:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+    return response
+
+
+def init_query_stats(app, engine):
+    """
+    Instrument an engine and register the request hooks.
+
+    Args:
+        app (Flask): The application.
+        engine (Engine): The engine whose statements are counted.
+    """
+    if not app.config['QUERY_STATS_ENABLED']:
+        return
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_error)
+    app.before_request(_start_request)
+    app.after_request(_report_request)
@@ -6,6 +6,9 @@ from .flock import Flock
 from .production import Production
 from .health_record import HealthRecord
 from .inventory import Inventory
+from .dimension import Symptom, Medication, Breed
+from .rollup import DailyProduction, DailyFlockStock, DailySymptomCases
 
 # List all the models to be used by the application
-__all__ = ['BaseModel', 'User', 'Flock', 'Production', 'HealthRecord', 'Inventory']
+__all__ = ['BaseModel', 'User', 'Flock', 'Production', 'HealthRecord', 'Inventory',
+           'Symptom', 'Medication', 'Breed', 'DailyProduction', 'DailyFlockStock', 'DailySymptomCases']
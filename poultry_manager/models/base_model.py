@@ -7,7 +7,7 @@ of records.
 
 Dependencies:
 - `db`: SQLAlchemy database instance from `poultry_manager`.
-- `NetworkTime`: A utility class from `poultry_manager.live_time` to fetch network time.
+- `NetworkTime`: The time source from `poultry_manager.live_time`; `NetworkTime.now` is evaluated per row.
 
 Usage:
 To use this base model, other model classes should inherit from `BaseModel`.
@@ -17,8 +17,8 @@ To use this base model, other model classes should inherit from `BaseModel`.
 from poultry_manager import db
 from poultry_manager.live_time import NetworkTime
 
-# Fetch the current network time for default timestamps
-ntplib_time = NetworkTime.network_time()
+# Callable default evaluated for every inserted or updated row (no network access at import)
+current_time = NetworkTime.now
 
 
 class BaseModel(db.Model):
@@ -27,12 +27,12 @@ class BaseModel(db.Model):
 
     Attributes:
         id (int): Primary key of the model, automatically generated integer.
-        created_at (datetime): Timestamp when the record was created, default is the current network time.
-        updated_at (datetime): Timestamp when the record was last updated, default is the current network time,
+        created_at (datetime): Timestamp when the record was created, default is the time of insertion.
+        updated_at (datetime): Timestamp when the record was last updated, default is the time of insertion,
                               automatically updated on record modification.
     """
     __abstract__ = True
 
     id = db.Column(db.Integer(), primary_key=True)
-    created_at = db.Column(db.DateTime(), nullable=False, default=ntplib_time)
-    updated_at = db.Column(db.DateTime(), nullable=False, default=ntplib_time, onupdate=ntplib_time)
+    created_at = db.Column(db.DateTime(), nullable=False, default=current_time)
+    updated_at = db.Column(db.DateTime(), nullable=False, default=current_time, onupdate=current_time)
@@ -0,0 +1,32 @@
+"""
+Cache Generation Model for Flask-SQLAlchemy
+
+This module defines the `CacheGeneration` table, which holds one counter per record type.
+`poultry_manager.services.response_cache` increments a counter in the same transaction as
+every write to that record type and includes the counters in its cache keys and ETags, so a
+cached chart or page is never served after the data behind it has changed, in any process.
+
+Dependencies:
+- `db`: SQLAlchemy database instance from `poultry_manager`.
+
+"""
+
+from poultry_manager import db
+
+
+class CacheGeneration(db.Model):
+    """
+    Model class to represent the write generation of one record type.
+
+    Attributes:
+        model (str): The record type slug (e.g., 'production'), primary key.
+        generation (int): Incremented by every flush or bulk statement that writes records of this type.
+    """
+    __tablename__ = 'cache_generations'
+
+    model = db.Column(db.String(50), primary_key=True)
+    generation = db.Column(db.BigInteger(), nullable=False, default=0)
+
+    def __repr__(self):
+        """String representation of the cache generation."""
+        return f"<CacheGeneration {self.model}: {self.generation}>"
@@ -0,0 +1,55 @@
+"""
+Dimension Models for Flask-SQLAlchemy
+
+This module defines the lookup tables that the free-text `symptom`, `medication_given` and
+`breed` columns are canonicalized into. Each distinct canonical key ("cough" for "Cough",
+"cough " and "coughing") has one row holding the display name and the number of records
+referencing it, and `HealthRecord` and `Flock` carry integer foreign keys to them. Rollups
+and charts group on those small integer keys instead of on the raw strings.
+
+The rows are created and their counters maintained by `poultry_manager.services.dimensions`
+and `poultry_manager.services.rollups`; they are never deleted, so the IDs are stable.
+
+Dependencies:
+- `db`: SQLAlchemy database instance from `poultry_manager`.
+
+"""
+
+from poultry_manager import db
+
+
+class Dimension(db.Model):
+    """
+    Abstract model class for one canonicalized free-text value.
+
+    Attributes:
+        id (int): Primary key, referenced by the records.
+        key (str): The canonical key (see `services.dimensions.canonical_key`), unique.
+        name (str): The display name, as first entered.
+        records (int): Number of records referencing this value.
+    """
+    __abstract__ = True
+
+    id = db.Column(db.Integer(), primary_key=True)
+    key = db.Column(db.String(200), nullable=False, unique=True)
+    name = db.Column(db.String(200), nullable=False)
+    records = db.Column(db.Integer(), nullable=False, default=0)
+
+    def __repr__(self):
+        """String representation of the dimension value."""
+        return f"<{type(self).__name__} {self.name}: {self.records} records>"
+
+
+class Symptom(Dimension):
+    """Model class to represent one canonical symptom of `HealthRecord.symptom`."""
+    __tablename__ = 'symptoms'
+
+
+class Medication(Dimension):
+    """Model class to represent one canonical medication of `HealthRecord.medication_given`."""
+    __tablename__ = 'medications'
+
+
+class Breed(Dimension):
+    """Model class to represent one canonical breed of `Flock.breed`."""
+    __tablename__ = 'breeds'
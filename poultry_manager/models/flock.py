@@ -14,7 +14,7 @@ To use this model, you need to define the `User` model with a `flocks` relations
 """
 
 from poultry_manager import db
-from .base_model import BaseModel, ntplib_time
+from .base_model import BaseModel, current_time
 
 
 class Flock(BaseModel):
@@ -28,7 +28,8 @@ class Flock(BaseModel):
         age (int): The age of the chickens in weeks, must be provided.
         deaths (int): Number of chickens that have died, default is 0.
         sold (int): Number of chickens that have been sold, default is 0.
-        entry_date (datetime): The date when the flock was entered into the system, default is the current network time.
+        entry_date (datetime): The date when the flock was entered into the system, default is the time of insertion.
+        breed_id (int): Foreign key to the canonical `Breed` of `breed`, set on write.
         user_id (int): Foreign key to the `User` table, must be provided.
         user (User): Relationship to the `User` model indicating the owner of the flock.
 
@@ -42,15 +43,25 @@ class Flock(BaseModel):
     age = db.Column(db.Integer(), nullable=False)
     deaths = db.Column(db.Integer(), default=0)
     sold = db.Column(db.Integer(), default=0)
-    entry_date = db.Column(db.DateTime(), nullable=False, default=ntplib_time)
+    entry_date = db.Column(db.DateTime(), nullable=False, default=current_time)
     created_by_username = db.Column(db.String(100))
 
+    # Canonical breed (see services/dimensions.py)
+    breed_id = db.Column(db.Integer, db.ForeignKey('breeds.id'), nullable=False)
+
     # Foreign key to User table
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
 
     # Define relationship with User model
     user = db.relationship('User', back_populates='flocks')
 
+    # Indexes backing the keyset listings (see services/listing.py)
+    __table_args__ = (
+        db.Index('ix_flocks_entry_date_id', 'entry_date', 'id'),
+        db.Index('ix_flocks_user_id_entry_date_id', 'user_id', 'entry_date', 'id'),
+        db.Index('ix_flocks_breed_entry_date_id', 'breed', 'entry_date', 'id'),
+    )
+
     def __repr__(self):
         """ String representation of the flock with breed, quantity, and age in weeks """
         return f"<Flock {self.breed} ({self.quantity} chickens), {self.age} weeks old>"
@@ -14,7 +14,7 @@ To use this model, you need to define the `User` model with a `health_records` r
 """
 
 from poultry_manager import db
-from .base_model import BaseModel, ntplib_time
+from .base_model import BaseModel, current_time
 
 
 class HealthRecord(BaseModel):
@@ -26,7 +26,9 @@ class HealthRecord(BaseModel):
         number_sick (int): The number of sick chickens, optional.
         symptom (str): Description of symptoms observed (string, 200 characters).
         medication_given (str): Description of the medication administered (string, 200 characters).
-        date_reported (datetime): The date when the health issue was reported, default is the current network time.
+        symptom_id (int): Foreign key to the canonical `Symptom` of `symptom`, set on write.
+        medication_id (int): Foreign key to the canonical `Medication` of `medication_given`, set on write.
+        date_reported (datetime): The date when the health issue was reported, default is the time of insertion.
         user_id (int): Foreign key to the `User` table, must be provided.
         user (User): Relationship to the `User` model indicating the user who reported the health record.
 
@@ -38,15 +40,26 @@ class HealthRecord(BaseModel):
     number_sick = db.Column(db.Integer, nullable=True)
     symptom = db.Column(db.String(200), nullable=False)
     medication_given = db.Column(db.String(200), nullable=False)
-    date_reported = db.Column(db.DateTime(), nullable=False, default=ntplib_time)
+    date_reported = db.Column(db.DateTime(), nullable=False, default=current_time)
     created_by_username = db.Column(db.String(100))
 
+    # Canonical symptom and medication (see services/dimensions.py)
+    symptom_id = db.Column(db.Integer, db.ForeignKey('symptoms.id'), nullable=False)
+    medication_id = db.Column(db.Integer, db.ForeignKey('medications.id'), nullable=False)
+
     # Foreign key to User table
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
 
     # Define relationship with User model
     user = db.relationship('User', back_populates='health_records')
 
+    # Indexes backing the keyset listings (see services/listing.py)
+    __table_args__ = (
+        db.Index('ix_health_records_date_reported_id', 'date_reported', 'id'),
+        db.Index('ix_health_records_user_id_date_reported_id', 'user_id', 'date_reported', 'id'),
+        db.Index('ix_health_records_symptom_date_reported_id', 'symptom', 'date_reported', 'id'),
+    )
+
     def __repr__(self):
         """String representation of the health record."""
         return f'<Health Record Date: {self.date_reported}, Symptoms: {self.symptom}>'
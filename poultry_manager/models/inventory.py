@@ -15,7 +15,7 @@ with an `inventories` relationship that corresponds to this model.
 """
 
 from poultry_manager import db
-from .base_model import BaseModel, ntplib_time
+from .base_model import BaseModel, current_time
 
 
 class Inventory(BaseModel):
@@ -31,7 +31,7 @@ class Inventory(BaseModel):
         cost (float): Cost of a single unit of the item, must be provided.
         currency (str): Currency of the cost, default is 'USD' (string, 10 characters).
         purchase_order_number (str): Optional purchase order number (string, 100 characters).
-        purchase_date (datetime): The date when the item was purchased, default is the current network time.
+        purchase_date (datetime): The date when the item was purchased, default is the time of insertion.
         user_id (int): Foreign key to the `User` table, must be provided.
         user (User): Relationship to the `User` model indicating the user who manages the inventory item.
 
@@ -50,7 +50,7 @@ class Inventory(BaseModel):
     cost = db.Column(db.Float(), nullable=False)
     currency = db.Column(db.String(10), nullable=False, default='USD')
     purchase_order_number = db.Column(db.String(100), nullable=True)
-    purchase_date = db.Column(db.DateTime(), nullable=False, default=ntplib_time)
+    purchase_date = db.Column(db.DateTime(), nullable=False, default=current_time)
     created_by_username = db.Column(db.String(100))
 
     # Foreign Key
@@ -59,9 +59,12 @@ class Inventory(BaseModel):
     # Relationship
     user = db.relationship('User', back_populates='inventories', lazy=True)
 
-    # Unique constraint considering multiple purchases
+    # Unique constraint considering multiple purchases, and indexes backing the keyset listings
     __table_args__ = (
         db.UniqueConstraint('item_name', 'purchase_date', name='unique_inventory_entry'),
+        db.Index('ix_inventory_purchase_date_id', 'purchase_date', 'id'),
+        db.Index('ix_inventory_user_id_purchase_date_id', 'user_id', 'purchase_date', 'id'),
+        db.Index('ix_inventory_category_purchase_date_id', 'category', 'purchase_date', 'id'),
     )
 
     def __repr__(self):
@@ -16,7 +16,7 @@ relationship that corresponds to this model.
 """
 
 from poultry_manager import db
-from .base_model import BaseModel, ntplib_time
+from .base_model import BaseModel, current_time
 
 
 class Production(BaseModel):
@@ -28,7 +28,7 @@ class Production(BaseModel):
         number_eggs_collected (int): Number of eggs collected on a specific date.
         eggs_sold (int): Number of eggs sold, default is 0.
         date_collected (datetime): The date when the eggs were collected,
-                                    default is the current network time.
+                                    default is the time of insertion.
         user_id (int): Foreign key to the `User` table, must be provided.
         user (User): Relationship to the `User` model indicating the user who recorded the production.
 
@@ -40,7 +40,7 @@ class Production(BaseModel):
 
     number_eggs_collected = db.Column(db.Integer(), nullable=False)
     eggs_sold = db.Column(db.Integer(), default=0)
-    date_collected = db.Column(db.DateTime(), nullable=False, default=ntplib_time)
+    date_collected = db.Column(db.DateTime(), nullable=False, default=current_time)
     created_by_username = db.Column(db.String(100))
 
     # Foreign key to User table
@@ -49,6 +49,12 @@ class Production(BaseModel):
     # Define relationship with User model
     user = db.relationship('User', back_populates='productions')
 
+    # Indexes backing the keyset listings (see services/listing.py)
+    __table_args__ = (
+        db.Index('ix_production_date_collected_id', 'date_collected', 'id'),
+        db.Index('ix_production_user_id_date_collected_id', 'user_id', 'date_collected', 'id'),
+    )
+
     def __repr__(self):
         """String representation of the production record."""
         return f"<Production Record Date: {self.date_collected}, Eggs: {self.number_eggs_collected}>"
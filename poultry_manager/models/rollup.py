@@ -0,0 +1,89 @@
+"""
+Rollup Models for Flask-SQLAlchemy
+
+This module defines the daily rollup tables that summarize the raw `production`, `flocks`
+and `health_records` rows. They are keyed by day (and the integer ID of the canonical breed
+or symptom, see `poultry_manager.models.dimension`) instead of by record, so dashboards and
+chart APIs read O(days) rows instead of O(records).
+
+The rows are maintained incrementally by `poultry_manager.services.rollups` whenever
+records are flushed, and can be rebuilt from scratch with `flask rollups rebuild`.
+
+Dependencies:
+- `db`: SQLAlchemy database instance from `poultry_manager`.
+
+"""
+
+from poultry_manager import db
+
+
+class DailyProduction(db.Model):
+    """
+    Model class to represent the eggs collected and sold on one day.
+
+    Attributes:
+        day (date): The collection day, primary key.
+        records (int): Number of production records on that day.
+        eggs_collected (int): Total eggs collected on that day.
+        eggs_sold (int): Total eggs sold on that day.
+    """
+    __tablename__ = 'rollup_daily_production'
+
+    day = db.Column(db.Date(), primary_key=True)
+    records = db.Column(db.Integer(), nullable=False, default=0)
+    eggs_collected = db.Column(db.Integer(), nullable=False, default=0)
+    eggs_sold = db.Column(db.Integer(), nullable=False, default=0)
+
+    def __repr__(self):
+        """String representation of the daily production rollup."""
+        return f"<DailyProduction {self.day}: {self.eggs_collected} collected, {self.eggs_sold} sold>"
+
+
+class DailyFlockStock(db.Model):
+    """
+    Model class to represent the birds of one breed entered on one day.
+
+    Attributes:
+        day (date): The flock entry day, part of the primary key.
+        breed_id (int): The canonical breed, part of the primary key.
+        records (int): Number of flock records for that day and breed.
+        quantity (int): Total birds entered.
+        deaths (int): Total recorded deaths.
+        sold (int): Total birds sold.
+        live_birds (int): Birds still alive and unsold (`quantity - deaths - sold`).
+    """
+    __tablename__ = 'rollup_daily_flock_stock'
+
+    day = db.Column(db.Date(), primary_key=True)
+    breed_id = db.Column(db.Integer(), db.ForeignKey('breeds.id'), primary_key=True)
+    records = db.Column(db.Integer(), nullable=False, default=0)
+    quantity = db.Column(db.Integer(), nullable=False, default=0)
+    deaths = db.Column(db.Integer(), nullable=False, default=0)
+    sold = db.Column(db.Integer(), nullable=False, default=0)
+    live_birds = db.Column(db.Integer(), nullable=False, default=0)
+
+    def __repr__(self):
+        """String representation of the daily flock stock rollup."""
+        return f"<DailyFlockStock {self.day} breed {self.breed_id}: {self.live_birds} live>"
+
+
+class DailySymptomCases(db.Model):
+    """
+    Model class to represent the health reports of one symptom on one day.
+
+    Attributes:
+        day (date): The report day, part of the primary key.
+        symptom_id (int): The canonical symptom, part of the primary key.
+        records (int): Number of health records (cases) for that day and symptom.
+        birds_sick (int): Total birds reported sick.
+    """
+    __tablename__ = 'rollup_daily_symptom_cases'
+
+    day = db.Column(db.Date(), primary_key=True)
+    symptom_id = db.Column(db.Integer(), db.ForeignKey('symptoms.id'), primary_key=True)
+    records = db.Column(db.Integer(), nullable=False, default=0)
+    birds_sick = db.Column(db.Integer(), nullable=False, default=0)
+
+    def __repr__(self):
+        """String representation of the daily symptom rollup."""
+        return f"<DailySymptomCases {self.day} symptom {self.symptom_id}: {self.records} cases>"
@@ -0,0 +1,151 @@
+"""
+Stock Ledger Models for Flask-SQLAlchemy
+
+This module defines the inventory stock ledger:
+
+- `StockItem`: one stocked item (item name, unit and currency, canonicalized) with its
+  materialized balance: quantity on hand and its value under FIFO and average-cost valuation.
+- `StockMovement`: the append-only ledger of purchases, consumption and adjustments. Every
+  movement stores the item's running balance after it, so the stock at any past moment is
+  the latest movement up to that moment.
+- `StockLot`: the open FIFO cost layers of an item, consumed oldest first and removed once empty.
+
+The rows are written by `poultry_manager.services.stock` only; movements are never updated or
+deleted, and corrections are posted as adjustments.
+
+Dependencies:
+- `db`: SQLAlchemy database instance from `poultry_manager`.
+- `current_time`: The record timestamp source of `BaseModel`.
+
+"""
+
+from poultry_manager import db
+from .base_model import current_time
+
+
+class StockItem(db.Model):
+    """
+    Model class to represent one stocked item and its current balance.
+
+    Attributes:
+        id (int): Primary key.
+        key (str): Canonical key of the item name (see `services.dimensions.canonical_key`).
+        unit (str): Canonical key of the unit of measurement.
+        currency (str): Currency the item is valued in.
+        name (str): Display name, as first purchased.
+        category (str): Inventory category of the first purchase.
+        unit_label (str): Unit of measurement, as first purchased.
+        on_hand (int): Quantity in stock.
+        fifo_value (float): Value of the stock on hand under FIFO valuation.
+        average_value (float): Value of the stock on hand under moving average-cost valuation.
+        last_movement_at (datetime): When the latest movement occurred.
+
+    Constraints:
+        unique_stock_item: One item per name, unit and currency.
+    """
+    __tablename__ = 'stock_items'
+
+    id = db.Column(db.Integer(), primary_key=True)
+    key = db.Column(db.String(200), nullable=False)
+    unit = db.Column(db.String(200), nullable=False)
+    currency = db.Column(db.String(10), nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    category = db.Column(db.String(50), nullable=False)
+    unit_label = db.Column(db.String(50), nullable=False)
+    on_hand = db.Column(db.Integer(), nullable=False, default=0)
+    fifo_value = db.Column(db.Float(), nullable=False, default=0.0)
+    average_value = db.Column(db.Float(), nullable=False, default=0.0)
+    last_movement_at = db.Column(db.DateTime(), nullable=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('key', 'unit', 'currency', name='unique_stock_item'),
+    )
+
+    @property
+    def average_cost(self):
+        """Average cost of one unit on hand, or 0.0 when out of stock."""
+        return self.average_value / self.on_hand if self.on_hand else 0.0
+
+    def __repr__(self):
+        """String representation of the stock item."""
+        return f"<StockItem {self.name}: {self.on_hand} {self.unit_label}>"
+
+
+class StockMovement(db.Model):
+    """
+    Model class to represent one entry of the append-only stock ledger.
+
+    Attributes:
+        id (int): Primary key; movements of an item are applied in ID order.
+        item_id (int): Foreign key to the `StockItem`.
+        kind (str): 'purchase', 'consumption' or 'adjustment'.
+        quantity (int): Signed change of the quantity on hand.
+        unit_cost (float): Cost of one unit moved: the lot cost for stock received, the FIFO
+            cost for stock issued.
+        fifo_value (float): Signed change of the FIFO value.
+        average_value (float): Signed change of the average-cost value.
+        on_hand (int): Quantity on hand after the movement.
+        fifo_balance (float): FIFO value on hand after the movement.
+        average_balance (float): Average-cost value on hand after the movement.
+        occurred_at (datetime): When the movement was posted (recorded), which orders the ledger.
+        purchase_date (datetime): Purchase date of the `Inventory` record a purchase movement posts.
+        note (str): Optional free-text reason.
+        inventory_id (int): Foreign key to the `Inventory` purchase a purchase movement records.
+        user_id (int): Foreign key to the `User` who posted the movement.
+        created_by_username (str): Username of that user.
+    """
+    __tablename__ = 'stock_movements'
+
+    id = db.Column(db.Integer(), primary_key=True)
+    item_id = db.Column(db.Integer(), db.ForeignKey('stock_items.id'), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)
+    quantity = db.Column(db.Integer(), nullable=False)
+    unit_cost = db.Column(db.Float(), nullable=False)
+    fifo_value = db.Column(db.Float(), nullable=False)
+    average_value = db.Column(db.Float(), nullable=False)
+    on_hand = db.Column(db.Integer(), nullable=False)
+    fifo_balance = db.Column(db.Float(), nullable=False)
+    average_balance = db.Column(db.Float(), nullable=False)
+    occurred_at = db.Column(db.DateTime(), nullable=False, default=current_time)
+    purchase_date = db.Column(db.DateTime(), nullable=True)
+    note = db.Column(db.String(200), nullable=True)
+    inventory_id = db.Column(db.Integer(), db.ForeignKey('inventory.id', ondelete='SET NULL'), nullable=True)
+    user_id = db.Column(db.Integer(), db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    created_by_username = db.Column(db.String(100))
+
+    # Index backing the per-item history range scans and point-in-time balances
+    __table_args__ = (
+        db.Index('ix_stock_movements_item_id_occurred_at_id', 'item_id', 'occurred_at', 'id'),
+    )
+
+    def __repr__(self):
+        """String representation of the stock movement."""
+        return f"<StockMovement {self.kind} {self.quantity:+d} of item {self.item_id}: {self.on_hand} on hand>"
+
+
+class StockLot(db.Model):
+    """
+    Model class to represent one open FIFO cost layer of an item.
+
+    Attributes:
+        id (int): Primary key; lots of an item are consumed in ID order.
+        item_id (int): Foreign key to the `StockItem`.
+        movement_id (int): Foreign key to the `StockMovement` that received the stock.
+        unit_cost (float): Cost of one unit of the lot.
+        remaining (int): Units of the lot not yet issued.
+    """
+    __tablename__ = 'stock_lots'
+
+    id = db.Column(db.Integer(), primary_key=True)
+    item_id = db.Column(db.Integer(), db.ForeignKey('stock_items.id'), nullable=False)
+    movement_id = db.Column(db.Integer(), db.ForeignKey('stock_movements.id'), nullable=False)
+    unit_cost = db.Column(db.Float(), nullable=False)
+    remaining = db.Column(db.Integer(), nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_stock_lots_item_id_id', 'item_id', 'id'),
+    )
+
+    def __repr__(self):
+        """String representation of the stock lot."""
+        return f"<StockLot item {self.item_id}: {self.remaining} at {self.unit_cost}>"
@@ -6,27 +6,30 @@ It inherits from `BaseModel` and `UserMixin`, and integrates with Flask-Login fo
 
 Dependencies:
 - `db`: SQLAlchemy database instance from `poultry_manager`.
-- `bcrypt`: Bcrypt instance for password hashing from `poultry_manager`.
+- `password_hasher`: Bounded bcrypt hashing pool from `poultry_manager.services.hashing`.
 - `UserMixin`: Flask-Login mixin for user authentication.
 - `BaseModel`: Abstract base class providing common fields, including timestamps.
 - `login_manager`: Flask-Login login manager for user session handling.
+- `IdentityCache`: Per-process cache used by `load_user`; call `user_cache.invalidate` after changing a user.
 
 Usage:
 To use this model, ensure that Flask-Login and Flask-Bcrypt are properly configured in your application.
 
 """
 
-from poultry_manager import db, bcrypt
+from poultry_manager import db
 from enum import Enum
 from flask_login import UserMixin
 from .base_model import BaseModel
 from poultry_manager import login_manager
+from poultry_manager.services.identity_cache import IdentityCache
+from poultry_manager.services.hashing import password_hasher
 
 
 @login_manager.user_loader
 def load_user(user_id):
     """
-    Load a user given their user ID.
+    Load a user given their user ID, from the identity cache when possible.
 
     Args:
         user_id (int): The ID of the user.
@@ -34,7 +37,7 @@ def load_user(user_id):
     Returns:
         User: The user object with the specified user ID.
     """
-    return User.query.get(int(user_id))
+    return user_cache.get(int(user_id), lambda key: db.session.get(User, key))
 
 
 # Enum class for defining user roles
@@ -62,11 +65,13 @@ class User(BaseModel, UserMixin):
     password_hash = db.Column(db.String(128), nullable=False)
     role = db.Column(db.Enum(RoleEnum), nullable=False, default=RoleEnum.WORKER, index=True)
 
-    # Relationships
-    inventories = db.relationship('Inventory', back_populates='user', lazy=True)
-    productions = db.relationship('Production', back_populates='user', lazy=True)
-    health_records = db.relationship('HealthRecord', back_populates='user', lazy=True)
-    flocks = db.relationship('Flock', back_populates='user', lazy=True)
+    # Relationships; a worker's records are only ever queried with filters, never loaded as a whole
+    # collection, and deleting a user detaches them with one UPDATE per table (see `delete_worker`)
+    inventories = db.relationship('Inventory', back_populates='user', lazy='raise_on_sql', passive_deletes=True)
+    productions = db.relationship('Production', back_populates='user', lazy='raise_on_sql', passive_deletes=True)
+    health_records = db.relationship('HealthRecord', back_populates='user', lazy='raise_on_sql',
+                                     passive_deletes=True)
+    flocks = db.relationship('Flock', back_populates='user', lazy='raise_on_sql', passive_deletes=True)
 
     def __init__(self, username, email, password):
         """ Initializes a new user with a hashed password. """
@@ -82,11 +87,26 @@ class User(BaseModel, UserMixin):
     @password.setter
     def password(self, password):
         """Hashes and sets the user's password."""
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
         """ Checks the provided password against the stored hashed password. """
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def rehash_password(self, password):
+        """
+        Re-hash a just-verified password if its hash uses an outdated bcrypt cost factor.
+
+        Args:
+            password (str): The plain-text password that passed `check_password`.
+
+        Returns:
+            bool: True if the hash was replaced; the caller commits the session.
+        """
+        if not password_hasher.needs_rehash(self.password_hash):
+            return False
+        self.password = password
+        return True
 
     def __repr__(self):
         """String representation of the user object."""
@@ -105,3 +125,7 @@ class User(BaseModel, UserMixin):
     def is_worker(self):
         """Check if the user is a worker."""
         return self.role == RoleEnum.WORKER
+
+
+# Per-process cache of loaded identities, configured in `create_app`
+user_cache = IdentityCache(User)
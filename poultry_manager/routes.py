@@ -10,17 +10,37 @@ Dependencies:
     - SQLAlchemy: For database interactions.
 """
 
-from flask import render_template, url_for, Blueprint, redirect, flash, jsonify
+import hmac
+
+from flask import (render_template, url_for, Blueprint, redirect, flash, jsonify, request, abort, Response,
+                   stream_with_context, current_app)
 from flask_login import logout_user, login_user, login_required, current_user
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
 from poultry_manager.forms import (RegisterForm, LoginForm, InventoryForm, ProductionForm, FlockForm, HealthRecordForm,
-                                   AccountSettingsForm)
+                                   AccountSettingsForm, RecordImportForm, BulkActionForm, StockMovementForm)
 from poultry_manager import db
-from poultry_manager.models.user import User, RoleEnum
+from poultry_manager.models.user import User, RoleEnum, user_cache
 from poultry_manager.middleware.access_control import admin_required, worker_required, admin_or_worker_required
 from poultry_manager.models.inventory import Inventory
 from poultry_manager.models.production import Production
 from poultry_manager.models.flock import Flock
 from poultry_manager.models.health_record import HealthRecord
+from poultry_manager.models.stock import StockItem, StockMovement
+from poultry_manager.api import serialize
+from poultry_manager.services.listing import LISTINGS, ListingFilters, parse_date
+from poultry_manager.services.records import RECORD_TYPES, parse_ids
+from poultry_manager.services.search import SOURCES as SEARCH_SOURCES, search, suggest
+from poultry_manager.services.dashboard import DashboardSummary
+from poultry_manager.services.charts import ChartParams, production_series, symptom_counts, breed_quantities
+from poultry_manager.services.bulk_import import import_upload
+from poultry_manager.services import stock
+from poultry_manager.services.export import RecordExport, FORMATS as EXPORT_FORMATS
+from poultry_manager.services.db_pool import pool_metrics
+from poultry_manager.services.response_cache import response_cache, ResponseCache
+from poultry_manager.services.flock_analytics import flock_analytics
+from poultry_manager.services.metrics import request_metrics, farm_kpis, CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 
 bp = Blueprint('main', __name__)
@@ -81,6 +101,10 @@ def login_page():
     if form.validate_on_submit():
         attempted_user = User.query.filter_by(username=form.username.data).first()
         if attempted_user and attempted_user.check_password(form.password.data):
+            # Upgrade hashes made with an outdated bcrypt cost factor
+            if attempted_user.rehash_password(form.password.data):
+                db.session.commit()
+                user_cache.invalidate(attempted_user.id)
             login_user(attempted_user)
             flash(f'Successfully logged in as: {attempted_user.username}', category='success')
 
@@ -123,11 +147,12 @@ def account_settings():
 
     if form.validate_on_submit():
         if form.new_password.data:
-            current_user.set_password(form.new_password.data)
+            current_user.password = form.new_password.data
 
         current_user.username = form.username.data
         current_user.email = form.email_address.data
         db.session.commit()
+        user_cache.invalidate(current_user.id)
         flash('Your account has been updated!', category='success')
         return redirect(url_for('main.account_settings'))
 
@@ -280,26 +305,38 @@ def add_health_record():
 @admin_required
 def admin_dashboard():
     """
-        Admin-only dashboard. View all records and perform management tasks.
+        Admin-only dashboard. Show record counts, KPI totals and the latest entries.
 
         Returns:
-            Rendered admin dashboard with all records.
+            Rendered admin dashboard with the aggregate summary.
     """
-    # Fetch all data from the database
-    workers = User.query.filter_by(role=RoleEnum.WORKER).all()
-    inventories = Inventory.query.all()
-    productions = Production.query.all()
-    flocks = Flock.query.all()
-    health_records = HealthRecord.query.all()
+    summary = DashboardSummary.build()
+    return render_template('admin_dashboard.html', summary=summary)
 
-    return render_template(
-        'admin_dashboard.html',
-        workers=workers,
-        inventories=inventories,
-        productions=productions,
-        flocks=flocks,
-        health_records=health_records
-    )
+
+@bp.route('/import-records', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def import_records():
+    """
+        Admin-only bulk import. Validate and insert records from an uploaded CSV, NDJSON or JSON file.
+
+        Returns:
+            JSON import report if the client asks for JSON, otherwise the import page with the report.
+    """
+    form = RecordImportForm()
+    report = None
+    if form.validate_on_submit():
+        report = import_upload(form.model.data, form.file.data, user=current_user, strict=form.strict.data)
+        if request.accept_mimetypes.best == 'application/json':
+            return jsonify(report.to_dict()), 200 if report.committed else 422
+        if report.committed:
+            flash(f'{report.inserted} of {report.total} records imported successfully', 'success')
+        else:
+            flash('No records were imported', 'danger')
+    elif form.errors and request.accept_mimetypes.best == 'application/json':
+        return jsonify({'errors': form.errors}), 400
+    return render_template('import_records.html', form=form, report=report)
 
 
 @bp.route('/manage_workers', methods=['GET'])
@@ -312,7 +349,9 @@ def manage_workers():
         Returns:
             Rendered manage workers page with a list of workers.
     """
-    workers = User.query.all()  # Fetch all workers
+    # Only the columns the table shows; password hashes and timestamps stay in the database
+    workers = (User.query.options(load_only(User.id, User.username, User.email, User.role))
+               .order_by(User.username).all())
     return render_template('manage_workers.html', workers=workers)
 
 
@@ -336,6 +375,7 @@ def promote_worker(user_id):
 
     worker.role = RoleEnum.ADMIN
     db.session.commit()
+    user_cache.invalidate(user_id)
     flash(f"{worker.username} has been promoted to admin.", "success")
     return redirect(url_for('main.manage_workers'))
 
@@ -360,6 +400,7 @@ def demote_worker(user_id):
 
     worker.role = RoleEnum.WORKER
     db.session.commit()
+    user_cache.invalidate(user_id)
     flash(f"{worker.username} has been demoted to worker.", "success")
     return redirect(url_for('main.manage_workers'))
 
@@ -378,8 +419,13 @@ def delete_worker(user_id):
             Redirect to the manage workers page with a success message.
     """
     worker = User.query.get_or_404(user_id)
+    # Detach the worker's records with one UPDATE per table instead of loading every record
+    for model in (Inventory, Production, Flock, HealthRecord, StockMovement):
+        db.session.execute(update(model).where(model.user_id == worker.id).values(user_id=None))
+    ResponseCache.bump(db.session.connection(), ['inventory', 'production', 'flock', 'health_record', 'stock'])
     db.session.delete(worker)
     db.session.commit()
+    user_cache.invalidate(user_id)
     flash(f"{worker.username} has been removed.", "success")
     return redirect(url_for('main.manage_workers'))
 
@@ -391,39 +437,39 @@ def edit_record(model, record_id):
     """
         Admin edits a specific record based on the model type provided.
 
+        A submitted form is written with a single UPDATE; the record is not loaded first.
+
         Args:
-            model (str): The type of record to edit (e.g., 'inventory', 'production', 'flock', 'health_record').
+            model (str): The type of record to edit (a key of `RECORD_TYPES`, e.g. 'inventory', 'production').
             record_id (int): The ID of the record to be edited.
 
         Returns:
             Rendered modal form for editing the record on GET requests,
             or redirect to the admin dashboard on successful form submission.
     """
-    if model == 'inventory':
-        record = Inventory.query.get_or_404(record_id)
-        form = InventoryForm(obj=record)
-    elif model == 'production':
-        record = Production.query.get_or_404(record_id)
-        form = ProductionForm(obj=record)
-    elif model == 'flock':
-        record = Flock.query.get_or_404(record_id)
-        form = FlockForm(obj=record)
-    elif model == 'health_record':
-        record = HealthRecord.query.get_or_404(record_id)
-        form = HealthRecordForm(obj=record)
-    else:
+    record_type = RECORD_TYPES.get(model)
+    if record_type is None:
         flash('Invalid model.', 'danger')
         return redirect(url_for('main.admin_dashboard'))
+    if request.method == 'GET':
+        return edit_record_modal(model, record_id)
 
     # Handle form submission
+    form = record_type.form()
     if form.validate_on_submit():
-        form.populate_obj(record)
+        try:
+            if not record_type.update(record_id, record_type.values(form)):
+                abort(404)
+        except stock.InsufficientStock as error:
+            db.session.rollback()
+            flash(f'The record was not updated: {error}', 'danger')
+            return redirect(url_for('main.admin_dashboard'))
         db.session.commit()
-        flash(f'{model.capitalize()} record updated successfully.', 'success')
+        flash(f'{record_type.label} record updated successfully.', 'success')
         return redirect(url_for('main.admin_dashboard'))
 
-    # For GET requests, return the form HTML to load into the modal
-    return render_template('modal_form.html', form=form, model=model, record=record)
+    # Re-render the submitted form with its errors
+    return render_template('modal_form.html', form=form, model=model, record_id=record_id)
 
 
 @bp.route('/edit/<model>/<int:record_id>', methods=['GET'])
@@ -433,30 +479,22 @@ def edit_record_modal(model, record_id):
     """
         Retrieve a specific record for editing based on the model type and record ID.
 
+        Only the columns the record's form edits are loaded.
+
         Args:
-            model (str): The type of the model (e.g., 'inventory', 'flock', 'production', 'health_record').
+            model (str): The type of the model (a key of `RECORD_TYPES`, e.g. 'inventory', 'flock').
             record_id (int): The unique identifier of the record to be edited.
 
         Returns:
             Rendered template for the modal form with the existing record data.
     """
-
-    # Query the correct record based on the model
-    if model == 'inventory':
-        record = Inventory.query.get(record_id)
-        form = InventoryForm(obj=record)
-    elif model == 'flock':
-        record = Flock.query.get(record_id)
-        form = FlockForm(obj=record)
-    elif model == 'production':
-        record = Production.query.get(record_id)
-        form = ProductionForm(obj=record)
-    elif model == 'health_record':
-        record = HealthRecord.query.get(record_id)
-        form = HealthRecordForm(obj=record)
+    record_type = RECORD_TYPES.get(model)
+    record = record_type.load(record_id) if record_type else None
+    if record is None:
+        abort(404)
 
     # Render the modal form template for the record
-    return render_template('modal_form.html', form=form, model=model, record=record)
+    return render_template('modal_form.html', form=record_type.form(obj=record), model=model, record_id=record_id)
 
 
 @bp.route('/delete-record/<model>/<int:record_id>')
@@ -464,32 +502,28 @@ def edit_record_modal(model, record_id):
 @admin_required
 def delete_record(model, record_id):
     """
-        Delete a specific record based on the model type.
+        Delete a specific record based on the model type, with a single DELETE statement.
 
         Args:
-            model (str): The type of the model to delete (e.g., 'inventory', 'flock', 'production', 'health_record').
+            model (str): The type of the model to delete (a key of `RECORD_TYPES`, e.g. 'inventory', 'flock').
             record_id (int): The unique identifier of the record to be deleted.
 
         Returns:
             Redirect to the admin dashboard with a flash message indicating success or failure.
     """
-
-    # Retrieve the record based on the model type
-    if model == 'inventory':
-        record = Inventory.query.get(record_id)
-    elif model == 'production':
-        record = Production.query.get(record_id)
-    elif model == 'flock':
-        record = Flock.query.get(record_id)
-    elif model == 'health_record':
-        record = HealthRecord.query.get(record_id)
-    else:
+    record_type = RECORD_TYPES.get(model)
+    if record_type is None:
         flash("Invalid model.", 'danger')
         return redirect(url_for('main.admin_dashboard'))
 
     # Delete the record if found
-    if record:
-        db.session.delete(record)
+    try:
+        deleted = record_type.delete(record_id)
+    except stock.InsufficientStock as error:
+        db.session.rollback()
+        flash(f'The record was not deleted: {error}', 'danger')
+        return redirect(url_for('main.admin_dashboard'))
+    if deleted:
         db.session.commit()
         flash(f'{model} record has been deleted.', 'success')
     else:
@@ -498,122 +532,561 @@ def delete_record(model, record_id):
     return redirect(url_for('main.admin_dashboard'))
 
 
+def bulk_criteria(record_type, form):
+    """
+        Build the selection of a bulk action from the submitted IDs or listing filters.
+
+        Args:
+            record_type (RecordType): The record type acted on.
+            form (BulkActionForm): The submitted bulk action form.
+
+        Returns:
+            tuple: `(criteria, error)`; `criteria` is None and `error` a message when nothing is selected.
+    """
+    try:
+        if form.scope.data == 'selected':
+            criteria = record_type.selection(ids=parse_ids(request.form.getlist('ids')))
+        else:
+            criteria = record_type.selection(filters=ListingFilters.from_args(request.form))
+    except ValueError as error:
+        return None, str(error)
+    if not criteria:
+        return None, 'Select some records or set a filter first.'
+    return criteria, None
+
+
+@bp.route('/bulk/<model>', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def bulk_records(model):
+    """
+        Admin deletes, or sets one field of, many records with a single statement.
+
+        The records are the IDs checked on a listing page or every record matching its filters.
+        When the form carries the count shown by the preview, nothing is changed if the selection
+        no longer matches that many records.
+
+        Args:
+            model (str): The type of record to act on (a key of `RECORD_TYPES`).
+
+        Returns:
+            Rendered bulk action form for the modal on GET requests,
+            or redirect to the record listing with a message on submission.
+    """
+    record_type = RECORD_TYPES.get(model)
+    if record_type is None:
+        abort(404)
+    form = BulkActionForm()
+    form.field.choices = record_type.field_choices()
+    filters = ListingFilters.from_args(request.form if request.method == 'POST' else request.args)
+    if request.method == 'GET':
+        return render_template('bulk_form.html', form=form, model=model, filters=filters, record_type=record_type)
+
+    listing_url = url_for(record_type.endpoint, **filters.as_args())
+    if not form.validate_on_submit():
+        flash('Invalid bulk action.', 'danger')
+        return redirect(listing_url)
+    criteria, error = bulk_criteria(record_type, form)
+    if error:
+        flash(error, 'danger')
+        return redirect(listing_url)
+
+    if form.action.data == 'update':
+        value, errors = record_type.field_value(form.field.data, form.value.data)
+        if errors:
+            flash(f'Invalid value: {errors[0]}', 'danger')
+            return redirect(listing_url)
+        try:
+            changed = record_type.update_where(criteria, {form.field.data: value})
+        except IntegrityError:
+            db.session.rollback()
+            flash('The change would create duplicate records; nothing was updated.', 'danger')
+            return redirect(listing_url)
+        except stock.InsufficientStock as error:
+            db.session.rollback()
+            flash(f'Nothing was updated: {error}', 'danger')
+            return redirect(listing_url)
+        done = 'updated'
+    else:
+        try:
+            changed = record_type.delete_where(criteria)
+        except stock.InsufficientStock as error:
+            db.session.rollback()
+            flash(f'Nothing was deleted: {error}', 'danger')
+            return redirect(listing_url)
+        done = 'deleted'
+
+    if form.expected.data is not None and changed != form.expected.data:
+        db.session.rollback()
+        flash(f'The selection now matches {changed} records instead of the {form.expected.data} previewed; '
+              'nothing was changed. Preview again.', 'warning')
+        return redirect(listing_url)
+    db.session.commit()
+    flash(f'{changed} {record_type.label.lower()} records {done}.', 'success')
+    return redirect(listing_url)
+
+
+@bp.route('/bulk/<model>/preview', methods=['POST'])
+@login_required
+@admin_required
+def preview_bulk_records(model):
+    """
+        Count the records a bulk action would change, without changing them.
+
+        Args:
+            model (str): The type of record to act on (a key of `RECORD_TYPES`).
+
+        Returns:
+            JSON `{"model": ..., "count": n}`, or `{"error": ...}` with status 400.
+    """
+    record_type = RECORD_TYPES.get(model)
+    if record_type is None:
+        abort(404)
+    form = BulkActionForm()
+    form.field.choices = record_type.field_choices()
+    if not form.validate_on_submit():
+        return jsonify({'error': 'Invalid bulk action.', 'errors': form.errors}), 400
+    criteria, error = bulk_criteria(record_type, form)
+    if error:
+        return jsonify({'error': error}), 400
+    return jsonify({'model': model, 'count': record_type.count(criteria)})
+
+
+def render_listing(slug, template):
+    """
+        Render one page of a keyset-paginated record listing.
+
+        Args:
+            slug (str): The listing key in `LISTINGS` (e.g., 'inventory', 'production').
+            template (str): The template used to render the page.
+
+        Returns:
+            Rendered template with the page, the active filters and the worker filter choices.
+    """
+    filters = ListingFilters.from_args(request.args)
+    page = LISTINGS[slug].paginate(filters, after=request.args.get('after'), before=request.args.get('before'))
+    workers = db.session.query(User.id, User.username).order_by(User.username).all()
+    return render_template(template, page=page, filters=filters, workers=workers, model=slug)
+
+
+@bp.route('/export/<model>')
+@login_required
+@admin_required
+def export_records(model):
+    """
+        Admin-only export. Stream the filtered records of one model as CSV or NDJSON.
+
+        Args:
+            model (str): The type of record to export (e.g., 'inventory', 'production').
+
+        Returns:
+            Chunked response streaming the export as an attachment.
+    """
+    file_format = request.args.get('format', 'csv')
+    if model not in LISTINGS:
+        abort(404)
+    if file_format not in EXPORT_FORMATS:
+        abort(400)
+
+    export = RecordExport(model, ListingFilters.from_args(request.args))
+    response = Response(stream_with_context(export.iter_chunks(file_format)), mimetype=export.mimetype(file_format))
+    response.headers['Content-Disposition'] = f'attachment; filename="{export.filename(file_format)}"'
+    return response
+
+
 @bp.route('/view-inventory')
 @login_required
 @admin_required
+@response_cache.cached('inventory', 'user', store=False, per_user=True)
 def view_inventory():
     """
-        Display all inventory records along with the worker who entered each record.
+        Display a page of inventory records along with the worker who entered each record.
 
         Returns:
-            Rendered template showing all inventory records.
+            Rendered template showing the requested page of inventory records.
     """
-    inventories = Inventory.query.all()
-    return render_template('view_inventory.html', inventories=inventories)
+    return render_listing('inventory', 'view_inventory.html')
 
 
 @bp.route('/view-flock')
 @login_required
 @admin_required
+@response_cache.cached('flock', 'user', store=False, per_user=True)
 def view_flock():
     """
-        Display all flock records along with the worker who entered each record.
+        Display a page of flock records along with the worker who entered each record.
 
         Returns:
-            Rendered template showing all flock records.
+            Rendered template showing the requested page of flock records.
     """
-    flocks = db.session.query(Flock, User).join(User).all()
-    return render_template('view_flock.html', flocks=flocks)
+    return render_listing('flock', 'view_flock.html')
 
 
 @bp.route('/view-production')
 @login_required
 @admin_required
+@response_cache.cached('production', 'user', store=False, per_user=True)
 def view_production():
     """
-       Display all production records along with the worker who added them.
+       Display a page of production records along with the worker who added them.
 
        Returns:
-           Rendered template showing all production records.
+           Rendered template showing the requested page of production records.
     """
-    # Query all production records along with the associated worker who added them
-    productions = db.session.query(Production, User).join(User).all()
-    return render_template('view_production.html', productions=productions)
+    return render_listing('production', 'view_production.html')
 
 
 @bp.route('/view-health_record')
 @login_required
 @admin_required
+@response_cache.cached('health_record', 'user', store=False, per_user=True)
 def view_health_record():
     """
-        Display all health records along with the worker who entered each record.
+        Display a page of health records along with the worker who entered each record.
+
+        Returns:
+            Rendered template showing the requested page of health records.
+    """
+    return render_listing('health_record', 'view_health_records.html')
+
+
+def stock_history_args():
+    """
+        Parse the stock history query parameters of the current request.
 
         Returns:
-            Rendered template showing all health records.
+            tuple: `(date_from, date_to, limit)`; malformed dates are ignored.
     """
-    health_records = HealthRecord.query.all()
-    return render_template('view_health_records.html', health_records=health_records)
+    return (parse_date(request.args.get('from')), parse_date(request.args.get('to')),
+            request.args.get('limit', stock.DEFAULT_HISTORY_LIMIT, type=int))
+
+
+@bp.route('/stock')
+@login_required
+@admin_required
+@response_cache.cached('stock', store=False, per_user=True)
+def stock_levels():
+    """
+        Display the quantity on hand and the FIFO and average-cost value of every stocked item.
+
+        Query parameters:
+            category: Optional inventory category.
+
+        Returns:
+            Rendered template listing the stocked items.
+    """
+    category = request.args.get('category') or None
+    return render_template('stock.html', items=stock.stock_levels(category), category=category,
+                           categories=[choice for choice, _ in InventoryForm.category.kwargs['choices']])
+
+
+@bp.route('/stock/<int:item_id>')
+@login_required
+@admin_required
+@response_cache.cached('stock', store=False, per_user=True)
+def stock_item(item_id):
+    """
+        Display one item's stock ledger with the running balance after each movement.
+
+        Args:
+            item_id (int): The stock item.
+
+        Query parameters:
+            from, to: Optional inclusive date range (YYYY-MM-DD).
+            limit: Maximum number of movements (newest first).
+
+        Returns:
+            Rendered template with the item, its movements and the movement form.
+    """
+    item = StockItem.query.get_or_404(item_id)
+    date_from, date_to, limit = stock_history_args()
+    return render_template('stock_item.html', item=item, form=StockMovementForm(), date_from=date_from,
+                           date_to=date_to, movements=stock.history(item_id, date_from, date_to, limit))
+
+
+@bp.route('/stock/<int:item_id>/movements', methods=['POST'])
+@login_required
+@admin_required
+def post_stock_movement(item_id):
+    """
+        Post a consumption or an adjustment to an item's stock ledger.
+
+        Args:
+            item_id (int): The stock item.
+
+        Returns:
+            Redirect to the item's ledger with a success or error message.
+    """
+    item = StockItem.query.get_or_404(item_id)
+    form = StockMovementForm()
+    if form.validate_on_submit():
+        quantity = form.quantity.data
+        entry = {'kind': form.kind.data, 'quantity': -quantity if form.kind.data == 'consumption' else quantity,
+                 'unit_cost': form.unit_cost.data, 'note': form.note.data or None, 'user_id': current_user.id,
+                 'created_by_username': current_user.username}
+        try:
+            stock.post(db.session.connection(), item.id, [entry])
+            db.session.commit()
+            flash(f'{form.kind.data.capitalize()} of {item.name} posted successfully', 'success')
+        except stock.InsufficientStock as error:
+            db.session.rollback()
+            flash(str(error), 'danger')
+    else:
+        for field, errors in form.errors.items():
+            for error in errors:
+                flash(f"Error in {getattr(form, field).label.text}: {error}", 'danger')
+    return redirect(url_for('main.stock_item', item_id=item_id))
+
+
+@bp.route('/api/stock')
+@login_required
+@admin_required
+@response_cache.cached('stock')
+def stock_data():
+    """
+        API endpoint returning the current stock and value of every item.
+
+        Query parameters:
+            category: Optional inventory category.
+
+        Returns:
+            JSON response `{"items": [...]}` with each item's quantity on hand, FIFO and average-cost value.
+    """
+    items = stock.stock_levels(request.args.get('category') or None)
+    return jsonify({'items': [serialize(item) for item in items]})
+
+
+@bp.route('/api/stock/<int:item_id>/movements')
+@login_required
+@admin_required
+@response_cache.cached('stock')
+def stock_movements_data(item_id):
+    """
+        API endpoint returning one item's movements over a date range, newest first.
+
+        Args:
+            item_id (int): The stock item.
+
+        Query parameters:
+            from, to, limit: As for the item's ledger page.
+
+        Returns:
+            JSON response with the item and its movements, each with the running balance after it.
+    """
+    item = StockItem.query.get_or_404(item_id)
+    movements = stock.history(item_id, *stock_history_args())
+    return jsonify({'item': serialize(item), 'movements': [serialize(movement) for movement in movements]})
+
+
+def search_kinds():
+    """Record types selected with the `kind` query parameter; empty means every type."""
+    return [kind for kind in request.args.getlist('kind') if kind in SEARCH_SOURCES]
+
+
+@bp.route('/search')
+@login_required
+@admin_required
+@response_cache.cached('health_record', 'flock', 'inventory', store=False, per_user=True)
+def search_records():
+    """
+        Display ranked full-text search results across health records, flocks and inventory.
+
+        Query parameters:
+            q: The search string; every word must start a word of the record.
+            kind: Optional record types to search (repeatable).
+            page: The 1-based results page.
+
+        Returns:
+            Rendered template showing the requested page of results.
+    """
+    results = search(request.args.get('q', ''), kinds=search_kinds(), page=request.args.get('page', 1, type=int))
+    return render_template('search.html', results=results, kinds=search_kinds(), sources=SEARCH_SOURCES)
+
+
+@bp.route('/api/search')
+@login_required
+@admin_required
+@response_cache.cached('health_record', 'flock', 'inventory')
+def search_data():
+    """
+        API endpoint returning one page of ranked full-text search results.
+
+        Query parameters:
+            q, kind, page: As for the search page.
+            per_page: Results per page (at most 100).
+
+        Returns:
+            JSON response with the query, the page and its results, best match first.
+    """
+    results = search(request.args.get('q', ''), kinds=search_kinds(), page=request.args.get('page', 1, type=int),
+                     per_page=request.args.get('per_page', 20, type=int))
+    return jsonify(results.to_dict())
+
+
+@bp.route('/api/search/suggest')
+@login_required
+@admin_required
+@response_cache.cached('health_record', 'flock', 'inventory')
+def search_suggestions():
+    """
+        API endpoint offering typeahead values for a partial search string.
+
+        Query parameters:
+            q: What the admin has typed so far.
+
+        Returns:
+            JSON response `{"query": ..., "suggestions": [...]}`.
+    """
+    text = request.args.get('q', '')
+    return jsonify({'query': text, 'suggestions': suggest(text)})
+
+
+def chart_params():
+    """
+        Parse the chart query parameters of the current request.
+
+        Returns:
+            ChartParams: The parsed parameters; aborts with 400 on an unknown bucket.
+    """
+    try:
+        return ChartParams.from_args(request.args)
+    except ValueError:
+        abort(400)
+
+
+@bp.route('/api/pool-stats')
+@login_required
+@admin_required
+def pool_stats():
+    """
+        Admin-only connection pool metrics for this worker process.
+
+        Returns:
+            JSON pool occupancy gauges and checkout/wait counters.
+    """
+    return jsonify(pool_metrics.snapshot(db.engine))
+
+
+@bp.route('/metrics')
+def metrics():
+    """
+        Prometheus scrape endpoint: request latency, pool, cache and farm KPI metrics of every worker.
+
+        Scrapers authenticate with `Authorization: Bearer <METRICS_TOKEN>`; logged-in admins can
+        read it without a token.
+
+        Returns:
+            The metrics in the Prometheus text exposition format.
+    """
+    token = current_app.config['METRICS_TOKEN']
+    presented = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not (token and hmac.compare_digest(presented, token)):
+        if not current_user.is_authenticated:
+            abort(401)
+        if not current_user.is_admin():
+            abort(403)
+    return Response(request_metrics.render(farm_kpis()), content_type=METRICS_CONTENT_TYPE)
 
 
 @bp.route('/api/production-data')
 @login_required
 @admin_required
+@response_cache.cached('production')
 def production_data():
     """
         API endpoint to retrieve production data for charting.
 
+        Query parameters:
+            bucket: 'day', 'week' or 'month' (default 'day').
+            from, to: Optional inclusive date range (YYYY-MM-DD).
+            points: Maximum number of buckets returned (most recent first kept).
+
         Returns:
-            JSON response containing dates and the number of eggs collected.
+            JSON response containing bucket labels, eggs collected and eggs sold per bucket.
     """
-    productions = Production.query.all()
-    data = {
-        "labels": [p.date_collected.strftime("%Y-%m-%d") for p in productions],
-        "data": [p.number_eggs_collected for p in productions]
-    }
-    return jsonify(data)
+    return jsonify(production_series(chart_params()))
 
 
 @bp.route('/api/health-record-data')
 @login_required
 @admin_required
+@response_cache.cached('health_record')
 def health_record_data():
     """
             API endpoint to retrieve health record data for charting.
 
+            Query parameters:
+                from, to: Optional inclusive date range (YYYY-MM-DD).
+                points: Maximum number of symptoms returned.
+
             Returns:
                 JSON response containing symptoms and their counts.
     """
-    records = HealthRecord.query.all()
-    symptoms = {}
-    for record in records:
-        symptom = record.symptom
-        symptoms[symptom] = symptoms.get(symptom, 0) + 1
-
-    data = {
-        "labels": list(symptoms.keys()),
-        "data": list(symptoms.values())
-    }
-    return jsonify(data)
+    return jsonify(symptom_counts(chart_params()))
 
 
 @bp.route('/api/flock-data')
 @login_required
 @admin_required
+@response_cache.cached('flock')
 def flock_data():
     """
         API endpoint to retrieve flock data for charting.
 
+        Query parameters:
+            from, to: Optional inclusive entry date range (YYYY-MM-DD).
+            points: Maximum number of breeds returned.
+
         Returns:
             JSON response containing breeds and their quantities.
     """
-    flocks = Flock.query.all()
-    breeds = {}
-    for flock in flocks:
-        breed = flock.breed
-        breeds[breed] = breeds.get(breed, 0) + flock.quantity
-
-    data = {
-        "labels": list(breeds.keys()),
-        "data": list(breeds.values())
-    }
-    return jsonify(data)
+    return jsonify(breed_quantities(chart_params()))
+
+
+@bp.route('/api/flock-analytics')
+@login_required
+@admin_required
+@response_cache.cached('flock', 'production')
+def flock_analytics_data():
+    """
+        API endpoint summarizing live birds, deaths, sales and mortality per breed.
+
+        Query parameters:
+            from, to: Optional inclusive entry date range (YYYY-MM-DD); live birds are counted as of `to`.
+            points: Maximum number of breeds returned.
+
+        Returns:
+            JSON response with breeds, their live birds, entered, deaths, sold and mortality rate (%),
+            and the hen-day egg production of the range.
+    """
+    params = chart_params()
+    snapshot = flock_analytics.snapshot()
+    breeds = snapshot.breed_summary(params.date_from, params.date_to)[:params.points]
+    return jsonify({
+        "labels": [entry['breed'] for entry in breeds],
+        "live": [entry['live'] for entry in breeds],
+        "entered": [entry['entered'] for entry in breeds],
+        "deaths": [entry['deaths'] for entry in breeds],
+        "sold": [entry['sold'] for entry in breeds],
+        "mortality_rate": [entry['mortality_rate'] for entry in breeds],
+        "hen_day": snapshot.hen_day_rate(params.date_from, params.date_to)
+    })
+
+
+@bp.route('/api/hen-day-production')
+@login_required
+@admin_required
+@response_cache.cached('flock', 'production')
+def hen_day_production_data():
+    """
+        API endpoint to retrieve hen-day egg production for charting.
+
+        Query parameters:
+            bucket: 'day', 'week' or 'month' (default 'day').
+            from, to: Optional inclusive date range (YYYY-MM-DD).
+            points: Maximum number of buckets returned (most recent first kept).
+
+        Returns:
+            JSON response containing bucket labels, hen-day production (%), eggs and hen-days per bucket.
+    """
+    return jsonify(flock_analytics.snapshot().hen_day_series(chart_params()))
@@ -0,0 +1,437 @@
+"""
+Bulk Record Import
+
+This module imports production, flock, health and inventory records from CSV, NDJSON or
+JSON-array files. Rows are parsed as a stream, validated with the same WTForms classes the
+entry forms use (one form instance is re-processed per row), and the valid rows are inserted
+with batched `executemany` inserts inside a single transaction. Rows that fail validation, or
+that duplicate the unique key of an existing or earlier row, are reported with their line
+number and errors instead of aborting the import.
+
+Because the inserts bypass the ORM unit of work, the dimension foreign keys of symptoms,
+medications and breeds, the daily rollups, the stock ledger postings of inventory purchases
+and the response cache generation are set explicitly in the same transaction.
+
+Usage:
+    flask import-records production backfill.csv --user farm_owner
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import UniqueConstraint, insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from werkzeug.datastructures import MultiDict
+from wtforms import DateField
+
+from poultry_manager import db
+from poultry_manager.forms import InventoryForm, ProductionForm, FlockForm, HealthRecordForm
+from poultry_manager.models.user import User
+from poultry_manager.models.inventory import Inventory
+from poultry_manager.models.production import Production
+from poultry_manager.models.flock import Flock
+from poultry_manager.models.health_record import HealthRecord
+from poultry_manager.services.dimensions import canonicalize
+from poultry_manager.services.rollups import SPECS, add_delta, apply_deltas
+from poultry_manager.services.response_cache import ResponseCache
+from poultry_manager.services.stock import post_purchases
+
+FORMATS = ('csv', 'ndjson', 'json')
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+# Model slug -> (model, form class validating one row)
+IMPORTERS = {
+    'inventory': (Inventory, InventoryForm),
+    'production': (Production, ProductionForm),
+    'flock': (Flock, FlockForm),
+    'health_record': (HealthRecord, HealthRecordForm),
+}
+
+
+def detect_format(filename):
+    """
+        Guess the file format from a file name.
+
+        Args:
+            filename (str): The uploaded or local file name.
+
+        Returns:
+            str: One of `FORMATS`, defaulting to 'csv'.
+    """
+    extension = (filename or '').rsplit('.', 1)[-1].lower()
+    if extension in ('ndjson', 'jsonl'):
+        return 'ndjson'
+    if extension == 'json':
+        return 'json'
+    return 'csv'
+
+
+def iter_rows(stream, file_format):
+    """
+        Stream rows out of a text file.
+
+        Args:
+            stream (TextIO): The text stream to read.
+            file_format (str): One of `FORMATS`.
+
+        Yields:
+            tuple: `(line or item number, dict of raw values)`.
+
+        Raises:
+            ValueError: If the format is unknown or the JSON is malformed.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif file_format == 'ndjson':
+        for number, line in enumerate(stream, start=1):
+            if line.strip():
+                yield number, json.loads(line)
+    elif file_format == 'json':
+        yield from enumerate(_iter_json_array(stream), start=1)
+    else:
+        raise ValueError(f"Invalid format: {file_format}")
+
+
+def _iter_json_array(stream, chunk_size=65536):
+    """Incrementally decode the objects of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    eof = False
+    while True:
+        buffer = buffer.lstrip()
+        if not started and buffer:
+            if buffer[0] != '[':
+                raise ValueError('Expected a JSON array of records')
+            buffer, started = buffer[1:], True
+            continue
+        if started and buffer[:1] == ',':
+            buffer = buffer[1:]
+            continue
+        if started and buffer[:1] == ']':
+            return
+        if buffer:
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError('Malformed JSON array')
+            else:
+                yield item
+                buffer = buffer[end:]
+                continue
+        if eof:
+            raise ValueError('Unexpected end of JSON array')
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+
+
+def parse_datetime(value):
+    """
+        Parse an ISO 8601 date and time, e.g. `2024-03-01T09:00:00` as written by the exports.
+
+        Args:
+            value (str): The raw value.
+
+        Returns:
+            datetime: The naive datetime, or None if the value is a plain date, has a time zone or is malformed.
+    """
+    if len(value) <= len('YYYY-MM-DD'):
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return moment if moment.tzinfo is None else None
+
+
+class ImportReport:
+    """
+        Outcome of a bulk import.
+
+        Attributes:
+            model (str): The imported model slug.
+            total (int): Number of rows read.
+            inserted (int): Number of rows inserted.
+            errors (list): Up to `MAX_REPORTED_ERRORS` dicts of `{'row': n, 'errors': {field: [messages]}}`.
+            error_count (int): Total number of rejected rows.
+            committed (bool): Whether the transaction was committed.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.total = 0
+        self.inserted = 0
+        self.errors = []
+        self.error_count = 0
+        self.committed = False
+
+    def reject(self, row, errors):
+        """Record a rejected row."""
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row, 'errors': errors})
+
+    def to_dict(self):
+        """Serialize the report for JSON responses."""
+        return {
+            'model': self.model,
+            'total': self.total,
+            'inserted': self.inserted,
+            'rejected': self.error_count,
+            'committed': self.committed,
+            'errors': self.errors
+        }
+
+
+class RecordImporter:
+    """
+        Validates and inserts rows for one record model.
+
+        Attributes:
+            slug (str): The model slug (a key of `IMPORTERS`).
+            model (BaseModel): The model rows are inserted into.
+            user (User): The user the records are attributed to, or None.
+            batch_size (int): Rows per `executemany` insert.
+            strict (bool): Insert nothing if any row is rejected.
+    """
+
+    def __init__(self, slug, user=None, batch_size=DEFAULT_BATCH_SIZE, strict=False):
+        if slug not in IMPORTERS:
+            raise ValueError(f"Invalid model: {slug}")
+        self.slug = slug
+        self.model, form_class = IMPORTERS[slug]
+        self.user = user
+        self.batch_size = max(1, batch_size)
+        self.strict = strict
+        self.spec = SPECS.get(self.model)
+        self.form = form_class(formdata=MultiDict(), meta={'csrf': False})
+        columns = set(self.model.__table__.columns.keys())
+        self.fields = [field.name for field in self.form if field.name in columns]
+        self.date_fields = {field.name for field in self.form if field.name in columns and isinstance(field, DateField)}
+        # Column tuples of the model's unique constraints (e.g. item_name and purchase_date of inventory)
+        self.unique_keys = [tuple(column.name for column in constraint.columns)
+                            for constraint in self.model.__table__.constraints
+                            if isinstance(constraint, UniqueConstraint)]
+
+    def validate(self, raw):
+        """
+            Validate one raw row with the model's form.
+
+            Args:
+                raw (dict): Field name to raw value.
+
+            Returns:
+                tuple: `(values, None)` for a valid row or `(None, errors)` for an invalid one.
+        """
+        # JSON and NDJSON items can be any JSON value, not only objects
+        if not isinstance(raw, dict):
+            return None, {'__all__': ['Expected a JSON object']}
+        # Blank cells are left out so that field defaults (e.g. eggs_sold=0) apply
+        formdata = MultiDict({key: str(value) for key, value in raw.items()
+                              if key in self.fields and value not in (None, '')})
+        # ISO datetimes (as exported) are validated by their date and imported with their time
+        moments = {}
+        for name in self.date_fields & formdata.keys():
+            moment = parse_datetime(formdata[name])
+            if moment is not None:
+                moments[name] = moment
+                formdata[name] = moment.date().isoformat()
+        self.form.process(formdata=formdata)
+        if not self.form.validate():
+            return None, {name: list(messages) for name, messages in self.form.errors.items()}
+
+        values = {}
+        for name in self.fields:
+            value = self.form[name].data
+            if name in moments:
+                value = moments[name]
+            elif isinstance(value, date) and not isinstance(value, datetime):
+                value = datetime.combine(value, datetime.min.time())
+            values[name] = value
+        if self.user is not None:
+            values['user_id'] = self.user.id
+            values['created_by_username'] = self.user.username
+        return values, None
+
+    def run(self, rows):
+        """
+            Import rows in batches inside one transaction.
+
+            Args:
+                rows (iterable): `(row number, raw dict)` pairs, e.g. from `iter_rows`.
+
+            Returns:
+                ImportReport: The import outcome.
+        """
+        report = ImportReport(self.slug)
+        batch = []
+        try:
+            for number, raw in rows:
+                report.total += 1
+                values, errors = self.validate(raw)
+                if errors:
+                    report.reject(number, errors)
+                    continue
+                batch.append((number, values))
+                if len(batch) >= self.batch_size:
+                    report.inserted += self._insert(self._drop_duplicates(batch, report))
+                    batch = []
+            if batch:
+                report.inserted += self._insert(self._drop_duplicates(batch, report))
+        except (IntegrityError, ValueError) as error:
+            db.session.rollback()
+            report.inserted = 0
+            report.reject(report.total, {'__all__': [str(getattr(error, 'orig', error))]})
+            return report
+
+        if self.strict and report.error_count:
+            db.session.rollback()
+            report.inserted = 0
+            return report
+
+        db.session.commit()
+        report.committed = True
+        return report
+
+    def duplicates(self, batch):
+        """
+            Find the rows of a batch that would violate a unique constraint.
+
+            A row is a duplicate if an earlier row of the batch or an existing record (including
+            rows already inserted in the current transaction) has the same unique key values.
+
+            Args:
+                batch (list): `(row number, values)` pairs of validated rows.
+
+            Returns:
+                dict: Row number to error message, in row order.
+        """
+        table = self.model.__table__
+        duplicates = {}
+        for names in self.unique_keys:
+            # Rows with a NULL in the key never conflict
+            keys = {}
+            for number, values in batch:
+                key = tuple(values.get(name) for name in names)
+                if None not in key:
+                    keys.setdefault(key, []).append(number)
+            if not keys:
+                continue
+            columns = [table.c[name] for name in names]
+            existing = set(db.session.execute(select(*columns).where(tuple_(*columns).in_(list(keys)))).all())
+            message = f"Duplicate {', '.join(names)}"
+            for key, numbers in keys.items():
+                for number in (numbers if key in existing else numbers[1:]):
+                    duplicates.setdefault(number, message)
+        return {number: duplicates[number] for number in sorted(duplicates)}
+
+    def _drop_duplicates(self, batch, report):
+        """
+            Reject the rows of a batch that would violate a unique constraint (see `duplicates`).
+
+            Args:
+                batch (list): `(row number, values)` pairs.
+                report (ImportReport): The report the duplicates are rejected in.
+
+            Returns:
+                list: The values of the remaining rows.
+        """
+        duplicates = self.duplicates(batch)
+        for number, message in duplicates.items():
+            report.reject(number, {'__all__': [message]})
+        return [values for number, values in batch if number not in duplicates]
+
+    def _insert(self, batch):
+        """Insert one batch with a single executemany, fold it into the rollups and invalidate cached responses."""
+        if not batch:
+            return 0
+        connection = db.session.connection()
+        canonicalize(connection, self.model, batch)
+        if self.model is Inventory:
+            # The purchases are posted to the stock ledger under their new IDs
+            ids = db.session.execute(
+                insert(Inventory).returning(Inventory.id, sort_by_parameter_order=True), batch
+            ).scalars().all()
+            post_purchases(connection, [dict(values, id=record_id) for values, record_id in zip(batch, ids)])
+        else:
+            db.session.execute(insert(self.model), batch)
+        if self.spec is not None:
+            deltas = {}
+            for values in batch:
+                add_delta(deltas, self.spec, values, 1)
+            apply_deltas(connection, deltas)
+        ResponseCache.bump(connection, [self.slug])
+        return len(batch)
+
+
+def import_stream(slug, stream, file_format, user=None, batch_size=DEFAULT_BATCH_SIZE, strict=False):
+    """
+        Import records of one model from a text stream.
+
+        Args:
+            slug (str): The model slug (a key of `IMPORTERS`).
+            stream (TextIO): The text stream to read.
+            file_format (str): One of `FORMATS`.
+            user (User): The user the records are attributed to, or None.
+            batch_size (int): Rows per `executemany` insert.
+            strict (bool): Insert nothing if any row is rejected.
+
+        Returns:
+            ImportReport: The import outcome.
+    """
+    importer = RecordImporter(slug, user=user, batch_size=batch_size, strict=strict)
+    return importer.run(iter_rows(stream, file_format))
+
+
+def import_upload(slug, upload, user=None, strict=False):
+    """
+        Import records from an uploaded file (a werkzeug `FileStorage`).
+
+        Args:
+            slug (str): The model slug (a key of `IMPORTERS`).
+            upload (FileStorage): The uploaded file.
+            user (User): The user the records are attributed to.
+            strict (bool): Insert nothing if any row is rejected.
+
+        Returns:
+            ImportReport: The import outcome.
+    """
+    stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+    return import_stream(slug, stream, detect_format(upload.filename), user=user, strict=strict)
+
+
+@click.command('import-records')
+@click.argument('model', type=click.Choice(sorted(IMPORTERS)))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(FORMATS), help='File format (default: from extension).')
+@click.option('--user', 'username', help='Username the records are attributed to.')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, help='Rows per insert statement.')
+@click.option('--strict', is_flag=True, help='Insert nothing if any row is rejected.')
+@with_appcontext
+def import_command(model, path, file_format, username, batch_size, strict):
+    """Import MODEL records from the file at PATH."""
+    user = None
+    if username:
+        user = User.query.filter_by(username=username).first()
+        if user is None:
+            raise click.ClickException(f"User '{username}' not found.")
+
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        report = import_stream(model, stream, file_format or detect_format(path), user=user,
+                               batch_size=batch_size, strict=strict)
+
+    for error in report.errors:
+        click.echo(f"row {error['row']}: {error['errors']}", err=True)
+    click.echo(f"{report.inserted} of {report.total} {model} rows imported, {report.error_count} rejected"
+               + ('' if report.committed else ' (nothing committed)'))
+    if not report.committed:
+        raise SystemExit(1)
@@ -0,0 +1,187 @@
+"""
+Chart Aggregations
+
+This module builds the series served by the `/api/*` chart endpoints with `GROUP BY`
+aggregates over the daily rollup tables (see `poultry_manager.models.rollup`), so the
+database sums O(days) rows instead of Python looping over every ORM row. Symptoms and breeds
+are grouped on their integer dimension keys and only the returned groups are joined to
+their names; all-time symptom counts are read from the maintained dimension counters. Time series
+are bucketed by day, week or month, every query accepts a `from`/`to` date range, and
+the number of returned points is capped server-side, so the response size and query time
+follow the chart resolution rather than the table size.
+
+Usage:
+    params = ChartParams.from_args(request.args)
+    jsonify(production_series(params))
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import Date, func, select
+
+from poultry_manager import db
+from poultry_manager.models.dimension import Symptom, Breed
+from poultry_manager.models.rollup import DailyProduction, DailyFlockStock, DailySymptomCases
+from poultry_manager.services.listing import parse_date
+
+BUCKETS = ('day', 'week', 'month')
+DEFAULT_BUCKET = 'day'
+DEFAULT_POINTS = 90
+MAX_POINTS = 366
+
+
+class ChartParams:
+    """
+        Query parameters shared by the chart endpoints.
+
+        Attributes:
+            bucket (str): Time bucket for series charts, one of `BUCKETS`.
+            date_from (date): Inclusive lower bound on the record date.
+            date_to (date): Inclusive upper bound on the record date.
+            points (int): Maximum number of points (or categories) returned, at most `MAX_POINTS`.
+    """
+
+    def __init__(self, bucket=DEFAULT_BUCKET, date_from=None, date_to=None, points=DEFAULT_POINTS):
+        if bucket not in BUCKETS:
+            raise ValueError(f"Invalid bucket: {bucket}")
+        self.bucket = bucket
+        self.date_from = date_from
+        self.date_to = date_to
+        self.points = max(1, min(points, MAX_POINTS))
+
+    @classmethod
+    def from_args(cls, args):
+        """
+            Build chart parameters from a request's query string.
+
+            Args:
+                args (MultiDict): The request arguments (`bucket`, `from`, `to`, `points`).
+
+            Returns:
+                ChartParams: The parsed parameters.
+
+            Raises:
+                ValueError: If the bucket is not one of `BUCKETS`.
+        """
+        return cls(
+            bucket=args.get('bucket', DEFAULT_BUCKET),
+            date_from=parse_date(args.get('from')),
+            date_to=parse_date(args.get('to')),
+            points=args.get('points', DEFAULT_POINTS, type=int)
+        )
+
+    def apply_range(self, statement, column):
+        """
+            Restrict a statement to the requested date range.
+
+            Args:
+                statement (Select): The statement to filter.
+                column (Column): The date or datetime column the range applies to.
+
+            Returns:
+                Select: The filtered statement.
+        """
+        if isinstance(column.type, Date):
+            lower, upper = self.date_from, self.date_to and self.date_to + timedelta(days=1)
+        else:
+            lower = self.date_from and datetime.combine(self.date_from, datetime.min.time())
+            upper = self.date_to and datetime.combine(self.date_to + timedelta(days=1), datetime.min.time())
+        if lower:
+            statement = statement.where(column >= lower)
+        if upper:
+            statement = statement.where(column < upper)
+        return statement
+
+
+def bucket_label(column, bucket):
+    """
+        Build a SQL expression truncating a date column to a `YYYY-MM-DD` bucket label.
+
+        Weeks start on Monday and are labelled by that Monday; months are labelled by their
+        first day. SQLite uses `strftime`/`date` modifiers, other databases `date_trunc`.
+
+        Args:
+            column (Column): The date or datetime column to bucket.
+            bucket (str): One of `BUCKETS`.
+
+        Returns:
+            ColumnElement: The bucket label expression.
+    """
+    if db.session.get_bind().dialect.name == 'sqlite':
+        if bucket == 'week':
+            return func.date(column, '-6 days', 'weekday 1')
+        if bucket == 'month':
+            return func.strftime('%Y-%m-01', column)
+        return func.date(column)
+    return func.to_char(func.date_trunc(bucket, column), 'YYYY-MM-DD')
+
+
+def production_series(params):
+    """
+        Eggs collected and sold per time bucket, oldest first.
+
+        When more buckets exist than `params.points`, the most recent ones are returned.
+
+        Args:
+            params (ChartParams): The chart parameters.
+
+        Returns:
+            dict: `labels`, `data` (eggs collected), `sold` and the `bucket` used.
+    """
+    label = bucket_label(DailyProduction.day, params.bucket).label('bucket')
+    statement = select(label, func.sum(DailyProduction.eggs_collected), func.sum(DailyProduction.eggs_sold))
+    statement = params.apply_range(statement, DailyProduction.day)
+    statement = statement.group_by(label).order_by(label.desc()).limit(params.points)
+    rows = list(reversed(db.session.execute(statement).all()))
+    return {
+        "labels": [row[0] for row in rows],
+        "data": [int(row[1]) for row in rows],
+        "sold": [int(row[2]) for row in rows],
+        "bucket": params.bucket
+    }
+
+
+def symptom_counts(params):
+    """
+        Number of health records per symptom, most frequent first.
+
+        Args:
+            params (ChartParams): The chart parameters; `points` caps the number of symptoms.
+
+        Returns:
+            dict: `labels` (symptoms) and `data` (record counts).
+    """
+    if params.date_from is None and params.date_to is None:
+        statement = select(Symptom.name, Symptom.records).where(Symptom.records > 0)
+        statement = statement.order_by(Symptom.records.desc(), Symptom.name)
+    else:
+        totals = select(DailySymptomCases.symptom_id, func.sum(DailySymptomCases.records).label('total'))
+        totals = params.apply_range(totals, DailySymptomCases.day).group_by(DailySymptomCases.symptom_id).subquery()
+        statement = (select(Symptom.name, totals.c.total).join(totals, totals.c.symptom_id == Symptom.id)
+                     .order_by(totals.c.total.desc(), Symptom.name))
+    rows = db.session.execute(statement.limit(params.points)).all()
+    return {
+        "labels": [row[0] for row in rows],
+        "data": [int(row[1]) for row in rows]
+    }
+
+
+def breed_quantities(params):
+    """
+        Total flock quantity per breed, largest first.
+
+        Args:
+            params (ChartParams): The chart parameters; `points` caps the number of breeds.
+
+        Returns:
+            dict: `labels` (breeds) and `data` (summed quantities).
+    """
+    totals = select(DailyFlockStock.breed_id, func.sum(DailyFlockStock.quantity).label('total'))
+    totals = params.apply_range(totals, DailyFlockStock.day).group_by(DailyFlockStock.breed_id).subquery()
+    statement = (select(Breed.name, totals.c.total).join(totals, totals.c.breed_id == Breed.id)
+                 .order_by(totals.c.total.desc(), Breed.name))
+    rows = db.session.execute(statement.limit(params.points)).all()
+    return {
+        "labels": [row[0] for row in rows],
+        "data": [int(row[1]) for row in rows]
+    }
@@ -0,0 +1,93 @@
+"""
+Admin Dashboard Summary
+
+This module computes the figures shown on the admin dashboard with aggregate SQL.
+Record counts and KPI totals are gathered in a single statement built from scalar
+subqueries over the daily rollup tables, and the "latest entries" panels fetch only the
+handful of columns they display, so a dashboard hit costs a few indexed queries instead
+of materializing every row of every table as ORM objects.
+
+Usage:
+    summary = DashboardSummary.build()
+    summary.counts['production'], summary.totals['eggs_collected'], summary.latest_production
+"""
+
+from sqlalchemy import func, select
+
+from poultry_manager import db
+from poultry_manager.models.user import User, RoleEnum
+from poultry_manager.models.inventory import Inventory
+from poultry_manager.models.production import Production
+from poultry_manager.models.health_record import HealthRecord
+from poultry_manager.models.rollup import DailyProduction, DailyFlockStock, DailySymptomCases
+
+LATEST_ROWS = 5
+
+
+def _scalar(statement, name):
+    """Wrap an aggregate select as a labelled scalar subquery."""
+    return statement.scalar_subquery().label(name)
+
+
+def _total(column):
+    """Sum a rollup column, treating an empty table as zero."""
+    return func.coalesce(func.sum(column), 0)
+
+
+class DashboardSummary:
+    """
+        Figures rendered on the admin dashboard.
+
+        Attributes:
+            counts (dict): Number of workers and of records per table.
+            totals (dict): KPI totals (eggs collected and sold, live birds, sick birds).
+            latest_production (list): The most recent production rows (date, collected, sold, entered by).
+            latest_health_records (list): The most recent health rows (date, symptom, number sick, entered by).
+    """
+
+    def __init__(self, counts, totals, latest_production, latest_health_records):
+        self.counts = counts
+        self.totals = totals
+        self.latest_production = latest_production
+        self.latest_health_records = latest_health_records
+
+    @classmethod
+    def build(cls, latest=LATEST_ROWS):
+        """
+            Compute the dashboard figures.
+
+            Args:
+                latest (int): Number of rows to include in each "latest entries" panel.
+
+            Returns:
+                DashboardSummary: The computed summary.
+        """
+        row = db.session.execute(select(
+            _scalar(select(func.count(User.id)).where(User.role == RoleEnum.WORKER), 'workers'),
+            _scalar(select(func.count(Inventory.id)), 'inventory'),
+            _scalar(select(_total(DailyProduction.records)), 'production'),
+            _scalar(select(_total(DailyFlockStock.records)), 'flocks'),
+            _scalar(select(_total(DailySymptomCases.records)), 'health_records'),
+            _scalar(select(_total(DailyProduction.eggs_collected)), 'eggs_collected'),
+            _scalar(select(_total(DailyProduction.eggs_sold)), 'eggs_sold'),
+            _scalar(select(_total(DailyFlockStock.live_birds)), 'live_birds'),
+            _scalar(select(_total(DailySymptomCases.birds_sick)), 'sick_birds'),
+        )).one()._mapping
+
+        counts = {key: row[key] for key in ('workers', 'inventory', 'production', 'flocks', 'health_records')}
+        totals = {key: row[key] for key in ('eggs_collected', 'eggs_sold', 'live_birds', 'sick_birds')}
+
+        latest_production = db.session.execute(
+            select(Production.date_collected, Production.number_eggs_collected, Production.eggs_sold,
+                   Production.created_by_username)
+            .order_by(Production.date_collected.desc(), Production.id.desc())
+            .limit(latest)
+        ).all()
+        latest_health_records = db.session.execute(
+            select(HealthRecord.date_reported, HealthRecord.symptom, HealthRecord.number_sick,
+                   HealthRecord.created_by_username)
+            .order_by(HealthRecord.date_reported.desc(), HealthRecord.id.desc())
+            .limit(latest)
+        ).all()
+
+        return cls(counts, totals, latest_production, latest_health_records)
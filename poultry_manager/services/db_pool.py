@@ -0,0 +1,181 @@
+"""
+Database Connection Pool
+
+This module builds `SQLALCHEMY_ENGINE_OPTIONS` from the `DB_*` configuration values and
+records connection pool metrics.
+
+Sizing: every gunicorn worker process has its own pool, so the database sees up to
+`workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)` connections. By default a pool holds one
+connection per request thread (`GUNICORN_THREADS`) plus one spare. Connections are
+pre-pinged and recycled so idle periods do not surface as stale-connection errors.
+
+PgBouncer mode (`DB_PGBOUNCER=1`): PgBouncer in transaction pooling mode already pools
+server connections, so the application uses `NullPool` and applies the statement timeout with
+`SET LOCAL` at the start of each transaction, because session settings and startup options
+do not survive PgBouncer handing the server connection to another client.
+
+Usage:
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+    db.init_app(app)
+    pool_metrics.instrument(db.engine)
+"""
+
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+
+
+class PoolMetrics:
+    """
+        Thread-safe counters describing connection pool usage in this process.
+
+        Attributes:
+            connects (int): New DBAPI connections opened.
+            checkouts (int): Connections handed out by the pool.
+            invalidations (int): Connections discarded as broken or stale.
+            timeouts (int): Checkouts that gave up after `pool_timeout`.
+            wait_seconds_total (float): Total time spent waiting for a pooled connection.
+            wait_seconds_max (float): Longest single wait for a pooled connection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zero every counter."""
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+
+    def instrument(self, engine):
+        """
+            Listen to an engine's pool events.
+
+            Args:
+                engine (Engine): The engine whose pool is observed.
+        """
+        if event.contains(engine.pool, 'connect', self._on_connect):
+            return
+        event.listen(engine.pool, 'connect', self._on_connect)
+        event.listen(engine.pool, 'checkout', self._on_checkout)
+        event.listen(engine.pool, 'invalidate', self._on_invalidate)
+
+    def record_wait(self, seconds, timed_out=False):
+        """Record the time one checkout waited for a pooled connection."""
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self, engine):
+        """
+            Return the counters together with the pool's current state.
+
+            Args:
+                engine (Engine): The engine whose pool is reported.
+
+            Returns:
+                dict: Pool class, size and occupancy gauges plus the counters.
+        """
+        pool = engine.pool
+        stats = {'pool': type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            stats.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow(),
+                         idle=pool.checkedin())
+        with self._lock:
+            stats.update(connects=self.connects, checkouts=self.checkouts, invalidations=self.invalidations,
+                         timeouts=self.timeouts, wait_seconds_total=round(self.wait_seconds_total, 6),
+                         wait_seconds_max=round(self.wait_seconds_max, 6))
+        return stats
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+
+# Per-process pool metrics, instrumented in `create_app`
+pool_metrics = PoolMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """`QueuePool` that records how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+
+def engine_options(config):
+    """
+        Build the SQLAlchemy engine options for the configured database.
+
+        Args:
+            config (Mapping): The application config (`SQLALCHEMY_DATABASE_URI` and the `DB_*` values).
+
+        Returns:
+            dict: Keyword arguments for `create_engine`.
+    """
+    uri = config.get('SQLALCHEMY_DATABASE_URI')
+    if not uri:
+        return {}
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite':
+        # SQLite connections are local files or in-memory; Flask-SQLAlchemy picks the pool
+        return {}
+
+    if config['DB_PGBOUNCER']:
+        return {'poolclass': NullPool}
+
+    options = {
+        'poolclass': TimedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+    timeout_ms = config['DB_STATEMENT_TIMEOUT_MS']
+    if timeout_ms and url.get_backend_name() == 'postgresql':
+        options['connect_args'] = {'options': f'-c statement_timeout={int(timeout_ms)}'}
+    return options
+
+
+def apply_transaction_settings(engine, config):
+    """
+        In PgBouncer mode, set the statement timeout at the start of every transaction.
+
+        Args:
+            engine (Engine): The application's engine.
+            config (Mapping): The application config.
+    """
+    timeout_ms = config['DB_STATEMENT_TIMEOUT_MS']
+    if not (config['DB_PGBOUNCER'] and timeout_ms and engine.dialect.name == 'postgresql'):
+        return
+
+    @event.listens_for(engine, 'begin')
+    def set_local_statement_timeout(connection):
+        connection.exec_driver_sql(f'SET LOCAL statement_timeout = {int(timeout_ms)}')
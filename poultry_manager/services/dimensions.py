@@ -0,0 +1,196 @@
+"""
+Symptom, Medication and Breed Canonicalization
+
+This module maps the free-text `HealthRecord.symptom`, `HealthRecord.medication_given` and
+`Flock.breed` values onto the dimension tables of `poultry_manager.models.dimension` and sets
+the records' integer foreign keys (`symptom_id`, `medication_id`, `breed_id`) on write.
+
+Values are matched by their canonical key: lower-cased words without punctuation, each reduced
+by a few English suffix rules, so "Cough", "cough " and "Coughing" share the key "cough" and one
+rollup bucket. The record keeps the text as entered; the dimension row keeps the first spelling
+seen as its display name.
+
+ORM writes are canonicalized by a `before_flush` session listener. Writes that bypass the unit of
+work (the bulk imports and the single-statement edits of `services/records.py`) must call
+`canonicalize` on their values themselves.
+
+Usage:
+    canonical_key('Coughing ')  # 'cough'
+    canonicalize(db.session.connection(), HealthRecord, rows)  # adds symptom_id and medication_id
+"""
+
+import re
+import unicodedata
+from importlib import import_module
+
+from sqlalchemy import event, inspect, insert, select
+
+from poultry_manager import db
+from poultry_manager.models.dimension import Symptom, Medication, Breed
+from poultry_manager.models.flock import Flock
+from poultry_manager.models.health_record import HealthRecord
+
+KEY_LENGTH = Symptom.__table__.c.key.type.length
+
+# Suffixes removed from words: a plural ending, then a verb ending
+PLURAL_SUFFIXES = ('es', 's')
+VERB_SUFFIXES = ('ing', 'ed')
+# Double consonants kept when a verb ending is removed ('swelling' -> 'swell')
+KEPT_DOUBLES = frozenset('lsz')
+
+
+def _strip(word, suffixes):
+    """Remove the first matching suffix that leaves a stem of at least three letters with a vowel."""
+    for suffix in suffixes:
+        stem = word[:-len(suffix)]
+        if word.endswith(suffix) and len(stem) >= 3 and re.search('[aeiouy]', stem):
+            return stem
+    return word
+
+
+def _stem(word):
+    """Reduce one lower-case word with the suffix rules ('droppings' -> 'drop', 'sneezing' -> 'sneez')."""
+    # 'coccidiosis', 'virus' and 'distress' are not plurals
+    if not word.endswith(('ss', 'is', 'us')):
+        word = _strip(word, PLURAL_SUFFIXES)
+    # 'bleed' and 'feed' are not past tenses
+    if not word.endswith('eed'):
+        stem = _strip(word, VERB_SUFFIXES)
+        if stem != word and stem[-1] == stem[-2] and stem[-1] not in KEPT_DOUBLES and stem[-1] not in 'aeiou':
+            stem = stem[:-1]
+        word = stem
+    if len(word) > 3 and word.endswith('e'):
+        word = word[:-1]
+    return word
+
+
+def canonical_key(text):
+    """
+        Compute the key a free-text value is matched by.
+
+        Args:
+            text (str): The value as entered.
+
+        Returns:
+            str: Space-separated stemmed words, e.g. 'cough' for 'Coughing '; the whitespace-trimmed
+            lower-case text when it has no words.
+    """
+    folded = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii').lower()
+    words = re.findall(r'[a-z0-9]+', folded)
+    key = ' '.join(_stem(word) for word in words) if words else ' '.join((text or '').lower().split())
+    return key[:KEY_LENGTH]
+
+
+def display_name(text):
+    """The display name of a new dimension value: the text with its whitespace collapsed."""
+    return ' '.join((text or '').split())[:KEY_LENGTH]
+
+
+def resolve(connection, dimension, names):
+    """
+        Find or create the dimension rows of some values.
+
+        Missing rows are inserted with a conflict-ignoring insert, so concurrent writers of the
+        same new value end up with the same row.
+
+        Args:
+            connection (Connection): The connection of the transaction writing the records.
+            dimension (Dimension): The dimension model (`Symptom`, `Medication` or `Breed`).
+            names (iterable): The values as entered.
+
+        Returns:
+            dict: Each value to the ID of its dimension row.
+    """
+    keys = {name: canonical_key(name) for name in names}
+    if not keys:
+        return {}
+    table = dimension.__table__
+    wanted = set(keys.values())
+    ids = dict(connection.execute(select(table.c.key, table.c.id).where(table.c.key.in_(wanted))).all())
+
+    missing = {}
+    for name, key in keys.items():
+        if key not in ids:
+            missing.setdefault(key, display_name(name))
+    if missing:
+        rows = [{'key': key, 'name': name, 'records': 0} for key, name in missing.items()]
+        dialect = connection.dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            # The connection already imported its dialect (see services/rollups.py)
+            statement = import_module(f'sqlalchemy.dialects.{dialect}').insert(table).on_conflict_do_nothing(
+                index_elements=['key'])
+        else:
+            statement = insert(table)
+        connection.execute(statement, rows)
+        ids.update(connection.execute(select(table.c.key, table.c.id).where(table.c.key.in_(missing))).all())
+    return {name: ids[key] for name, key in keys.items()}
+
+
+class DimensionLink:
+    """
+        A free-text record column canonicalized into a dimension table.
+
+        Attributes:
+            column (str): The text column (e.g., 'symptom').
+            foreign_key (str): The column holding the dimension row ID (e.g., 'symptom_id').
+            dimension (Dimension): The dimension model.
+    """
+
+    def __init__(self, column, foreign_key, dimension):
+        self.column = column
+        self.foreign_key = foreign_key
+        self.dimension = dimension
+
+
+LINKS = {
+    HealthRecord: (DimensionLink('symptom', 'symptom_id', Symptom),
+                   DimensionLink('medication_given', 'medication_id', Medication)),
+    Flock: (DimensionLink('breed', 'breed_id', Breed),),
+}
+
+
+def canonicalize(connection, model, rows):
+    """
+        Set the dimension foreign keys of record values written with Core statements.
+
+        Args:
+            connection (Connection): The connection of the transaction writing the records.
+            model (BaseModel): The record model.
+            rows (list): Column name to value dicts; those with a linked text column get its
+                foreign key added in place.
+    """
+    for link in LINKS.get(model, ()):
+        names = list(dict.fromkeys(row[link.column] for row in rows if row.get(link.column) is not None))
+        if not names:
+            continue
+        ids = resolve(connection, link.dimension, names)
+        for row in rows:
+            if row.get(link.column) is not None:
+                row[link.foreign_key] = ids[row[link.column]]
+
+
+def canonicalize_flushed(session, flush_context, instances):
+    """
+        `before_flush` listener setting the dimension foreign keys of new and edited records.
+
+        Args:
+            session (Session): The flushing session.
+            flush_context (UOWTransaction): The flush context (unused).
+            instances (list): Objects passed to `flush()` (unused).
+    """
+    pending = {}
+    for record in [*session.new, *session.dirty]:
+        for link in LINKS.get(type(record), ()):
+            if getattr(record, link.column) is None:
+                continue
+            if (record in session.new or getattr(record, link.foreign_key) is None
+                    or inspect(record).attrs[link.column].history.has_changes()):
+                pending.setdefault(link, []).append(record)
+    for link, records in pending.items():
+        names = dict.fromkeys(getattr(record, link.column) for record in records)
+        ids = resolve(session.connection(), link.dimension, names)
+        for record in records:
+            setattr(record, link.foreign_key, ids[getattr(record, link.column)])
+
+
+event.listen(db.session, 'before_flush', canonicalize_flushed)
@@ -0,0 +1,135 @@
+"""
+Streaming Record Export
+
+This module exports the inventory, production, flock and health record tables as CSV or
+NDJSON without materializing the result. Rows are read as plain column tuples with
+`yield_per`, which streams them from a server-side cursor where the driver supports one, and
+encoded into chunks by a generator that a Flask `Response` sends as it goes. Memory use is
+bounded by the chunk size, and the first bytes (the CSV header) leave before the query
+has finished.
+
+The listing filters (`from`, `to`, `worker`, `category`) are reused, so an export matches
+what the corresponding record browser shows.
+
+Usage:
+    export = RecordExport('production', ListingFilters.from_args(request.args))
+    return Response(stream_with_context(export.iter_chunks('csv')), mimetype=export.mimetype('csv'))
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from poultry_manager.services.listing import LISTINGS
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+YIELD_PER = 1000
+CHUNK_ROWS = 500
+
+
+def _json_default(value):
+    """Serialize dates for NDJSON rows."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class RecordExport:
+    """
+        A filtered, streamed export of one record model.
+
+        Attributes:
+            slug (str): The model slug (a key of `LISTINGS`).
+            listing (RecordListing): The listing whose filters and date column are used.
+            filters (ListingFilters): The filters to apply.
+            columns (list): The exported table columns, primary key first.
+    """
+
+    def __init__(self, slug, filters):
+        if slug not in LISTINGS:
+            raise ValueError(f"Invalid model: {slug}")
+        self.slug = slug
+        self.listing = LISTINGS[slug]
+        self.filters = filters
+        # Primary key first, then the table's own column order
+        table = self.listing.model.__table__
+        self.columns = list(table.primary_key) + [column for column in table.columns if not column.primary_key]
+
+    @property
+    def header(self):
+        """The exported column names."""
+        return [column.key for column in self.columns]
+
+    @staticmethod
+    def mimetype(file_format):
+        """Return the mimetype of an export format."""
+        return FORMATS[file_format]
+
+    def filename(self, file_format, today=None):
+        """Return the attachment file name, e.g. `production-2024-03-01.csv`."""
+        return f"{self.slug}-{(today or date.today()).isoformat()}.{file_format}"
+
+    def rows(self):
+        """
+            Stream the filtered rows, oldest first.
+
+            Yields:
+                Row: One tuple of column values per record.
+        """
+        model = self.listing.model
+        query = (self.listing.filtered_query(self.filters)
+                 .with_entities(*self.columns)
+                 .order_by(self.listing.date_column, model.id)
+                 .yield_per(YIELD_PER))
+        yield from query
+
+    def iter_chunks(self, file_format):
+        """
+            Encode the export as a sequence of text chunks.
+
+            Args:
+                file_format (str): One of `FORMATS`.
+
+            Yields:
+                str: The header (CSV only), then up to `CHUNK_ROWS` encoded rows per chunk.
+        """
+        if file_format == 'csv':
+            encode = self._csv_encoder()
+            yield encode(self.header)
+        elif file_format == 'ndjson':
+            encode = self._ndjson_encoder()
+        else:
+            raise ValueError(f"Invalid format: {file_format}")
+
+        chunk = []
+        for row in self.rows():
+            chunk.append(encode(row))
+            if len(chunk) >= CHUNK_ROWS:
+                yield ''.join(chunk)
+                chunk = []
+        if chunk:
+            yield ''.join(chunk)
+
+    def _csv_encoder(self):
+        """Return a function encoding one row as a CSV line."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def encode(row):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(value.isoformat() if isinstance(value, (date, datetime)) else value for value in row)
+            return buffer.getvalue()
+        return encode
+
+    def _ndjson_encoder(self):
+        """Return a function encoding one row as an NDJSON line."""
+        header = self.header
+
+        def encode(row):
+            return json.dumps(dict(zip(header, row)), default=_json_default) + '\n'
+        return encode
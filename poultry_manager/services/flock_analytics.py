@@ -0,0 +1,237 @@
+"""
+Flock Analytics
+
+This module computes live birds, mortality and hen-day egg production for arbitrary date
+ranges from a columnar, in-memory snapshot of the daily rollup tables.
+
+The snapshot lays every day between the first and last rollup row on a dense axis and keeps
+running totals (prefix sums) per breed for birds entered, deaths, sales and live birds, plus
+running totals of eggs collected and of hen-days (live birds on each day). Any range total is
+then the difference of two entries, so a breed summary costs O(breeds) and a bucketed series
+O(buckets), whatever the range length. Building the snapshot reads the two rollup tables once
+(O(days) rows); it is cached per process and rebuilt only when the `flock` or `production`
+write generation changes (see `services/response_cache.py`).
+
+Flock deaths and sales are not dated, so they are attributed to the flock's entry day: the
+live birds on a day are those of the flocks entered up to that day, net of their deaths and sales.
+
+Usage:
+    snapshot = flock_analytics.snapshot()
+    snapshot.breed_summary(date_from, date_to)
+    snapshot.hen_day_series(ChartParams.from_args(request.args))
+"""
+
+import threading
+from array import array
+from datetime import date, timedelta
+from itertools import accumulate
+
+from sqlalchemy import select
+
+from poultry_manager import db
+from poultry_manager.models.dimension import Breed
+from poultry_manager.models.rollup import DailyProduction, DailyFlockStock
+from poultry_manager.services.response_cache import response_cache
+
+# Per-breed measures kept as running totals, in `DailyFlockStock` column order
+FLOCK_MEASURES = ('quantity', 'deaths', 'sold', 'live_birds')
+
+
+def _prefix(values):
+    """Running totals with a leading zero, so `prefix[j] - prefix[i]` sums `values[i:j]`."""
+    return array('q', accumulate(values, initial=0))
+
+
+def _add_month(day):
+    """Return the first day of the month after `day`."""
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+class FlockSnapshot:
+    """
+        Day-indexed running totals of the flock and production rollups.
+
+        Attributes:
+            start (date): First day of the axis, or None when there are no rollup rows.
+            days (int): Number of days on the axis.
+            breeds (dict): Breed to `{measure: prefix array}` for every name in `FLOCK_MEASURES`.
+            eggs (array): Running total of eggs collected.
+            hen_days (array): Running total of live birds per day.
+    """
+
+    def __init__(self, start, days, breeds, eggs, hen_days):
+        self.start = start
+        self.days = days
+        self.breeds = breeds
+        self.eggs = eggs
+        self.hen_days = hen_days
+
+    @classmethod
+    def build(cls):
+        """
+            Read the rollups and lay them out on a dense day axis.
+
+            Returns:
+                FlockSnapshot: The snapshot.
+        """
+        flock_rows = db.session.execute(select(
+            DailyFlockStock.day, Breed.name, DailyFlockStock.quantity, DailyFlockStock.deaths,
+            DailyFlockStock.sold, DailyFlockStock.live_birds
+        ).join(Breed, Breed.id == DailyFlockStock.breed_id)).all()
+        production_rows = db.session.execute(select(DailyProduction.day, DailyProduction.eggs_collected)).all()
+        days_seen = [row[0] for row in flock_rows] + [row[0] for row in production_rows]
+        if not days_seen:
+            return cls(None, 0, {}, _prefix([]), _prefix([]))
+
+        start = min(days_seen)
+        length = (max(days_seen) - start).days + 1
+        daily = {}
+        live = [0] * length
+        for day, breed, *measures in flock_rows:
+            index = (day - start).days
+            columns = daily.setdefault(breed, [[0] * length for _ in FLOCK_MEASURES])
+            for column, value in zip(columns, measures):
+                column[index] += value
+            live[index] += measures[-1]
+        eggs = [0] * length
+        for day, collected in production_rows:
+            eggs[(day - start).days] += collected
+
+        breeds = {breed: dict(zip(FLOCK_MEASURES, map(_prefix, columns))) for breed, columns in daily.items()}
+        # Live birds on each day are those entered up to that day; hen-days sum them over days
+        hen_days = _prefix(accumulate(live))
+        return cls(start, length, breeds, _prefix(eggs), hen_days)
+
+    def _bounds(self, date_from, date_to):
+        """Map an inclusive date range onto `[i, j)` prefix indexes, clamped to the axis."""
+        if self.start is None:
+            return 0, 0
+        i = 0 if date_from is None else (date_from - self.start).days
+        j = self.days if date_to is None else (date_to - self.start).days + 1
+        return max(0, min(i, self.days)), max(0, min(j, self.days))
+
+    def breed_summary(self, date_from=None, date_to=None):
+        """
+            Birds entered, deaths, sales and mortality per breed over a date range, most live birds first.
+
+            Args:
+                date_from (date): Inclusive lower bound on the flock entry day.
+                date_to (date): Inclusive upper bound; live birds are counted as of this day.
+
+            Returns:
+                list: One dict per breed with `breed`, `entered`, `deaths`, `sold`, `live` and `mortality_rate` (%).
+        """
+        i, j = self._bounds(date_from, date_to)
+        summary = []
+        for breed, totals in self.breeds.items():
+            entered = totals['quantity'][j] - totals['quantity'][i]
+            deaths = totals['deaths'][j] - totals['deaths'][i]
+            summary.append({
+                'breed': breed,
+                'entered': entered,
+                'deaths': deaths,
+                'sold': totals['sold'][j] - totals['sold'][i],
+                'live': totals['live_birds'][j],
+                'mortality_rate': round(100 * deaths / entered, 2) if entered else 0.0,
+            })
+        summary.sort(key=lambda entry: (-entry['live'], entry['breed']))
+        return summary
+
+    def hen_day_rate(self, date_from=None, date_to=None):
+        """
+            Hen-day egg production over a date range: eggs collected per 100 live birds per day.
+
+            Args:
+                date_from (date): Inclusive lower bound.
+                date_to (date): Inclusive upper bound.
+
+            Returns:
+                dict: `eggs`, `hen_days` and `rate` (%).
+        """
+        i, j = self._bounds(date_from, date_to)
+        eggs = self.eggs[j] - self.eggs[i]
+        hen_days = self.hen_days[j] - self.hen_days[i]
+        return {'eggs': eggs, 'hen_days': hen_days, 'rate': round(100 * eggs / hen_days, 2) if hen_days else 0.0}
+
+    def hen_day_series(self, params):
+        """
+            Hen-day egg production per time bucket, oldest first.
+
+            When more buckets exist than `params.points`, the most recent ones are returned.
+
+            Args:
+                params (ChartParams): The chart parameters.
+
+            Returns:
+                dict: `labels`, `data` (rate %), `eggs`, `hen_days` and the `bucket` used.
+        """
+        series = {'labels': [], 'data': [], 'eggs': [], 'hen_days': [], 'bucket': params.bucket}
+        if self.start is None:
+            return series
+        last = self.start + timedelta(days=self.days - 1)
+        first, final = max(params.date_from or self.start, self.start), min(params.date_to or last, last)
+
+        if params.bucket == 'week':
+            bucket_start = first - timedelta(days=first.weekday())
+        elif params.bucket == 'month':
+            bucket_start = first.replace(day=1)
+        else:
+            bucket_start = first
+        buckets = []
+        while bucket_start <= final:
+            if params.bucket == 'week':
+                bucket_end = bucket_start + timedelta(days=7)
+            elif params.bucket == 'month':
+                bucket_end = _add_month(bucket_start)
+            else:
+                bucket_end = bucket_start + timedelta(days=1)
+            buckets.append((bucket_start, bucket_end))
+            bucket_start = bucket_end
+
+        for bucket_start, bucket_end in buckets[-params.points:]:
+            totals = self.hen_day_rate(max(bucket_start, first), min(bucket_end - timedelta(days=1), final))
+            series['labels'].append(bucket_start.isoformat())
+            series['data'].append(totals['rate'])
+            series['eggs'].append(totals['eggs'])
+            series['hen_days'].append(totals['hen_days'])
+        return series
+
+
+class FlockAnalytics:
+    """
+        Per-process cache of the current `FlockSnapshot`.
+
+        Attributes:
+            builds (int): Number of snapshots built by this process.
+    """
+
+    def __init__(self):
+        self.builds = 0
+        self._cached = (None, None)
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """
+            Return the snapshot for the current flock and production write generations.
+
+            Returns:
+                FlockSnapshot: A cached snapshot, rebuilt after any flock or production write.
+        """
+        generations = response_cache.generations(['flock', 'production'])
+        cached_generations, snapshot = self._cached
+        if snapshot is not None and cached_generations == generations:
+            return snapshot
+        snapshot = FlockSnapshot.build()
+        with self._lock:
+            self.builds += 1
+            self._cached = (generations, snapshot)
+        return snapshot
+
+    def clear(self):
+        """Drop the cached snapshot."""
+        with self._lock:
+            self._cached = (None, None)
+
+
+# Shared analytics snapshot cache
+flock_analytics = FlockAnalytics()
@@ -0,0 +1,173 @@
+"""
+Password Hashing Pool
+
+This module runs bcrypt hashing and verification on a small, bounded thread pool instead of
+directly in the request handler. bcrypt releases the GIL, so the pool caps how many CPU-bound
+hashes a process runs at once, and the number of requests waiting for a hash is capped too:
+once `max_pending` hashes are queued or running, new requests fail fast with
+`503 Service Unavailable` (and a `Retry-After` hint) instead of piling up behind a login storm.
+
+The bcrypt cost factor is configurable. Hashes made with a different cost are reported by
+`needs_rehash`, so they can be upgraded (or downgraded) transparently on the next login.
+
+Usage:
+    password_hasher.configure(rounds=12, workers=2, max_pending=32, timeout=5)
+    password_hash = password_hasher.hash('secret')
+    password_hasher.verify(password_hash, 'secret')
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from werkzeug.exceptions import ServiceUnavailable
+
+from poultry_manager import bcrypt
+
+DEFAULT_ROUNDS = 12
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PENDING = 32
+DEFAULT_TIMEOUT_SECONDS = 5.0
+RETRY_AFTER_SECONDS = 1
+
+
+class HashingOverloaded(ServiceUnavailable):
+    """Raised (as a 503 response) when the hashing pool is full or a hash took too long."""
+    description = 'The server is busy signing other users in. Please try again in a moment.'
+
+    def __init__(self, description=None):
+        super().__init__(description=description, retry_after=RETRY_AFTER_SECONDS)
+
+
+class PasswordHasher:
+    """
+        Bounded bcrypt hashing executor.
+
+        Attributes:
+            rounds (int): The bcrypt cost factor used for new hashes.
+            workers (int): Number of hashing threads; 0 hashes inline in the calling thread.
+            max_pending (int): Maximum number of hashes queued or running at once.
+            timeout (float): Seconds a caller waits for its hash before giving up with a 503.
+    """
+
+    def __init__(self, rounds=DEFAULT_ROUNDS, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING,
+                 timeout=DEFAULT_TIMEOUT_SECONDS):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._reset()
+
+    def configure(self, rounds=DEFAULT_ROUNDS, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING,
+                  timeout=DEFAULT_TIMEOUT_SECONDS):
+        """
+            Change the cost factor and pool limits; the pool is recreated on next use.
+
+            Args:
+                rounds (int): The bcrypt cost factor used for new hashes.
+                workers (int): Number of hashing threads; 0 hashes inline.
+                max_pending (int): Maximum number of hashes queued or running at once.
+                timeout (float): Seconds a caller waits for its hash.
+        """
+        with self._lock:
+            executor = self._executor
+            self.rounds = rounds
+            self.workers = workers
+            self.max_pending = max(max_pending, 1)
+            self.timeout = timeout
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def hash(self, password):
+        """
+            Hash a password with the configured cost factor.
+
+            Args:
+                password (str): The plain-text password.
+
+            Returns:
+                str: The bcrypt hash.
+
+            Raises:
+                HashingOverloaded: If the pool is full or the hash timed out.
+        """
+        return self._run(bcrypt.generate_password_hash, password, self.rounds).decode('utf-8')
+
+    def verify(self, password_hash, password):
+        """
+            Check a password against a bcrypt hash.
+
+            Args:
+                password_hash (str): The stored hash.
+                password (str): The plain-text password.
+
+            Returns:
+                bool: True if the password matches.
+
+            Raises:
+                HashingOverloaded: If the pool is full or the check timed out.
+        """
+        return self._run(bcrypt.check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """
+            Check whether a hash was made with a different cost factor than the configured one.
+
+            Args:
+                password_hash (str): The stored hash, e.g. `$2b$12$...`.
+
+            Returns:
+                bool: True if the hash should be replaced.
+        """
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return True
+
+    @property
+    def pending(self):
+        """Number of hashes currently queued or running."""
+        return self._pending
+
+    def _run(self, function, *args):
+        """Run `function` on the pool, failing fast when `max_pending` hashes are already waiting."""
+        if self.workers <= 0:
+            return function(*args)
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HashingOverloaded()
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bcrypt')
+            executor = self._executor
+        future = executor.submit(function, *args)
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise HashingOverloaded()
+
+    def _release(self, future):
+        """Free the pending slot of a finished hash."""
+        with self._lock:
+            self._pending -= 1
+
+    def _reset(self):
+        """Start without a pool or pending hashes; forked children do not inherit the pool's threads."""
+        self._executor = None
+        self._pending = 0
+
+    def _after_fork(self):
+        """Give a forked worker process its own lock and pool."""
+        self._lock = threading.Lock()
+        self._reset()
+
+
+# Shared hasher, configured in `create_app`
+password_hasher = PasswordHasher()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=password_hasher._after_fork)
@@ -0,0 +1,135 @@
+"""
+Identity Cache
+
+This module provides a per-process TTL/LRU cache for the identity loaded by Flask-Login's
+`user_loader`. Instead of querying the users table on every authenticated request, the loader
+keeps a snapshot of the user's columns (including the role checked by the RBAC decorators in
+`middleware/access_control.py`) and re-attaches it to the current session without a round trip.
+
+Entries expire after `ttl` seconds, which bounds how long another worker process can keep a
+stale role; routes that change a user call `invalidate` after committing so the current process
+never serves a stale identity.
+
+Usage:
+    user_cache = IdentityCache(User)
+    user = user_cache.get(user_id, lambda key: db.session.get(User, key))
+    user_cache.invalidate(user_id)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from poultry_manager import db
+
+DEFAULT_TTL_SECONDS = 60
+DEFAULT_MAX_SIZE = 1024
+
+
+class IdentityCache:
+    """
+        Thread-safe TTL/LRU cache of model column snapshots keyed by primary key.
+
+        Attributes:
+            model (db.Model): The mapped class whose instances are cached.
+            ttl (float): Seconds an entry stays valid; 0 disables caching.
+            maxsize (int): Maximum number of cached identities.
+            hits (int): Number of lookups served from the cache.
+            misses (int): Number of lookups that went to the database.
+    """
+
+    def __init__(self, model, ttl=DEFAULT_TTL_SECONDS, maxsize=DEFAULT_MAX_SIZE):
+        self.model = model
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, ttl=DEFAULT_TTL_SECONDS, maxsize=DEFAULT_MAX_SIZE):
+        """
+            Change the cache limits and drop every cached entry.
+
+            Args:
+                ttl (float): Seconds an entry stays valid; 0 disables caching.
+                maxsize (int): Maximum number of cached identities.
+        """
+        with self._lock:
+            self.ttl = ttl
+            self.maxsize = maxsize
+            self._entries.clear()
+
+    def get(self, key, loader):
+        """
+            Return the instance for `key`, from the cache when possible.
+
+            Args:
+                key (int): The primary key.
+                loader (callable): Called with `key` on a miss; returns the instance or None.
+
+            Returns:
+                db.Model: An instance attached to the current session, or None if not found.
+        """
+        snapshot = self._lookup(key)
+        if snapshot is not None:
+            return self._attach(snapshot)
+
+        instance = loader(key)
+        if instance is not None and self.ttl > 0:
+            self._store(key, self._snapshot(instance))
+        return instance
+
+    def invalidate(self, key):
+        """
+            Drop the cached entry for `key`, if any.
+
+            Args:
+                key (int): The primary key of the changed or deleted instance.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def _lookup(self, key):
+        """Return the live snapshot for `key`, refreshing its LRU position, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, snapshot = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return snapshot
+
+    def _store(self, key, snapshot):
+        """Cache a snapshot, evicting the least recently used entries beyond `maxsize`."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _snapshot(self, instance):
+        """Copy the column attributes of an instance."""
+        return {attr.key: getattr(instance, attr.key) for attr in inspect(self.model).column_attrs}
+
+    def _attach(self, snapshot):
+        """Rebuild an instance from a snapshot and merge it into the session without a query."""
+        instance = self.model.__mapper__.class_manager.new_instance()
+        for name, value in snapshot.items():
+            setattr(instance, name, value)
+        make_transient_to_detached(instance)
+        return db.session.merge(instance, load=False)
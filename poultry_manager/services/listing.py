@@ -0,0 +1,295 @@
+"""
+Keyset-Paginated Record Listings
+
+This module provides the shared listing layer used by the admin record browsers
+(`view_inventory`, `view_flock`, `view_production` and `view_health_record`).
+
+Instead of loading every row with `.all()`, each page is fetched with keyset (seek)
+pagination on `(date, id)`: the last row of a page becomes an opaque cursor and the next
+page is read with `WHERE (date, id) < (:date, :id) ORDER BY date DESC, id DESC LIMIT n`.
+Date-range, worker and category filters are pushed down into the same SQL statement,
+so the cost of a page is bounded by the page size rather than by the table size. Pages load
+only the columns the record browsers render; the creator is shown from the denormalized
+`created_by_username` column, so no user rows are joined or lazily loaded per record.
+
+Usage:
+    listing = LISTINGS['production']
+    filters = ListingFilters.from_args(request.args)
+    page = listing.paginate(filters, after=request.args.get('after'))
+"""
+
+import base64
+import binascii
+from datetime import datetime, timedelta
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import load_only
+
+from poultry_manager.models.inventory import Inventory
+from poultry_manager.models.production import Production
+from poultry_manager.models.flock import Flock
+from poultry_manager.models.health_record import HealthRecord
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def parse_date(value):
+    """
+        Parse a `YYYY-MM-DD` string into a date.
+
+        Args:
+            value (str): The raw value, typically from the query string.
+
+        Returns:
+            date: The parsed date, or None if the value is empty or malformed.
+    """
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def encode_cursor(record_date, record_id):
+    """
+        Encode a `(date, id)` position into an opaque, URL-safe cursor token.
+
+        Args:
+            record_date (datetime): The date column value of the boundary row.
+            record_id (int): The primary key of the boundary row.
+
+        Returns:
+            str: The cursor token.
+    """
+    raw = f"{record_date.isoformat()}|{record_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """
+        Decode a cursor token produced by `encode_cursor`.
+
+        Args:
+            token (str): The cursor token.
+
+        Returns:
+            tuple: `(datetime, int)` position, or None if the token is missing or invalid.
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        date_part, id_part = raw.rsplit('|', 1)
+        return datetime.fromisoformat(date_part), int(id_part)
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+
+
+class ListingFilters:
+    """
+        Filters applied to a record listing.
+
+        Attributes:
+            date_from (date): Inclusive lower bound on the record date.
+            date_to (date): Inclusive upper bound on the record date.
+            worker_id (int): Only include records entered by this user.
+            category (str): Exact match on the listing's category column.
+            per_page (int): Number of rows per page, clamped to `MAX_PAGE_SIZE`.
+    """
+
+    def __init__(self, date_from=None, date_to=None, worker_id=None, category=None,
+                 per_page=DEFAULT_PAGE_SIZE):
+        self.date_from = date_from
+        self.date_to = date_to
+        self.worker_id = worker_id
+        self.category = category or None
+        self.per_page = max(1, min(per_page, MAX_PAGE_SIZE))
+
+    @classmethod
+    def from_args(cls, args):
+        """
+            Build filters from a request's query string.
+
+            Args:
+                args (MultiDict): The request arguments (`from`, `to`, `worker`, `category`, `per_page`).
+
+            Returns:
+                ListingFilters: The parsed filters; malformed values are ignored.
+        """
+        return cls(
+            date_from=parse_date(args.get('from')),
+            date_to=parse_date(args.get('to')),
+            worker_id=args.get('worker', type=int),
+            category=(args.get('category') or '').strip(),
+            per_page=args.get('per_page', DEFAULT_PAGE_SIZE, type=int)
+        )
+
+    def as_args(self):
+        """
+            Serialize the active filters back into query string arguments.
+
+            Returns:
+                dict: Arguments suitable for `url_for`, omitting unset filters.
+        """
+        args = {}
+        if self.date_from:
+            args['from'] = self.date_from.isoformat()
+        if self.date_to:
+            args['to'] = self.date_to.isoformat()
+        if self.worker_id:
+            args['worker'] = self.worker_id
+        if self.category:
+            args['category'] = self.category
+        if self.per_page != DEFAULT_PAGE_SIZE:
+            args['per_page'] = self.per_page
+        return args
+
+
+class Page:
+    """
+        A single page of a record listing.
+
+        Attributes:
+            items (list): The records on this page, newest first.
+            next_cursor (str): Cursor for the following (older) page, or None on the last page.
+            prev_cursor (str): Cursor for the preceding (newer) page, or None on the first page.
+            filters (ListingFilters): The filters the page was built with.
+    """
+
+    def __init__(self, items, next_cursor, prev_cursor, filters):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.filters = filters
+
+    @property
+    def has_next(self):
+        """Whether an older page exists."""
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        """Whether a newer page exists."""
+        return self.prev_cursor is not None
+
+
+class RecordListing:
+    """
+        Keyset-paginated listing over one record model.
+
+        Attributes:
+            model (BaseModel): The model class being listed.
+            date_column (Column): The column used as the primary sort key.
+            category_column (Column): Optional column matched by the `category` filter.
+            columns (tuple): Columns loaded for each row of a page; all columns if empty.
+    """
+
+    def __init__(self, model, date_column, category_column=None, columns=()):
+        self.model = model
+        self.date_column = date_column
+        self.category_column = category_column
+        self.columns = tuple(columns)
+
+    def criteria(self, filters):
+        """
+            Translate filters into SQL conditions on the listed model.
+
+            Args:
+                filters (ListingFilters): The filters to apply.
+
+            Returns:
+                list: WHERE clauses, empty when no filter applies to this listing.
+        """
+        clauses = []
+        if filters.date_from:
+            clauses.append(self.date_column >= datetime.combine(filters.date_from, datetime.min.time()))
+        if filters.date_to:
+            upper = datetime.combine(filters.date_to + timedelta(days=1), datetime.min.time())
+            clauses.append(self.date_column < upper)
+        if filters.worker_id:
+            clauses.append(self.model.user_id == filters.worker_id)
+        if filters.category and self.category_column is not None:
+            clauses.append(self.category_column == filters.category)
+        return clauses
+
+    def filtered_query(self, filters):
+        """
+            Build the base query with all filters pushed down into SQL.
+
+            Args:
+                filters (ListingFilters): The filters to apply.
+
+            Returns:
+                Query: The filtered, unordered query.
+        """
+        return self.model.query.filter(*self.criteria(filters))
+
+    def paginate(self, filters, after=None, before=None, full_rows=False):
+        """
+            Fetch one page of records, newest first.
+
+            Args:
+                filters (ListingFilters): The filters to apply.
+                after (str): Cursor of the last row of the previous page; fetch older rows.
+                before (str): Cursor of the first row of the next page; fetch newer rows.
+                full_rows (bool): Load every column (e.g. for serialization), not only the rendered ones.
+
+            Returns:
+                Page: The requested page.
+        """
+        key = tuple_(self.date_column, self.model.id)
+        query = self.filtered_query(filters)
+        if self.columns and not full_rows:
+            query = query.options(load_only(*self.columns))
+        after_pos = decode_cursor(after)
+        before_pos = decode_cursor(before)
+
+        if before_pos and not after_pos:
+            # Walk backwards towards newer rows, then restore newest-first order
+            rows = (query.filter(key > tuple_(*before_pos))
+                    .order_by(self.date_column.asc(), self.model.id.asc())
+                    .limit(filters.per_page + 1).all())
+            if len(rows) <= filters.per_page:
+                # Reached the newest rows, which is simply the first page
+                return self.paginate(filters, full_rows=full_rows)
+            items = list(reversed(rows[:filters.per_page]))
+            next_cursor = self._cursor(items[-1]) if items else None
+            return Page(items, next_cursor, self._cursor(items[0]), filters)
+
+        if after_pos:
+            query = query.filter(key < tuple_(*after_pos))
+        rows = (query.order_by(self.date_column.desc(), self.model.id.desc())
+                .limit(filters.per_page + 1).all())
+        has_more = len(rows) > filters.per_page
+        items = rows[:filters.per_page]
+        next_cursor = self._cursor(items[-1]) if items and has_more else None
+        prev_cursor = self._cursor(items[0]) if items and after_pos else None
+        return Page(items, next_cursor, prev_cursor, filters)
+
+    def _cursor(self, record):
+        """Encode the keyset position of a record."""
+        return encode_cursor(getattr(record, self.date_column.key), record.id)
+
+
+# Listings backing the admin record browsers, keyed by the model slug used in routes
+LISTINGS = {
+    'inventory': RecordListing(
+        Inventory, Inventory.purchase_date, Inventory.category,
+        columns=(Inventory.item_name, Inventory.category, Inventory.quantity, Inventory.unit, Inventory.cost,
+                 Inventory.currency, Inventory.purchase_date, Inventory.created_by_username)),
+    'production': RecordListing(
+        Production, Production.date_collected,
+        columns=(Production.number_eggs_collected, Production.eggs_sold, Production.date_collected,
+                 Production.created_by_username)),
+    'flock': RecordListing(
+        Flock, Flock.entry_date, Flock.breed,
+        columns=(Flock.breed, Flock.quantity, Flock.age, Flock.deaths, Flock.sold, Flock.entry_date,
+                 Flock.created_by_username)),
+    'health_record': RecordListing(
+        HealthRecord, HealthRecord.date_reported, HealthRecord.symptom,
+        columns=(HealthRecord.number_sick, HealthRecord.symptom, HealthRecord.medication_given,
+                 HealthRecord.date_reported, HealthRecord.created_by_username)),
+}
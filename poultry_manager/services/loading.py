@@ -0,0 +1,35 @@
+"""
+Strict Relationship Loading
+
+Views declare how they load related rows: record listings fetch only the columns they render
+(`load_only`), `manage_workers` reads a column projection of `users`, and the `User` record
+collections are `raise_on_sql` because a worker's full history is never needed as objects.
+
+With `STRICT_LOADING` enabled (the tests turn it on), a `do_orm_execute` listener adds
+`raiseload('*')` to every top-level ORM query, so a template or service that walks a
+relationship row by row fails with an error naming the attribute instead of silently issuing
+one query per row. Code that needs related rows must say so with `selectinload`/`joinedload`.
+"""
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import raiseload
+
+from poultry_manager import db
+
+
+def raise_on_lazy_loads(execute_state):
+    """
+        `do_orm_execute` listener forbidding lazy relationship loads when `STRICT_LOADING` is set.
+
+        Args:
+            execute_state (ORMExecuteState): The ORM statement about to run.
+    """
+    if not (execute_state.is_select and has_app_context() and current_app.config.get('STRICT_LOADING')):
+        return
+    if execute_state.is_column_load or execute_state.is_relationship_load:
+        return
+    execute_state.statement = execute_state.statement.options(raiseload('*'))
+
+
+event.listen(db.session, 'do_orm_execute', raise_on_lazy_loads)
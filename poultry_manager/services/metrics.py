@@ -0,0 +1,365 @@
+"""
+Prometheus Metrics
+
+This module collects request, connection pool and cache metrics and renders them in the
+Prometheus text exposition format for the `/metrics` endpoint, together with a few farm KPIs
+read from the daily rollup tables (eggs collected and sold today, live birds, recent sick birds).
+
+Every process keeps its own counters in memory. Under gunicorn the workers are separate
+processes, so with `METRICS_DIR` set each worker also writes its state to `<pid>.json` in that
+directory (at most every `METRICS_FLUSH_SECONDS`, and always before it answers a scrape), and
+the worker that serves `/metrics` merges every file: counters and histograms are summed over
+all processes, including exited ones so totals do not go backwards, while gauges such as
+in-flight requests only count live processes. The directory must be emptied when the server
+starts, as with the official client's multiprocess mode. Without `METRICS_DIR` only the
+serving process is reported, which is what the tests and the development server use.
+
+No client library is needed; the exposition format is plain text.
+
+Usage:
+    request_metrics.init_app(app)
+    body = request_metrics.render(farm_kpis())
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+
+from flask import g, request
+from sqlalchemy import func, select
+
+from poultry_manager import db
+from poultry_manager.models.base_model import current_time
+from poultry_manager.models.rollup import DailyProduction, DailyFlockStock, DailySymptomCases
+from poultry_manager.models.user import user_cache
+from poultry_manager.services.db_pool import pool_metrics
+from poultry_manager.services.hashing import password_hasher
+from poultry_manager.services.response_cache import response_cache
+
+PREFIX = 'fowltrak'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SICK_WINDOW_DAYS = 7
+
+# Pool snapshot fields exported as counters (summed over every process) and gauges (live processes)
+POOL_COUNTERS = {
+    'connects': 'Database connections opened.',
+    'checkouts': 'Connections handed out by the pool.',
+    'invalidations': 'Connections discarded as broken or stale.',
+    'timeouts': 'Checkouts that gave up waiting for a connection.',
+    'wait_seconds_total': 'Time spent waiting for a pooled connection.',
+}
+POOL_GAUGES = {
+    'size': 'Persistent connections the pool keeps.',
+    'checked_out': 'Connections in use.',
+    'overflow': 'Connections open above the pool size.',
+    'idle': 'Connections idle in the pool.',
+}
+
+KPI_HELP = {
+    'eggs_collected_today': 'Eggs collected today.',
+    'eggs_sold_today': 'Eggs sold today.',
+    'live_birds': 'Birds alive and unsold across all flocks.',
+    'sick_cases_recent': f'Health reports over the last {SICK_WINDOW_DAYS} days.',
+    'birds_sick_recent': f'Birds reported sick over the last {SICK_WINDOW_DAYS} days.',
+}
+
+
+def _total(statement, name):
+    """Label a rollup aggregate as a scalar subquery, treating no rows as zero."""
+    return select(func.coalesce(statement, 0)).scalar_subquery().label(name)
+
+
+def farm_kpis():
+    """
+        Read the farm KPIs from the daily rollup tables in one statement.
+
+        Returns:
+            dict: Eggs collected and sold today, live birds, and sick cases and birds reported over the last week.
+    """
+    today = current_time().date()
+    since = today - timedelta(days=SICK_WINDOW_DAYS - 1)
+    produced_today = select(func.sum(DailyProduction.eggs_collected)).where(DailyProduction.day == today)
+    sold_today = select(func.sum(DailyProduction.eggs_sold)).where(DailyProduction.day == today)
+    recent_cases = select(func.sum(DailySymptomCases.records)).where(DailySymptomCases.day >= since)
+    recent_sick = select(func.sum(DailySymptomCases.birds_sick)).where(DailySymptomCases.day >= since)
+    row = db.session.execute(select(
+        _total(produced_today.scalar_subquery(), 'eggs_collected_today'),
+        _total(sold_today.scalar_subquery(), 'eggs_sold_today'),
+        _total(select(func.sum(DailyFlockStock.live_birds)).scalar_subquery(), 'live_birds'),
+        _total(recent_cases.scalar_subquery(), 'sick_cases_recent'),
+        _total(recent_sick.scalar_subquery(), 'birds_sick_recent'),
+    )).one()
+    return dict(row._mapping)
+
+
+def _labels(**labels):
+    """Format a label set, escaping values as the exposition format requires."""
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+def _pid_alive(pid):
+    """Return whether a process with this pid still exists."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class RequestMetrics:
+    """
+        Per-process request metrics with optional cross-process aggregation.
+
+        Attributes:
+            buckets (tuple): Upper bounds of the latency histogram, in seconds.
+            directory (str): Where processes share their state, or None for this process only.
+            flush_interval (float): Minimum seconds between two writes of this process's state file.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, directory=None, flush_interval=1.0):
+        self.buckets = tuple(buckets)
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._reset()
+
+    def configure(self, directory=None, flush_interval=1.0, buckets=DEFAULT_BUCKETS):
+        """
+            Change where state is shared and the histogram buckets, dropping the collected values.
+
+            Args:
+                directory (str): Shared metrics directory; None reports this process only.
+                flush_interval (float): Minimum seconds between state file writes.
+                buckets (iterable): Latency histogram upper bounds, in seconds.
+        """
+        with self._lock:
+            self.directory = directory
+            self.flush_interval = flush_interval
+            self.buckets = tuple(sorted(buckets))
+            self._reset()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _reset(self):
+        self._requests = {}
+        self._durations = {}
+        self._in_flight = 0
+        self._flushed_at = 0.0
+
+    def _after_fork(self):
+        """Start a forked worker with its own lock and empty counters."""
+        self._lock = threading.Lock()
+        self._reset()
+
+    def init_app(self, app):
+        """
+            Register the request hooks measuring every request.
+
+            Args:
+                app (Flask): The application.
+        """
+        app.before_request(self._start_request)
+        app.after_request(self._record_status)
+        app.teardown_request(self._finish_request)
+
+    def _start_request(self):
+        g.metrics_started_at = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+
+    @staticmethod
+    def _record_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    def _finish_request(self, exception):
+        started = g.pop('metrics_started_at', None)
+        if started is None:
+            return
+        self.observe(request.endpoint or 'unmatched', request.method, g.pop('metrics_status', 500),
+                     time.perf_counter() - started, finished=True)
+        self.flush()
+
+    def observe(self, endpoint, method, status, seconds, finished=False):
+        """
+            Record one handled request.
+
+            Args:
+                endpoint (str): The Flask endpoint, or 'unmatched' for unknown URLs.
+                method (str): The HTTP method.
+                status (int): The response status code.
+                seconds (float): Time spent handling the request.
+                finished (bool): The request was counted as in flight and has now finished.
+        """
+        with self._lock:
+            if finished:
+                self._in_flight -= 1
+            key = (endpoint, method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            histogram = self._durations.setdefault((endpoint, method), [0] * len(self.buckets) + [0, 0.0])
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[index] += 1
+                    break
+            histogram[-2] += 1
+            histogram[-1] += seconds
+
+    def state(self):
+        """
+            Return this process's metrics as a JSON-serializable dict.
+
+            Returns:
+                dict: Request counters, latency histograms, in-flight requests, pool and cache figures.
+        """
+        with self._lock:
+            state = {
+                'pid': os.getpid(),
+                'buckets': list(self.buckets),
+                'requests': [[*key, count] for key, count in self._requests.items()],
+                'durations': [[*key, list(values)] for key, values in self._durations.items()],
+                'in_flight': self._in_flight,
+            }
+        state['pool'] = pool_metrics.snapshot(db.engine)
+        state['caches'] = {
+            'response': [response_cache.hits, response_cache.misses],
+            'identity': [user_cache.hits, user_cache.misses],
+        }
+        state['hash_pending'] = password_hasher.pending
+        return state
+
+    def flush(self, force=False):
+        """
+            Write this process's state file when sharing is enabled and the flush interval has passed.
+
+            Args:
+                force (bool): Write even if the last write was less than `flush_interval` ago.
+        """
+        if not self.directory:
+            return
+        now = time.monotonic()
+        if not force and now - self._flushed_at < self.flush_interval:
+            return
+        self._flushed_at = now
+        state = self.state()
+        path = os.path.join(self.directory, f"{state['pid']}.json")
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as handle:
+            json.dump(state, handle)
+        os.replace(temporary, path)
+
+    def collect(self):
+        """
+            Gather the state of every process sharing the metrics directory.
+
+            Returns:
+                list: `(state, alive)` pairs; only this process when sharing is disabled.
+        """
+        if not self.directory:
+            return [(self.state(), True)]
+        self.flush(force=True)
+        states = []
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as handle:
+                    state = json.load(handle)
+            except (OSError, ValueError):
+                continue  # Being replaced by its worker, or removed
+            states.append((state, state['pid'] == os.getpid() or _pid_alive(state['pid'])))
+        return states
+
+    def render(self, kpis=None):
+        """
+            Render the merged metrics in the Prometheus text exposition format.
+
+            Args:
+                kpis (dict): Farm KPIs from `farm_kpis`, exported as gauges.
+
+            Returns:
+                str: The exposition body.
+        """
+        states = self.collect()
+        requests, durations, pool_counters, pool_gauges = {}, {}, {}, {}
+        caches, in_flight, hash_pending, live = {}, 0, 0, 0
+        for state, alive in states:
+            for *key, count in state['requests']:
+                requests[tuple(key)] = requests.get(tuple(key), 0) + count
+            bounds = state['buckets']
+            for *key, values in state['durations']:
+                merged = durations.setdefault(tuple(key), {'buckets': {}, 'count': 0, 'sum': 0.0})
+                for bound, count in zip(bounds, values):
+                    merged['buckets'][bound] = merged['buckets'].get(bound, 0) + count
+                merged['count'] += values[-2]
+                merged['sum'] += values[-1]
+            for name in POOL_COUNTERS:
+                pool_counters[name] = pool_counters.get(name, 0) + state['pool'].get(name, 0)
+            for cache, (hits, misses) in state['caches'].items():
+                totals = caches.setdefault(cache, [0, 0])
+                totals[0] += hits
+                totals[1] += misses
+            if alive:
+                live += 1
+                in_flight += state['in_flight']
+                hash_pending += state['hash_pending']
+                for name in POOL_GAUGES:
+                    if name in state['pool']:
+                        pool_gauges[name] = pool_gauges.get(name, 0) + state['pool'][name]
+
+        lines = []
+
+        def family(name, kind, text, samples):
+            lines.append(f'# HELP {PREFIX}_{name} {text}')
+            lines.append(f'# TYPE {PREFIX}_{name} {kind}')
+            for suffix, labels, value in samples:
+                lines.append(f'{PREFIX}_{name}{suffix}{_labels(**labels)} {value}')
+
+        family('http_requests_total', 'counter', 'Requests handled, by endpoint, method and status.',
+               [('', {'endpoint': e, 'method': m, 'status': s}, count)
+                for (e, m, s), count in sorted(requests.items())])
+        samples = []
+        for (endpoint, method), merged in sorted(durations.items()):
+            cumulative = 0
+            for bound in sorted(merged['buckets']):
+                cumulative += merged['buckets'][bound]
+                samples.append(('_bucket', {'endpoint': endpoint, 'method': method, 'le': repr(float(bound))},
+                                cumulative))
+            samples.append(('_bucket', {'endpoint': endpoint, 'method': method, 'le': '+Inf'}, merged['count']))
+            samples.append(('_sum', {'endpoint': endpoint, 'method': method}, merged['sum']))
+            samples.append(('_count', {'endpoint': endpoint, 'method': method}, merged['count']))
+        family('http_request_duration_seconds', 'histogram', 'Request latency, by endpoint and method.', samples)
+        family('http_requests_in_flight', 'gauge', 'Requests being handled right now.', [('', {}, in_flight)])
+        family('processes', 'gauge', 'Live processes reporting metrics.', [('', {}, live)])
+
+        for name, text in POOL_COUNTERS.items():
+            metric = name if name.endswith('_total') else f'{name}_total'
+            family(f'db_pool_{metric}', 'counter', text, [('', {}, pool_counters.get(name, 0))])
+        for name, text in POOL_GAUGES.items():
+            if name in pool_gauges:
+                family(f'db_pool_{name}', 'gauge', text, [('', {}, pool_gauges[name])])
+
+        family('cache_hits_total', 'counter', 'Cache lookups served from the cache.',
+               [('', {'cache': cache}, hits) for cache, (hits, _) in sorted(caches.items())])
+        family('cache_misses_total', 'counter', 'Cache lookups that went to the database or view.',
+               [('', {'cache': cache}, misses) for cache, (_, misses) in sorted(caches.items())])
+        family('password_hashes_pending', 'gauge', 'Password hashes queued or running.', [('', {}, hash_pending)])
+
+        for name, value in (kpis or {}).items():
+            family(name, 'gauge', KPI_HELP.get(name, name), [('', {}, value)])
+        return '\n'.join(lines) + '\n'
+
+
+# Shared request metrics, configured in `create_app`
+request_metrics = RequestMetrics()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=request_metrics._after_fork)
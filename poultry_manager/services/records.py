@@ -0,0 +1,361 @@
+"""
+Record Type Registry
+
+This module maps the record slugs used in URLs ('inventory', 'production', 'flock',
+'health_record') to what the generic admin handlers need: the model, the form editing it,
+the columns the form writes, the loader options used to display it and its listing page.
+`edit_record`, `edit_record_modal`, `delete_record` and the bulk actions are written once
+against `RECORD_TYPES`, so a new record type plugs in with a `register` call instead of
+another `elif` branch.
+
+Edits and deletes, of one record or of a whole selection, are single set-based statements
+that never load the records as ORM objects:
+
+    UPDATE production SET ... WHERE production.id = :id
+    DELETE FROM production WHERE production.date_collected >= :from ... RETURNING date_collected, ...
+
+A selection is either a list of IDs or the filters of the record listing (see
+`services/listing.py`), and `count` previews how many records it matches.
+
+Because the statements bypass the unit of work, the dimension foreign keys (see
+`services/dimensions.py`), the daily rollups, the stock ledger corrections of inventory
+purchases (see `services/stock.py`) and the response cache generation are updated here, in
+the same transaction. Editing records that feed a rollup needs
+their previous values: on PostgreSQL the UPDATE reads them from locked copies of the rows
+(`UPDATE ... FROM (SELECT ... FOR UPDATE) AS old RETURNING old.*`), other databases lock and
+read them with a `SELECT` first.
+
+Usage:
+    record_type = RECORD_TYPES['production']
+    if record_type.update(record_id, record_type.values(form)):
+        db.session.commit()
+
+    criteria = record_type.selection(filters=ListingFilters.from_args(request.form))
+    record_type.count(criteria)
+    record_type.delete_where(criteria)
+"""
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import load_only
+from werkzeug.datastructures import MultiDict
+
+from poultry_manager import db
+from poultry_manager.forms import InventoryForm, ProductionForm, FlockForm, HealthRecordForm
+from poultry_manager.models.inventory import Inventory
+from poultry_manager.models.production import Production
+from poultry_manager.models.flock import Flock
+from poultry_manager.models.health_record import HealthRecord
+from poultry_manager.services.dimensions import canonicalize
+from poultry_manager.services.listing import LISTINGS
+from poultry_manager.services.rollups import SPECS, add_delta, apply_deltas
+from poultry_manager.services.response_cache import ResponseCache
+from poultry_manager.services.stock import LEDGER_COLUMNS, lock_purchases, post_corrections
+
+# Upper bound on the IDs accepted in one selection; larger clean-ups select by filter
+MAX_SELECTED_IDS = 10000
+
+
+def parse_ids(values):
+    """
+        Parse submitted record IDs.
+
+        Args:
+            values (list): Raw values, each an ID or a comma-separated list of IDs.
+
+        Returns:
+            list: The distinct valid IDs, in submission order.
+
+        Raises:
+            ValueError: If more than `MAX_SELECTED_IDS` IDs are submitted.
+    """
+    ids = {}
+    for value in values:
+        for part in str(value).split(','):
+            part = part.strip()
+            if part.isdigit():
+                ids[int(part)] = None
+    if len(ids) > MAX_SELECTED_IDS:
+        raise ValueError(f"At most {MAX_SELECTED_IDS} records can be selected by ID; select by filter instead.")
+    return list(ids)
+
+
+class RecordType:
+    """
+        One record type managed through the generic admin handlers.
+
+        Attributes:
+            slug (str): The key used in URLs and response cache generations.
+            model (BaseModel): The record model.
+            form (type): The `FlaskForm` class editing the record.
+            columns (tuple): Names of the columns written from the form fields of the same name.
+            label (str): Human-readable name used in messages.
+            endpoint (str): The endpoint of the record type's listing page.
+            options (tuple): Loader options used when the record is read for display.
+    """
+
+    def __init__(self, slug, model, form, columns, label, endpoint, options=None):
+        self.slug = slug
+        self.model = model
+        self.form = form
+        self.columns = tuple(columns)
+        self.label = label
+        self.endpoint = endpoint
+        self.options = tuple(options) if options is not None else (
+            load_only(*(getattr(model, name) for name in self.columns)),)
+
+    @property
+    def table(self):
+        """The model's table."""
+        return self.model.__table__
+
+    def load(self, record_id):
+        """
+            Read a record for display, with only the columns its form edits.
+
+            Args:
+                record_id (int): The record's primary key.
+
+            Returns:
+                BaseModel: The record, or None if it does not exist.
+        """
+        return db.session.get(self.model, record_id, options=self.options)
+
+    def values(self, form):
+        """
+            Collect the column values of a validated form.
+
+            Args:
+                form (FlaskForm): The submitted form.
+
+            Returns:
+                dict: Column name to value, for every column in `columns`.
+        """
+        return {name: form[name].data for name in self.columns}
+
+    def field_choices(self):
+        """`(column, label)` pairs of the editable columns, labelled like the record's form."""
+        form = self.form(formdata=None, meta={'csrf': False})
+        return [(name, form[name].label.text) for name in self.columns]
+
+    def field_value(self, name, raw):
+        """
+            Validate and convert one submitted value with the form field of the same name.
+
+            Args:
+                name (str): The column to write; must be one of `columns`.
+                raw (str): The submitted value.
+
+            Returns:
+                tuple: `(value, errors)`; `errors` is an empty list when the value is valid.
+        """
+        if name not in self.columns:
+            return None, [f"{name} cannot be edited."]
+        form = self.form(formdata=MultiDict({name: raw}), meta={'csrf': False})
+        field = form[name]
+        if field.validate(form):
+            return field.data, []
+        return None, list(field.errors)
+
+    def selection(self, ids=None, filters=None):
+        """
+            Build the WHERE clauses selecting records by ID or by listing filters.
+
+            Args:
+                ids (list): Record IDs; when given, the filters are ignored.
+                filters (ListingFilters): Filters of the record type's listing.
+
+            Returns:
+                list: The clauses; empty when nothing narrows the selection.
+        """
+        if ids:
+            return [self.table.c.id.in_(ids)]
+        if filters is not None:
+            return LISTINGS[self.slug].criteria(filters)
+        return []
+
+    def count(self, criteria):
+        """
+            Count the records a selection matches.
+
+            Args:
+                criteria (list): WHERE clauses, typically from `selection`.
+
+            Returns:
+                int: The number of matching records.
+        """
+        return db.session.execute(select(func.count()).select_from(self.table).where(*criteria)).scalar_one()
+
+    def update_statement(self, criteria, values, dialect_name):
+        """
+            Build the single UPDATE writing `values` to the selected records.
+
+            For record types feeding a rollup on PostgreSQL, the statement also returns the
+            rollup attributes of every updated record as they were before the update.
+
+            Args:
+                criteria (list): WHERE clauses selecting the records.
+                values (dict): Column name to new value.
+                dialect_name (str): Name of the database dialect the statement runs on.
+
+            Returns:
+                Update: The statement.
+        """
+        table = self.table
+        spec = SPECS.get(self.model)
+        if spec is not None and dialect_name == 'postgresql':
+            old = (select(table.c.id, *(table.c[name] for name in spec.attributes))
+                   .where(*criteria).with_for_update().subquery('old'))
+            return (update(table).where(table.c.id == old.c.id).values(**values)
+                    .returning(*(old.c[name] for name in spec.attributes)))
+        return update(table).where(*criteria).values(**values)
+
+    def update(self, record_id, values):
+        """
+            Write new column values to one record without loading it.
+
+            Args:
+                record_id (int): The record's primary key.
+                values (dict): Column name to new value, typically from `values(form)`.
+
+            Returns:
+                bool: Whether the record exists; the caller commits.
+        """
+        return self.update_where([self.table.c.id == record_id], values) == 1
+
+    def update_where(self, criteria, values):
+        """
+            Write the same column values to every selected record with one statement.
+
+            Args:
+                criteria (list): WHERE clauses selecting the records.
+                values (dict): Column name to new value.
+
+            Returns:
+                int: The number of updated records; the caller commits.
+
+            Raises:
+                ValueError: If `criteria` is empty, which would select the whole table.
+                InsufficientStock: If an inventory edit would remove stock that was already issued.
+        """
+        if not criteria:
+            raise ValueError('Refusing to update without a selection')
+        connection = db.session.connection()
+        # Edited symptoms, medications and breeds also write their dimension foreign keys
+        values = dict(values)
+        canonicalize(connection, self.model, [values])
+        # Edited purchases post their stock ledger corrections before the rows change
+        if self.model is Inventory and any(name in values for name in LEDGER_COLUMNS):
+            post_corrections(connection, [(row, dict(row, **values)) for row in lock_purchases(connection, criteria)])
+        spec = SPECS.get(self.model)
+        statement = self.update_statement(criteria, values, connection.dialect.name)
+        if spec is None:
+            updated = connection.execute(statement).rowcount
+        elif connection.dialect.name == 'postgresql':
+            previous = connection.execute(statement).mappings().all()
+            updated = len(previous)
+        else:
+            previous = self._lock_previous(connection, spec, criteria)
+            updated = connection.execute(statement).rowcount if previous else 0
+        if not updated:
+            return 0
+
+        if spec is not None:
+            deltas = {}
+            for row in previous:
+                add_delta(deltas, spec, row, -1)
+                add_delta(deltas, spec, {name: values.get(name, row[name]) for name in spec.attributes}, 1)
+            apply_deltas(connection, deltas)
+        ResponseCache.bump(connection, [self.slug])
+        return updated
+
+    def delete(self, record_id):
+        """
+            Delete one record without loading it.
+
+            Args:
+                record_id (int): The record's primary key.
+
+            Returns:
+                bool: Whether the record existed; the caller commits.
+        """
+        return self.delete_where([self.table.c.id == record_id]) == 1
+
+    def delete_where(self, criteria):
+        """
+            Delete every selected record with one statement.
+
+            Args:
+                criteria (list): WHERE clauses selecting the records.
+
+            Returns:
+                int: The number of deleted records; the caller commits.
+
+            Raises:
+                ValueError: If `criteria` is empty, which would select the whole table.
+                InsufficientStock: If deleting a purchase would remove stock that was already issued.
+        """
+        if not criteria:
+            raise ValueError('Refusing to delete without a selection')
+        connection = db.session.connection()
+        # Deleted purchases are reversed in the stock ledger before the rows go
+        if self.model is Inventory:
+            post_corrections(connection, [(row, None) for row in lock_purchases(connection, criteria)])
+        spec = SPECS.get(self.model)
+        table = self.table
+        statement = delete(table).where(*criteria)
+        if spec is None:
+            deleted = connection.execute(statement).rowcount
+        elif connection.dialect.delete_returning:
+            previous = connection.execute(
+                statement.returning(*(table.c[name] for name in spec.attributes))).mappings().all()
+            deleted = len(previous)
+        else:
+            previous = self._lock_previous(connection, spec, criteria)
+            deleted = connection.execute(statement).rowcount if previous else 0
+        if not deleted:
+            return 0
+
+        if spec is not None:
+            deltas = {}
+            for row in previous:
+                add_delta(deltas, spec, row, -1)
+            apply_deltas(connection, deltas)
+        ResponseCache.bump(connection, [self.slug])
+        return deleted
+
+    def _lock_previous(self, connection, spec, criteria):
+        """Lock the selected records and read the attributes their rollup contributions depend on."""
+        table = self.table
+        return connection.execute(
+            select(*(table.c[name] for name in spec.attributes)).where(*criteria).with_for_update()
+        ).mappings().all()
+
+
+# Record types managed through the generic admin handlers, keyed by the slug used in routes
+RECORD_TYPES = {}
+
+
+def register(record_type):
+    """
+        Add a record type to `RECORD_TYPES`.
+
+        Args:
+            record_type (RecordType): The record type.
+
+        Returns:
+            RecordType: The registered record type.
+    """
+    RECORD_TYPES[record_type.slug] = record_type
+    return record_type
+
+
+register(RecordType('inventory', Inventory, InventoryForm,
+                    ('item_name', 'category', 'quantity', 'unit', 'cost', 'currency', 'purchase_order_number',
+                     'purchase_date'), 'Inventory', 'main.view_inventory'))
+register(RecordType('production', Production, ProductionForm,
+                    ('number_eggs_collected', 'eggs_sold', 'date_collected'), 'Production', 'main.view_production'))
+register(RecordType('flock', Flock, FlockForm,
+                    ('breed', 'quantity', 'age', 'deaths', 'sold', 'entry_date'), 'Flock', 'main.view_flock'))
+register(RecordType('health_record', HealthRecord, HealthRecordForm,
+                    ('number_sick', 'symptom', 'medication_given', 'date_reported'), 'Health',
+                    'main.view_health_record'))
@@ -0,0 +1,271 @@
+"""
+Response Cache
+
+This module caches whole responses of read-only views (the chart APIs) and adds
+`ETag`/`Cache-Control` headers so browsers revalidate with a cheap `304 Not Modified`.
+
+Cache keys are made of the endpoint, its query arguments and the write generation of every
+record type the view depends on. Generations live in the `cache_generations` table and are
+incremented in the same transaction as the write: an ORM flush listener covers the form
+routes, `edit_record`, `delete_record` and the JSON API, and Core bulk statements call `bump`.
+A changed generation changes the key, so stale entries are never served (they simply age out
+of the backend), and because the counters are in the database this holds across processes
+even with the in-process default backend.
+
+Backends implement `CacheBackend`; `MemoryCache` (a TTL/LRU dict) is the default, and any
+object with the same `get`/`set`/`clear` methods, such as a Redis-backed one, can be passed
+to `configure` or named in `RESPONSE_CACHE_BACKEND` as `package.module:ClassName`.
+
+Usage:
+    @bp.route('/api/production-data')
+    @login_required
+    @admin_required
+    @response_cache.cached('production')
+    def production_data():
+        ...
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from importlib import import_module
+
+from flask import request, session, make_response
+from flask_login import current_user
+from sqlalchemy import event, select
+
+from poultry_manager import db
+from poultry_manager.models.cache_generation import CacheGeneration
+from poultry_manager.models.user import User
+from poultry_manager.models.inventory import Inventory
+from poultry_manager.models.production import Production
+from poultry_manager.models.flock import Flock
+from poultry_manager.models.health_record import HealthRecord
+from poultry_manager.services.rollups import upsert_add
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_SIZE = 512
+CACHE_CONTROL = 'private, no-cache'
+
+# Record types whose writes invalidate cached responses, by the slug used in cache keys
+GENERATION_SLUGS = {
+    User: 'user',
+    Inventory: 'inventory',
+    Production: 'production',
+    Flock: 'flock',
+    HealthRecord: 'health_record',
+}
+
+
+class CacheBackend:
+    """Interface of a response cache backend."""
+
+    def get(self, key):
+        """Return the value stored under `key`, or None if it is missing or expired."""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        """Store `value` under `key` for `ttl` seconds."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Drop every entry."""
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """
+        In-process, thread-safe TTL/LRU cache backend.
+
+        Attributes:
+            maxsize (int): Maximum number of entries kept.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAX_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def load_backend(spec, maxsize=DEFAULT_MAX_SIZE):
+    """
+        Create a backend from its configured name.
+
+        Args:
+            spec (str): 'memory', or `package.module:ClassName` of a `CacheBackend` implementation.
+            maxsize (int): Entry limit of the memory backend.
+
+        Returns:
+            CacheBackend: The backend instance.
+    """
+    if spec == 'memory':
+        return MemoryCache(maxsize)
+    module_name, _, class_name = spec.partition(':')
+    return getattr(import_module(module_name), class_name)()
+
+
+class ResponseCache:
+    """
+        Generation-keyed response cache.
+
+        Attributes:
+            backend (CacheBackend): Where cached responses are stored.
+            ttl (float): Seconds a cached response is kept; 0 disables storing (ETags still apply).
+            hits (int): Responses served from the backend.
+            misses (int): Responses computed by the view.
+    """
+
+    def __init__(self, backend=None, ttl=DEFAULT_TTL_SECONDS):
+        self.backend = backend or MemoryCache()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, backend=None, ttl=DEFAULT_TTL_SECONDS):
+        """
+            Replace the backend and TTL.
+
+            Args:
+                backend (CacheBackend): The backend; a new `MemoryCache` if omitted.
+                ttl (float): Seconds a cached response is kept.
+        """
+        self.backend = backend or MemoryCache()
+        self.ttl = ttl
+
+    def generations(self, slugs):
+        """
+            Read the current write generations of some record types in one query.
+
+            Args:
+                slugs (iterable): Record type slugs (values of `GENERATION_SLUGS`).
+
+            Returns:
+                dict: Slug to generation; types never written have generation 0.
+        """
+        slugs = sorted(slugs)
+        rows = db.session.execute(
+            select(CacheGeneration.model, CacheGeneration.generation).where(CacheGeneration.model.in_(slugs))
+        )
+        found = dict(rows.all())
+        return {slug: found.get(slug, 0) for slug in slugs}
+
+    @staticmethod
+    def bump(connection, slugs):
+        """
+            Increment the write generations of some record types in the caller's transaction.
+
+            Args:
+                connection (Connection): The connection of the transaction that wrote the records.
+                slugs (iterable): Record type slugs.
+        """
+        table = CacheGeneration.__table__
+        for slug in sorted(set(slugs)):
+            upsert_add(connection, table, {'model': slug}, {'generation': 1})
+
+    def cached(self, *slugs, store=True, per_user=False):
+        """
+            Decorate a view whose output only depends on its query arguments and some record types.
+
+            Args:
+                *slugs (str): The record types the view reads.
+                store (bool): Keep responses in the backend; False only adds ETag revalidation.
+                per_user (bool): Key responses by the logged-in user as well (e.g. rendered pages).
+
+            Returns:
+                function: The decorator.
+        """
+        def decorator(view):
+            @wraps(view)
+            def decorated_function(*args, **kwargs):
+                # Pending flash messages are part of the page and are consumed by rendering it
+                if session.get('_flashes'):
+                    return view(*args, **kwargs)
+
+                key = self._key(slugs, per_user, kwargs)
+                etag = hashlib.sha1(key.encode('utf-8')).hexdigest()
+                if etag in request.if_none_match:
+                    response = make_response('', 304)
+                    return self._finalize(response, etag)
+
+                cached = self.backend.get(key) if store and self.ttl > 0 else None
+                if cached is not None:
+                    self.hits += 1
+                    body, mimetype = cached
+                    response = make_response(body)
+                    response.mimetype = mimetype
+                    return self._finalize(response, etag)
+
+                self.misses += 1
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                if store and self.ttl > 0 and not response.is_streamed:
+                    self.backend.set(key, (response.get_data(), response.mimetype), self.ttl)
+                return self._finalize(response, etag)
+            return decorated_function
+        return decorator
+
+    def _key(self, slugs, per_user, view_args):
+        """Build the cache key of the current request."""
+        parts = {
+            'endpoint': request.endpoint,
+            'view_args': view_args,
+            'args': sorted(request.args.items(multi=True)),
+            'generations': self.generations(slugs),
+        }
+        if per_user:
+            parts['user'] = current_user.get_id()
+        return json.dumps(parts, sort_keys=True, default=str)
+
+    @staticmethod
+    def _finalize(response, etag):
+        """Attach the validator and ask browsers to revalidate before reusing the response."""
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = CACHE_CONTROL
+        return response
+
+
+def bump_flushed_generations(session, flush_context):
+    """
+        `after_flush` listener incrementing the generation of every record type written by a flush.
+
+        Args:
+            session (Session): The flushing session.
+            flush_context (UOWTransaction): The flush context (unused).
+    """
+    slugs = {GENERATION_SLUGS[type(record)] for record in (*session.new, *session.dirty, *session.deleted)
+             if type(record) in GENERATION_SLUGS}
+    if slugs:
+        ResponseCache.bump(session.connection(), slugs)
+
+
+event.listen(db.session, 'after_flush', bump_flushed_generations)
+
+# Shared response cache, configured in `create_app`
+response_cache = ResponseCache()
@@ -0,0 +1,310 @@
+"""
+Daily Rollup Maintenance
+
+This module keeps the rollup tables in `poultry_manager.models.rollup` in step with the raw
+record tables. An `after_flush` session listener turns every inserted, updated or deleted
+`Production`, `Flock` and `HealthRecord` into per-day deltas and applies them with upserts on
+the flushing connection, so the rollups change inside the same transaction as the records
+that `add_production`, `add_flock` and `add_health_record` commit. The same deltas maintain the
+record counters of the symptom, medication and breed dimension rows the records reference.
+
+Writes that bypass the ORM unit of work (bulk Core statements, such as the imports and the
+single-statement edits and deletes of `services/records.py`) must call `apply_deltas`
+themselves, or be followed by a rebuild:
+
+    flask rollups rebuild
+"""
+
+from collections import Counter
+from datetime import datetime
+from importlib import import_module
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import event, inspect, delete, insert, select, update, func, and_
+
+from poultry_manager import db
+from poultry_manager.models.production import Production
+from poultry_manager.models.flock import Flock
+from poultry_manager.models.health_record import HealthRecord
+from poultry_manager.models.dimension import Dimension, Symptom, Medication, Breed
+from poultry_manager.models.rollup import DailyProduction, DailyFlockStock, DailySymptomCases
+
+
+def _day(value):
+    """Reduce a date or datetime to a date."""
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _production_contribution(values):
+    """Rollup key and measures contributed by one production record."""
+    keys = {'day': _day(values['date_collected'])}
+    measures = {
+        'records': 1,
+        'eggs_collected': values['number_eggs_collected'] or 0,
+        'eggs_sold': values['eggs_sold'] or 0
+    }
+    return keys, measures
+
+
+def _flock_contribution(values):
+    """Rollup key and measures contributed by one flock record."""
+    quantity, deaths, sold = values['quantity'] or 0, values['deaths'] or 0, values['sold'] or 0
+    keys = {'day': _day(values['entry_date']), 'breed_id': values['breed_id']}
+    measures = {
+        'records': 1,
+        'quantity': quantity,
+        'deaths': deaths,
+        'sold': sold,
+        'live_birds': quantity - deaths - sold
+    }
+    return keys, measures
+
+
+def _health_record_contribution(values):
+    """Rollup key and measures contributed by one health record."""
+    keys = {'day': _day(values['date_reported']), 'symptom_id': values['symptom_id']}
+    measures = {'records': 1, 'birds_sick': values['number_sick'] or 0}
+    return keys, measures
+
+
+class RollupSpec:
+    """
+        Describes how one record model feeds one rollup table.
+
+        Attributes:
+            model (BaseModel): The raw record model.
+            rollup (db.Model): The rollup model it feeds.
+            attributes (tuple): Record attributes the contribution depends on.
+            contribution (callable): Maps a dict of attribute values to `(keys, measures)`.
+            counters (tuple): `(attribute, dimension)` pairs of the dimension rows whose record
+                counter counts the record.
+    """
+
+    def __init__(self, model, rollup, attributes, contribution, counters=()):
+        self.model = model
+        self.rollup = rollup
+        self.attributes = attributes
+        self.contribution = contribution
+        self.counters = counters
+
+    def values(self, record, old=False):
+        """
+            Read the attributes a contribution depends on.
+
+            Args:
+                record (BaseModel): The record instance.
+                old (bool): Read the values as they were before the pending changes.
+
+            Returns:
+                dict: Attribute name to value.
+        """
+        state = inspect(record)
+        values = {}
+        for name in self.attributes:
+            history = state.attrs[name].history
+            if old and history.deleted:
+                values[name] = history.deleted[0]
+            else:
+                values[name] = getattr(record, name)
+        return values
+
+    def changed(self, record):
+        """Whether any attribute the contribution depends on has pending changes."""
+        state = inspect(record)
+        return any(state.attrs[name].history.has_changes() for name in self.attributes)
+
+
+SPECS = {
+    Production: RollupSpec(Production, DailyProduction,
+                           ('date_collected', 'number_eggs_collected', 'eggs_sold'),
+                           _production_contribution),
+    Flock: RollupSpec(Flock, DailyFlockStock,
+                      ('entry_date', 'breed_id', 'quantity', 'deaths', 'sold'),
+                      _flock_contribution, counters=(('breed_id', Breed),)),
+    HealthRecord: RollupSpec(HealthRecord, DailySymptomCases,
+                             ('date_reported', 'symptom_id', 'medication_id', 'number_sick'),
+                             _health_record_contribution,
+                             counters=(('symptom_id', Symptom), ('medication_id', Medication))),
+}
+
+
+def add_delta(deltas, spec, values, sign):
+    """
+        Accumulate the contribution of one record into a delta map.
+
+        Args:
+            deltas (dict): Map of `(rollup or dimension, key items)` to a Counter of measure deltas.
+            spec (RollupSpec): The spec of the record's model.
+            values (dict): The record's attribute values.
+            sign (int): +1 to add the record, -1 to remove it.
+    """
+    keys, measures = spec.contribution(values)
+    counter = deltas.setdefault((spec.rollup, tuple(sorted(keys.items()))), Counter())
+    for name, amount in measures.items():
+        counter[name] += sign * amount
+    for name, dimension in spec.counters:
+        deltas.setdefault((dimension, (('id', values[name]),)), Counter())['records'] += sign
+
+
+def apply_deltas(connection, deltas):
+    """
+        Apply accumulated deltas to the rollup tables with upserts.
+
+        Rollup rows whose record count drops to zero are removed. Dimension rows are only
+        updated: they exist before any record references them and are never removed.
+
+        Args:
+            connection (Connection): The connection of the transaction that changed the records.
+            deltas (dict): Map produced by `add_delta`.
+    """
+    for (rollup, key_items), counter in deltas.items():
+        measures = {name: amount for name, amount in counter.items()}
+        if not any(measures.values()):
+            continue
+        keys = dict(key_items)
+        table = rollup.__table__
+        if issubclass(rollup, Dimension):
+            connection.execute(update(table).where(_key_clause(table, keys))
+                               .values({name: table.c[name] + amount for name, amount in measures.items()}))
+            continue
+        upsert_add(connection, table, keys, measures)
+        if measures.get('records', 0) < 0:
+            connection.execute(delete(table).where(_key_clause(table, keys), table.c.records <= 0))
+
+
+def _key_clause(table, keys):
+    """Build the WHERE clause matching a rollup row by its key columns."""
+    return and_(*(table.c[name] == value for name, value in keys.items()))
+
+
+def upsert_add(connection, table, keys, measures):
+    """
+        Add amounts to the counter columns of a row, inserting the row when missing.
+
+        Args:
+            connection (Connection): The connection to execute on.
+            table (Table): The table holding the counters.
+            keys (dict): Primary key column values identifying the row.
+            measures (dict): Counter column name to the amount added.
+    """
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        # The connection already imported its dialect; importing both up front would slow down app startup
+        dialect_insert = import_module(f'sqlalchemy.dialects.{dialect}').insert
+        statement = dialect_insert(table).values(**keys, **measures)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: table.c[name] + statement.excluded[name] for name in measures}
+        )
+        connection.execute(statement)
+        return
+
+    result = connection.execute(
+        update(table).where(_key_clause(table, keys))
+        .values({name: table.c[name] + amount for name, amount in measures.items()})
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(table).values(**keys, **measures))
+
+
+def maintain_rollups(session, flush_context):
+    """
+        `after_flush` listener translating flushed record changes into rollup deltas.
+
+        Args:
+            session (Session): The flushing session.
+            flush_context (UOWTransaction): The flush context (unused).
+    """
+    deltas = {}
+    for record in session.new:
+        spec = SPECS.get(type(record))
+        if spec:
+            add_delta(deltas, spec, spec.values(record), 1)
+    for record in session.deleted:
+        spec = SPECS.get(type(record))
+        if spec:
+            add_delta(deltas, spec, spec.values(record, old=True), -1)
+    for record in session.dirty:
+        spec = SPECS.get(type(record))
+        if spec and spec.changed(record):
+            add_delta(deltas, spec, spec.values(record, old=True), -1)
+            add_delta(deltas, spec, spec.values(record), 1)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+def _track_previous_value(target, value, oldvalue, initiator):
+    """Attribute `set` listener whose only purpose is to request active history."""
+    return value
+
+
+event.listen(db.session, 'after_flush', maintain_rollups)
+
+# Load the previous value when a tracked attribute of an expired record is overwritten,
+# so that edits can subtract the old contribution
+for _spec in SPECS.values():
+    for _name in _spec.attributes:
+        event.listen(getattr(_spec.model, _name), 'set', _track_previous_value, active_history=True, retval=True)
+
+
+def rebuild_rollups():
+    """
+        Recompute every rollup table, and the dimension record counters, from the raw record tables.
+
+        Runs in the current session transaction; the caller commits.
+
+        Returns:
+            dict: Rollup table name to number of rows written.
+    """
+    day = func.date
+    sources = [
+        (DailyProduction, select(
+            day(Production.date_collected).label('day'),
+            func.count(Production.id),
+            func.sum(Production.number_eggs_collected),
+            func.sum(func.coalesce(Production.eggs_sold, 0))
+        ).group_by(day(Production.date_collected)),
+            ['day', 'records', 'eggs_collected', 'eggs_sold']),
+        (DailyFlockStock, select(
+            day(Flock.entry_date).label('day'),
+            Flock.breed_id,
+            func.count(Flock.id),
+            func.sum(Flock.quantity),
+            func.sum(func.coalesce(Flock.deaths, 0)),
+            func.sum(func.coalesce(Flock.sold, 0)),
+            func.sum(Flock.quantity - func.coalesce(Flock.deaths, 0) - func.coalesce(Flock.sold, 0))
+        ).group_by(day(Flock.entry_date), Flock.breed_id),
+            ['day', 'breed_id', 'records', 'quantity', 'deaths', 'sold', 'live_birds']),
+        (DailySymptomCases, select(
+            day(HealthRecord.date_reported).label('day'),
+            HealthRecord.symptom_id,
+            func.count(HealthRecord.id),
+            func.sum(func.coalesce(HealthRecord.number_sick, 0))
+        ).group_by(day(HealthRecord.date_reported), HealthRecord.symptom_id),
+            ['day', 'symptom_id', 'records', 'birds_sick']),
+    ]
+
+    written = {}
+    for rollup, source, columns in sources:
+        db.session.execute(delete(rollup))
+        result = db.session.execute(insert(rollup).from_select(columns, source))
+        written[rollup.__tablename__] = result.rowcount
+
+    for dimension, foreign_key in ((Symptom, HealthRecord.symptom_id), (Medication, HealthRecord.medication_id),
+                                   (Breed, Flock.breed_id)):
+        records = select(func.count()).where(foreign_key == dimension.id).scalar_subquery()
+        db.session.execute(update(dimension).values(records=records))
+    return written
+
+
+rollups_cli = AppGroup('rollups', help='Maintain the daily rollup tables.')
+
+
+@rollups_cli.command('rebuild')
+def rebuild_command():
+    """Rebuild all rollup tables from the raw record tables."""
+    written = rebuild_rollups()
+    db.session.commit()
+    for table, rows in written.items():
+        click.echo(f"{table}: {rows} rows")
@@ -0,0 +1,301 @@
+"""
+Full-Text Record Search
+
+This module searches the free-text columns admins look records up by: health record symptoms
+and medications, flock breeds, and inventory item names and purchase order numbers. Results
+from every record type are ranked together and paginated, and `suggest` offers the matching
+values as the admin types.
+
+Every lookup is served by an index rather than a scan:
+
+* PostgreSQL: each source table has a GIN expression index over
+  `to_tsvector('simple', <columns>)`; queries use the same expression with a prefix
+  `to_tsquery` (`cocc:*`) and are ranked with `ts_rank`.
+* SQLite (development and tests): each source table has an external-content FTS5 table
+  (`<table>_search`) kept in step by triggers, so ORM writes, bulk imports and bulk actions
+  are all indexed; queries use `MATCH` with prefix terms and are ranked with `bm25`.
+* Other databases fall back to `LIKE` scans.
+
+The FTS5 tables and triggers are created with their source tables (and by the migration); the
+GIN indexes are only created on PostgreSQL. Search terms are reduced to words before they reach
+either query language, so user input cannot inject query syntax. The 'simple' configuration
+does not stem, which keeps prefix matching predictable for medicine and breed names.
+
+Usage:
+    page = search('cocc', kinds=['health_record'], page=1)
+    suggest('tylo')  # ['Tylosin', ...]
+"""
+
+import re
+
+from sqlalchemy import DDL, String, and_, cast, column, event, func, literal, literal_column, null, or_
+from sqlalchemy import select, table, union_all
+
+from poultry_manager import db
+from poultry_manager.models.flock import Flock
+from poultry_manager.models.health_record import HealthRecord
+from poultry_manager.models.inventory import Inventory
+
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+MAX_TERMS = 8
+SUGGESTION_CANDIDATES = 50
+
+
+def _inline(value):
+    """A string literal rendered into the SQL text rather than bound as a parameter."""
+    return literal(value, String, literal_execute=True)
+
+
+class SearchSource:
+    """
+        One record type whose text columns are searchable.
+
+        Attributes:
+            kind (str): The record slug (as used in routes and `RECORD_TYPES`).
+            label (str): Human-readable name of the record type.
+            model (BaseModel): The record model.
+            columns (tuple): Names of the searched columns, the most descriptive first (at most two).
+            date_column (str): Name of the column shown as the record's date.
+    """
+
+    def __init__(self, kind, label, model, columns, date_column):
+        self.kind = kind
+        self.label = label
+        self.model = model
+        self.columns = tuple(columns)
+        self.date_column = date_column
+
+    @property
+    def fts_table(self):
+        """Name of the SQLite FTS5 table indexing the source table."""
+        return f'{self.model.__tablename__}_search'
+
+    def document(self):
+        """
+            The PostgreSQL text search document of a row.
+
+            Literals are rendered inline, so queries repeat the indexed expression of
+            `postgresql_ddl()` exactly.
+
+            Returns:
+                ColumnElement: `to_tsvector('simple', coalesce(a, '') || ' ' || coalesce(b, ''))`.
+        """
+        text = None
+        for name in self.columns:
+            part = func.coalesce(getattr(self.model, name), _inline(''))
+            text = part if text is None else text.op('||')(_inline(' ')).op('||')(part)
+        return func.to_tsvector(_inline('simple'), text)
+
+    def postgresql_ddl(self):
+        """
+            Statement creating the GIN index over `document()`.
+
+            The index expression is written out so that building it does not need the PostgreSQL
+            dialect, which is only imported when the application runs on PostgreSQL.
+
+            Returns:
+                str: The CREATE INDEX statement.
+        """
+        text = " || ' ' || ".join(f"coalesce({name}, '')" for name in self.columns)
+        return (f"CREATE INDEX ix_{self.model.__tablename__}_search ON {self.model.__tablename__} "
+                f"USING gin (to_tsvector('simple', {text}))")
+
+    def sqlite_ddl(self):
+        """
+            Statements creating the FTS5 table and the triggers keeping it in step with the source table.
+
+            Returns:
+                list: SQL statements, in execution order.
+        """
+        source, fts = self.model.__tablename__, self.fts_table
+        names = ', '.join(self.columns)
+        new = ', '.join(f'new.{name}' for name in self.columns)
+        old = ', '.join(f'old.{name}' for name in self.columns)
+        return [
+            f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='{source}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')",
+            f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {source} BEGIN "
+            f"INSERT INTO {fts} (rowid, {names}) VALUES (new.id, {new}); END",
+            f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {source} BEGIN "
+            f"INSERT INTO {fts} ({fts}, rowid, {names}) VALUES ('delete', old.id, {old}); END",
+            f"CREATE TRIGGER {fts}_update AFTER UPDATE OF {names} ON {source} BEGIN "
+            f"INSERT INTO {fts} ({fts}, rowid, {names}) VALUES ('delete', old.id, {old}); "
+            f"INSERT INTO {fts} (rowid, {names}) VALUES (new.id, {new}); END",
+        ]
+
+    def _result_columns(self, rank):
+        """The columns every source contributes to the ranked union."""
+        model = self.model
+        detail = getattr(model, self.columns[1]) if len(self.columns) > 1 else cast(null(), String)
+        return (
+            literal(self.kind, String).label('kind'),
+            model.id.label('id'),
+            getattr(model, self.columns[0]).label('title'),
+            detail.label('detail'),
+            getattr(model, self.date_column).label('day'),
+            model.created_by_username.label('entered_by'),
+            rank.label('rank'),
+        )
+
+    def select_matches(self, dialect_name, terms):
+        """
+            Build the SELECT of this source's records matching every term as a prefix.
+
+            Args:
+                dialect_name (str): Name of the database dialect the query runs on.
+                terms (list): Lower-case search words.
+
+            Returns:
+                Select: Rows of `kind`, `id`, `title`, `detail`, `day`, `entered_by` and `rank`
+                (higher is better).
+        """
+        if dialect_name == 'postgresql':
+            document = self.document()
+            query = func.to_tsquery(_inline('simple'), ' & '.join(f'{term}:*' for term in terms))
+            return select(*self._result_columns(func.ts_rank(document, query))).where(document.op('@@')(query))
+
+        if dialect_name == 'sqlite':
+            fts = table(self.fts_table, column('rowid'))
+            fts_name = literal_column(self.fts_table)
+            return (select(*self._result_columns(-func.bm25(fts_name)))
+                    .select_from(fts.join(self.model.__table__, self.model.id == fts.c.rowid))
+                    .where(fts_name.op('MATCH')(' '.join(f'"{term}"*' for term in terms))))
+
+        # No text index: every term must start a word of some searched column
+        matches = [or_(*(or_(func.lower(getattr(self.model, name)).like(f'{term}%'),
+                             func.lower(getattr(self.model, name)).like(f'% {term}%'))
+                         for name in self.columns))
+                   for term in terms]
+        return select(*self._result_columns(literal(0.0))).where(and_(*matches))
+
+
+# Searchable record types, in the order their results are listed on equal rank
+SOURCES = {
+    'health_record': SearchSource('health_record', 'Health record', HealthRecord,
+                                  ('symptom', 'medication_given'), 'date_reported'),
+    'flock': SearchSource('flock', 'Flock', Flock, ('breed',), 'entry_date'),
+    'inventory': SearchSource('inventory', 'Inventory', Inventory,
+                              ('item_name', 'purchase_order_number'), 'purchase_date'),
+}
+
+for _source in SOURCES.values():
+    # Created and dropped with their source tables; migration 7d3e9b1f4c28 creates them for existing databases
+    event.listen(_source.model.__table__, 'after_create',
+                 DDL(_source.postgresql_ddl()).execute_if(dialect='postgresql'))
+    for _statement in _source.sqlite_ddl():
+        event.listen(_source.model.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+    event.listen(_source.model.__table__, 'before_drop',
+                 DDL(f'DROP TABLE IF EXISTS {_source.fts_table}').execute_if(dialect='sqlite'))
+
+
+def search_terms(text):
+    """
+        Reduce a search string to the words it is matched by.
+
+        Args:
+            text (str): The raw search string.
+
+        Returns:
+            list: Up to `MAX_TERMS` lower-case words; punctuation and query operators are dropped.
+    """
+    return re.findall(r'\w+', (text or '').lower())[:MAX_TERMS]
+
+
+class SearchPage:
+    """
+        One page of ranked search results.
+
+        Attributes:
+            query (str): The search string.
+            items (list): Result rows (`kind`, `id`, `title`, `detail`, `day`, `entered_by`, `rank`), best first.
+            page (int): The 1-based page number.
+            per_page (int): Number of results per page.
+            has_next (bool): Whether another page of results exists.
+    """
+
+    def __init__(self, query, items, page, per_page, has_next):
+        self.query = query
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.has_next = has_next
+
+    @property
+    def has_prev(self):
+        """Whether a previous page exists."""
+        return self.page > 1
+
+    def to_dict(self):
+        """Serialize the page for the JSON API."""
+        return {
+            'query': self.query,
+            'page': self.page,
+            'per_page': self.per_page,
+            'has_next': self.has_next,
+            'items': [{
+                'kind': row.kind,
+                'id': row.id,
+                'title': row.title,
+                'detail': row.detail,
+                'date': row.day.date().isoformat() if row.day else None,
+                'entered_by': row.entered_by,
+                'rank': round(float(row.rank), 6),
+            } for row in self.items],
+        }
+
+
+def search(text, kinds=None, page=1, per_page=DEFAULT_PER_PAGE):
+    """
+        Search the text columns of every source, best matches first.
+
+        Args:
+            text (str): The search string; each of its words must prefix a word of the record.
+            kinds (list): Restrict the search to these record slugs (default: all of `SOURCES`).
+            page (int): The 1-based page number.
+            per_page (int): Results per page, clamped to `MAX_PER_PAGE`.
+
+        Returns:
+            SearchPage: The requested page; empty when the string has no words.
+    """
+    page = max(1, page)
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    terms = search_terms(text)
+    sources = [source for kind, source in SOURCES.items() if not kinds or kind in kinds]
+    if not terms or not sources:
+        return SearchPage(text, [], page, per_page, False)
+
+    dialect_name = db.session.get_bind().dialect.name
+    matches = union_all(*(source.select_matches(dialect_name, terms) for source in sources)).subquery('matches')
+    rows = db.session.execute(
+        select(matches)
+        .order_by(matches.c.rank.desc(), matches.c.day.desc(), matches.c.id.desc())
+        .limit(per_page + 1).offset((page - 1) * per_page)
+    ).all()
+    return SearchPage(text, rows[:per_page], page, per_page, len(rows) > per_page)
+
+
+def suggest(text, limit=8):
+    """
+        Typeahead values for a partial search string.
+
+        Args:
+            text (str): What the admin has typed so far.
+            limit (int): Maximum number of suggestions.
+
+        Returns:
+            list: Distinct column values (e.g. 'Coccidiosis') of the best matches containing a word
+            that starts with the last typed word.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return []
+    last = terms[-1]
+    suggestions = {}
+    for row in search(text, per_page=SUGGESTION_CANDIDATES).items:
+        for value in (row.title, row.detail):
+            if value and any(word.startswith(last) for word in re.findall(r'\w+', value.lower())):
+                suggestions.setdefault(value.lower(), value)
+        if len(suggestions) >= limit:
+            break
+    return list(suggestions.values())[:limit]
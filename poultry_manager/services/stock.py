@@ -0,0 +1,444 @@
+"""
+Inventory Stock Ledger
+
+This module posts stock movements (purchases, consumption and adjustments) to the append-only
+ledger of `poultry_manager.models.stock` and answers stock questions without summing history:
+
+- Current stock and value are one `StockItem` row, updated with every posting.
+- Every `StockMovement` stores the running balance after it, so the stock as of a past moment
+  is one index seek and the history of a date range is one range scan of
+  `ix_stock_movements_item_id_occurred_at_id`.
+
+Stock is valued two ways. FIFO: received stock opens a `StockLot` at its unit cost and issued
+stock consumes the oldest open lots. Moving average cost: issued stock is valued at the average
+cost of the stock on hand. Positive adjustments without a cost come in at the current average.
+
+Every `Inventory` purchase is posted as a purchase movement: ORM inserts by an `after_flush`
+session listener, bulk imports by `post_purchases`. Items are matched by the canonical key of
+their name and unit (see `services/dimensions.py`) and by currency, so "Layer feed" bought in
+"bags" and "Layer Feed " in "bag" are one item.
+
+The ledger is never rewritten. Editing the item name, unit, currency, quantity or cost of an
+`Inventory` row, or deleting it, posts compensating adjustments in the same transaction (see
+`post_corrections`): ORM writes by a `before_flush` session listener, the single-statement edits
+and deletes of `services/records.py` by calling `lock_purchases` and `post_corrections` before
+their statement. A correction that would remove stock already consumed raises
+`InsufficientStock` and the write is rolled back.
+
+Postings to one item are serialized by locking its `StockItem` row, and movements are applied in
+ID order, which is also their `occurred_at` order. A movement is dated when it is recorded, never
+backdated: a purchase entered today for last week is posted today and keeps its
+`purchase_date` in a column of its own, so history and point-in-time balances are the same
+whether a purchase was posted live or backfilled by the migration (dated at the inventory
+record's `created_at`).
+
+Usage:
+    post(db.session.connection(), item_id, [{'kind': 'consumption', 'quantity': -3}])
+    db.session.commit()
+    history(item_id, date_from=date(2024, 3, 1))
+"""
+
+from datetime import datetime, timedelta
+from importlib import import_module
+
+from sqlalchemy import delete, event, insert, inspect, select, update
+
+from poultry_manager import db
+from poultry_manager.models.base_model import current_time
+from poultry_manager.models.inventory import Inventory
+from poultry_manager.models.stock import StockItem, StockMovement, StockLot
+from poultry_manager.services.dimensions import canonical_key
+from poultry_manager.services.response_cache import ResponseCache
+
+KINDS = ('purchase', 'consumption', 'adjustment')
+DEFAULT_HISTORY_LIMIT = 100
+MAX_HISTORY_LIMIT = 1000
+
+
+class InsufficientStock(ValueError):
+    """Raised when a movement would issue more stock than is on hand."""
+
+
+def _money(value):
+    """Round a value to the precision stored for money."""
+    return round(value, 6)
+
+
+def item_key(name, unit, currency):
+    """
+        The identity of the stock item a purchase belongs to.
+
+        Args:
+            name (str): The item name, as entered.
+            unit (str): The unit of measurement, as entered.
+            currency (str): The currency of the cost.
+
+        Returns:
+            tuple: `(key, unit, currency)`, matching the `unique_stock_item` constraint.
+    """
+    return canonical_key(name), canonical_key(unit), currency
+
+
+def resolve_items(connection, purchases):
+    """
+        Find or create the stock items of some purchases.
+
+        Args:
+            connection (Connection): The connection of the transaction posting the purchases.
+            purchases (list): `Inventory` column values (`item_name`, `unit`, `currency`, `category`).
+
+        Returns:
+            dict: `item_key(...)` to stock item ID, for every purchase.
+    """
+    table = StockItem.__table__
+    wanted = {}
+    for values in purchases:
+        wanted.setdefault(item_key(values['item_name'], values['unit'], values['currency']), values)
+    if not wanted:
+        return {}
+
+    def lookup(keys):
+        rows = connection.execute(select(table.c.key, table.c.unit, table.c.currency, table.c.id)
+                                  .where(table.c.key.in_({key for key, _, _ in keys}))).all()
+        return {(key, unit, currency): item_id for key, unit, currency, item_id in rows
+                if (key, unit, currency) in keys}
+
+    ids = lookup(wanted)
+    missing = [{'key': key[0], 'unit': key[1], 'currency': key[2], 'name': ' '.join(values['item_name'].split()),
+                'category': values['category'], 'unit_label': values['unit'].strip(), 'on_hand': 0,
+                'fifo_value': 0.0, 'average_value': 0.0}
+               for key, values in wanted.items() if key not in ids]
+    if missing:
+        dialect = connection.dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            # The connection already imported its dialect (see services/rollups.py)
+            statement = import_module(f'sqlalchemy.dialects.{dialect}').insert(table).on_conflict_do_nothing(
+                index_elements=['key', 'unit', 'currency'])
+        else:
+            statement = insert(table)
+        connection.execute(statement, missing)
+        ids.update(lookup({(row['key'], row['unit'], row['currency']) for row in missing}))
+    return ids
+
+
+def post(connection, item_id, entries):
+    """
+        Append movements to one item's ledger and update its balance and FIFO lots.
+
+        Every entry is validated against the running balance before anything is written, so a
+        rejected posting leaves the ledger untouched.
+
+        Args:
+            connection (Connection): The connection of the transaction; the caller commits.
+            item_id (int): The stock item.
+            entries (list): Dicts with `kind` (one of `KINDS`) and the signed `quantity`, and
+                optionally `unit_cost` (stock received), `note`, `inventory_id`, `purchase_date`,
+                `user_id`, `created_by_username` and `occurred_at` (defaults to now). Stock issued
+                with `reverses` set to an `Inventory` ID is taken from that purchase's lots first.
+
+        Returns:
+            list: The inserted movement IDs, in entry order.
+
+        Raises:
+            LookupError: If the item does not exist.
+            InsufficientStock: If an entry issues more than the quantity on hand.
+            ValueError: If an entry has an unknown kind, a zero quantity or a quantity of the wrong sign.
+    """
+    items, lots_table = StockItem.__table__, StockLot.__table__
+    item = connection.execute(select(items).where(items.c.id == item_id).with_for_update()).mappings().first()
+    if item is None:
+        raise LookupError(f"Unknown stock item: {item_id}")
+    on_hand, fifo_balance, average_balance = item['on_hand'], item['fifo_value'], item['average_value']
+
+    # Open lots are only read when stock is issued
+    lots = []
+    if any(entry['quantity'] < 0 for entry in entries):
+        movements_table = StockMovement.__table__
+        lots = [dict(row) for row in connection.execute(
+            select(lots_table.c.id, lots_table.c.unit_cost, lots_table.c.remaining, movements_table.c.inventory_id)
+            .join(movements_table, movements_table.c.id == lots_table.c.movement_id)
+            .where(lots_table.c.item_id == item_id).order_by(lots_table.c.id).with_for_update(of=lots_table)
+        ).mappings()]
+    changed_lots = set()
+
+    now = current_time()
+    movements = []
+    for entry in entries:
+        kind, quantity = entry['kind'], entry['quantity']
+        if kind not in KINDS:
+            raise ValueError(f"Invalid movement kind: {kind}")
+        if quantity == 0 or (kind == 'purchase' and quantity < 0) or (kind == 'consumption' and quantity > 0):
+            raise ValueError(f"Invalid quantity for a {kind}: {quantity}")
+
+        if quantity > 0:
+            unit_cost = entry.get('unit_cost')
+            if unit_cost is None:
+                unit_cost = average_balance / on_hand if on_hand else 0.0
+            fifo_value = average_value = _money(quantity * unit_cost)
+            lots.append({'id': None, 'unit_cost': unit_cost, 'remaining': quantity, 'movement': len(movements),
+                         'inventory_id': entry.get('inventory_id')})
+        else:
+            issued = -quantity
+            if issued > on_hand:
+                raise InsufficientStock(
+                    f"Only {on_hand} {item['unit_label']} of {item['name']} in stock, {issued} needed.")
+            # A reversed purchase gives back what is left of its own lots first, then the oldest stock
+            reverses = entry.get('reverses')
+            order = lots if reverses is None else sorted(
+                lots, key=lambda lot: lot['id'] is None or lot['inventory_id'] != reverses)
+            fifo_cost, left = 0.0, issued
+            for lot in order:
+                if not left:
+                    break
+                taken = min(left, lot['remaining'])
+                if taken:
+                    fifo_cost += taken * lot['unit_cost']
+                    lot['remaining'] -= taken
+                    left -= taken
+                    if lot['id'] is not None:
+                        changed_lots.add(lot['id'])
+            unit_cost = fifo_cost / issued
+            fifo_value = -_money(fifo_cost)
+            average_value = -_money(average_balance * issued / on_hand)
+
+        on_hand += quantity
+        # An empty item has no value left, whatever the rounding
+        fifo_balance = _money(fifo_balance + fifo_value) if on_hand else 0.0
+        average_balance = _money(average_balance + average_value) if on_hand else 0.0
+        movements.append({
+            'item_id': item_id, 'kind': kind, 'quantity': quantity, 'unit_cost': unit_cost,
+            'fifo_value': fifo_value, 'average_value': average_value, 'on_hand': on_hand,
+            'fifo_balance': fifo_balance, 'average_balance': average_balance,
+            'occurred_at': entry.get('occurred_at') or now, 'note': entry.get('note'),
+            'inventory_id': entry.get('inventory_id'), 'purchase_date': entry.get('purchase_date'),
+            'user_id': entry.get('user_id'),
+            'created_by_username': entry.get('created_by_username'),
+        })
+
+    movement_ids = connection.execute(
+        insert(StockMovement.__table__).returning(StockMovement.__table__.c.id, sort_by_parameter_order=True),
+        movements
+    ).scalars().all()
+
+    new_lots = [{'item_id': item_id, 'movement_id': movement_ids[lot['movement']], 'unit_cost': lot['unit_cost'],
+                 'remaining': lot['remaining']} for lot in lots if lot['id'] is None and lot['remaining']]
+    if new_lots:
+        connection.execute(insert(lots_table), new_lots)
+    emptied = [lot['id'] for lot in lots if lot['id'] in changed_lots and not lot['remaining']]
+    if emptied:
+        connection.execute(delete(lots_table).where(lots_table.c.id.in_(emptied)))
+    for lot in lots:
+        if lot['id'] in changed_lots and lot['remaining']:
+            connection.execute(update(lots_table).where(lots_table.c.id == lot['id'])
+                               .values(remaining=lot['remaining']))
+
+    connection.execute(update(items).where(items.c.id == item_id).values(
+        on_hand=on_hand, fifo_value=fifo_balance, average_value=average_balance,
+        last_movement_at=movements[-1]['occurred_at']))
+    ResponseCache.bump(connection, ['stock'])
+    return movement_ids
+
+
+def post_purchases(connection, purchases):
+    """
+        Post inventory purchases as purchase movements, one posting per item.
+
+        Args:
+            connection (Connection): The connection of the transaction inserting the purchases.
+            purchases (list): `Inventory` column values including `id`, in insertion order; the
+                movements are dated now and keep each purchase's `purchase_date`.
+    """
+    if not purchases:
+        return
+    items = resolve_items(connection, purchases)
+    entries = {}
+    for values in purchases:
+        item_id = items[item_key(values['item_name'], values['unit'], values['currency'])]
+        entries.setdefault(item_id, []).append({
+            'kind': 'purchase', 'quantity': values['quantity'], 'unit_cost': values['cost'],
+            'inventory_id': values['id'], 'purchase_date': values.get('purchase_date'),
+            'user_id': values.get('user_id'),
+            'created_by_username': values.get('created_by_username'),
+        })
+    # Lock items in a fixed order so concurrent postings cannot deadlock
+    for item_id in sorted(entries):
+        post(connection, item_id, entries[item_id])
+
+
+PURCHASE_COLUMNS = ('id', 'item_name', 'unit', 'currency', 'category', 'quantity', 'cost', 'purchase_date',
+                    'user_id', 'created_by_username')
+
+
+def post_flushed_purchases(session, flush_context):
+    """
+        `after_flush` listener posting every inserted `Inventory` row as a purchase.
+
+        Args:
+            session (Session): The flushing session.
+            flush_context (UOWTransaction): The flush context (unused).
+    """
+    purchases = [{name: getattr(record, name) for name in PURCHASE_COLUMNS}
+                 for record in session.new if isinstance(record, Inventory)]
+    if purchases:
+        post_purchases(session.connection(), sorted(purchases, key=lambda values: values['id']))
+
+
+event.listen(db.session, 'after_flush', post_flushed_purchases)
+
+# Columns of an `Inventory` row that its purchase movement depends on
+LEDGER_COLUMNS = ('item_name', 'unit', 'currency', 'quantity', 'cost')
+
+
+def lock_purchases(connection, criteria):
+    """
+        Lock the selected `Inventory` rows and read the values their purchases were posted with.
+
+        Args:
+            connection (Connection): The connection of the transaction changing the rows.
+            criteria (list): WHERE clauses selecting the rows.
+
+        Returns:
+            list: `PURCHASE_COLUMNS` dicts, one per row.
+    """
+    table = Inventory.__table__
+    return [dict(row) for row in connection.execute(
+        select(*(table.c[name] for name in PURCHASE_COLUMNS)).where(*criteria).order_by(table.c.id)
+        .with_for_update()
+    ).mappings()]
+
+
+def post_corrections(connection, changes):
+    """
+        Post the adjustments correcting the ledger for edited or deleted purchases.
+
+        A changed purchase is reversed, issuing its quantity from its own lots first, and its new
+        values are received as a new lot. Per item, the new stock is received before the old is
+        reversed, so an edit only fails when the stock on hand cannot cover the net change.
+
+        Args:
+            connection (Connection): The connection of the transaction changing the purchases.
+            changes (list): `(previous, current)` pairs of `PURCHASE_COLUMNS` dicts; `current` is
+                None for a deleted purchase. Pairs with unchanged `LEDGER_COLUMNS` are skipped.
+
+        Raises:
+            InsufficientStock: If a reversal would remove stock that was already issued.
+    """
+    changes = [(previous, current) for previous, current in changes
+               if current is None or any(previous[name] != current[name] for name in LEDGER_COLUMNS)]
+    if not changes:
+        return
+    items = resolve_items(connection, [values for change in changes for values in change if values is not None])
+
+    def item_of(values):
+        return items[item_key(values['item_name'], values['unit'], values['currency'])]
+
+    received, reversed_ = {}, {}
+    for previous, current in changes:
+        note = f"Inventory record {previous['id']} {'deleted' if current is None else 'edited'}"
+        if current is not None:
+            received.setdefault(item_of(current), []).append({
+                'kind': 'adjustment', 'quantity': current['quantity'], 'unit_cost': current['cost'],
+                'inventory_id': current['id'], 'purchase_date': current['purchase_date'], 'note': note,
+            })
+        reversed_.setdefault(item_of(previous), []).append({
+            'kind': 'adjustment', 'quantity': -previous['quantity'], 'reverses': previous['id'],
+            'inventory_id': previous['id'], 'note': note,
+        })
+    # Lock items in a fixed order so concurrent postings cannot deadlock
+    for item_id in sorted(received.keys() | reversed_.keys()):
+        post(connection, item_id, received.get(item_id, []) + reversed_.get(item_id, []))
+
+
+def post_flushed_corrections(session, flush_context, instances):
+    """
+        `before_flush` listener posting the corrections of edited and deleted `Inventory` rows.
+
+        The previous values are read from the database, which the flush has not written yet.
+
+        Args:
+            session (Session): The flushing session.
+            flush_context (UOWTransaction): The flush context (unused).
+            instances (list): Objects passed to `flush()` (unused).
+    """
+    current = {}
+    for record in session.dirty:
+        if isinstance(record, Inventory) and any(inspect(record).attrs[name].history.has_changes()
+                                                 for name in LEDGER_COLUMNS):
+            current[record.id] = {name: getattr(record, name) for name in PURCHASE_COLUMNS}
+    for record in session.deleted:
+        if isinstance(record, Inventory):
+            current[record.id] = None
+    if current:
+        connection = session.connection()
+        previous = lock_purchases(connection, [Inventory.__table__.c.id.in_(current)])
+        post_corrections(connection, [(values, current[values['id']]) for values in previous])
+
+
+event.listen(db.session, 'before_flush', post_flushed_corrections)
+
+
+def stock_levels(category=None):
+    """
+        Current stock and value of every item, read from the materialized balances.
+
+        Args:
+            category (str): Only list items of this inventory category.
+
+        Returns:
+            list: `StockItem` rows ordered by category and name.
+    """
+    statement = select(StockItem).order_by(StockItem.category, StockItem.name, StockItem.id)
+    if category:
+        statement = statement.where(StockItem.category == category)
+    return db.session.execute(statement).scalars().all()
+
+
+def _range(statement, date_from, date_to):
+    """Restrict a movement statement to an inclusive date range."""
+    if date_from:
+        statement = statement.where(StockMovement.occurred_at >= datetime.combine(date_from, datetime.min.time()))
+    if date_to:
+        statement = statement.where(
+            StockMovement.occurred_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+    return statement
+
+
+def history(item_id, date_from=None, date_to=None, limit=DEFAULT_HISTORY_LIMIT):
+    """
+        The movements of one item over a date range, newest first.
+
+        Args:
+            item_id (int): The stock item.
+            date_from (date): Inclusive lower bound on the movement date.
+            date_to (date): Inclusive upper bound on the movement date.
+            limit (int): Maximum number of movements, at most `MAX_HISTORY_LIMIT`.
+
+        Returns:
+            list: `StockMovement` rows, each with the running balance after it.
+    """
+    limit = max(1, min(limit, MAX_HISTORY_LIMIT))
+    statement = select(StockMovement).where(StockMovement.item_id == item_id)
+    statement = _range(statement, date_from, date_to)
+    statement = statement.order_by(StockMovement.occurred_at.desc(), StockMovement.id.desc()).limit(limit)
+    return db.session.execute(statement).scalars().all()
+
+
+def balance_as_of(item_id, moment):
+    """
+        The stock of one item at a past moment, from the latest movement up to it.
+
+        Args:
+            item_id (int): The stock item.
+            moment (datetime): The moment.
+
+        Returns:
+            dict: `on_hand`, `fifo_value` and `average_value` (all zero before the first movement).
+    """
+    row = db.session.execute(
+        select(StockMovement.on_hand, StockMovement.fifo_balance, StockMovement.average_balance)
+        .where(StockMovement.item_id == item_id, StockMovement.occurred_at <= moment)
+        .order_by(StockMovement.occurred_at.desc(), StockMovement.id.desc()).limit(1)
+    ).first()
+    if row is None:
+        return {'on_hand': 0, 'fifo_value': 0.0, 'average_value': 0.0}
+    return {'on_hand': row.on_hand, 'fifo_value': row.fifo_balance, 'average_value': row.average_balance}
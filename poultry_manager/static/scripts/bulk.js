@@ -0,0 +1,52 @@
+$(document).ready(function () {
+  // Check or clear every row of the current page
+  $(document).on('change', '.bulk-select-all', function () {
+    $('.bulk-select').prop('checked', this.checked);
+  });
+
+  // Copy the rows checked on the page into the bulk form
+  function collectSelection(form) {
+    form.find('input[name="ids"]').remove();
+    if (form.find('[name="scope"]').val() === 'selected') {
+      $('.bulk-select:checked').each(function () {
+        $('<input>', { type: 'hidden', name: 'ids', value: this.value }).appendTo(form);
+      });
+    }
+  }
+
+  // Any change to the action or the selection requires a new preview
+  function resetPreview() {
+    var form = $('#bulkForm');
+    form.find('.bulk-update-only').toggle(form.find('[name="action"]').val() === 'update');
+    form.find('[name="expected"]').val('');
+    $('#bulkApply').prop('disabled', true);
+  }
+  $(document).on('change', '#bulkForm select, #bulkForm input, .bulk-select, .bulk-select-all', resetPreview);
+  $(document).on('shown.bs.modal', '#editModal', resetPreview);
+
+  // Show how many records the action would change
+  $(document).on('click', '#bulkPreview', function () {
+    var form = $('#bulkForm');
+    collectSelection(form);
+    $.ajax({
+      url: form.data('preview-url'),
+      method: 'POST',
+      data: form.serialize(),
+      success: function (data) {
+        form.find('[name="expected"]').val(data.count);
+        $('#bulkCount').text(data.count + ' record(s) will be changed.');
+        $('#bulkApply').prop('disabled', data.count === 0);
+      },
+      error: function (xhr) {
+        $('#bulkCount').text((xhr.responseJSON && xhr.responseJSON.error) || 'Error previewing the selection.');
+      },
+    });
+  });
+
+  // Apply the previewed action; the server changes nothing if the selection no longer matches the preview
+  $(document).on('submit', '#bulkForm', function () {
+    var form = $(this);
+    collectSelection(form);
+    return confirm('Apply this action to ' + form.find('[name="expected"]').val() + ' record(s)?');
+  });
+});
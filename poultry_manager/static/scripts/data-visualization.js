@@ -8,63 +8,86 @@ document.addEventListener('DOMContentLoaded', function () {
     return response.json();
   }
 
-  // Initialize the Egg Collection Chart
-  fetchData('/api/production-data')
-    .then((data) => {
-      new Chart(
-        document.getElementById('eggCollectionChart').getContext('2d'),
-        {
-          type: 'line',
-          data: {
-            labels: data.labels,
-            datasets: [
-              {
-                label: 'Egg Collection',
-                data: data.data,
-                backgroundColor: 'rgba(255, 159, 64, 0.2)',
-                borderColor: 'rgba(255, 159, 64, 1)',
-                borderWidth: 2,
-                tension: 0.1,
-              },
-            ],
-          },
-          options: {
-            scales: {
-              y: {
-                beginAtZero: true,
-                ticks: {
-                  font: {
-                    size: 18,
+  // Initialize the Egg Collection Chart, re-aggregated server-side per bucket
+  let eggCollectionChart = null;
+  const bucketSelect = document.getElementById('eggCollectionBucket');
+
+  function loadEggCollectionChart(bucket) {
+    fetchData(`/api/production-data?bucket=${encodeURIComponent(bucket)}`)
+      .then((data) => {
+        if (eggCollectionChart) {
+          eggCollectionChart.destroy();
+        }
+        eggCollectionChart = new Chart(
+          document.getElementById('eggCollectionChart').getContext('2d'),
+          {
+            type: 'line',
+            data: {
+              labels: data.labels,
+              datasets: [
+                {
+                  label: 'Egg Collection',
+                  data: data.data,
+                  backgroundColor: 'rgba(255, 159, 64, 0.2)',
+                  borderColor: 'rgba(255, 159, 64, 1)',
+                  borderWidth: 2,
+                  tension: 0.1,
+                },
+                {
+                  label: 'Eggs Sold',
+                  data: data.sold,
+                  backgroundColor: 'rgba(75, 192, 192, 0.2)',
+                  borderColor: 'rgba(75, 192, 192, 1)',
+                  borderWidth: 2,
+                  tension: 0.1,
+                },
+              ],
+            },
+            options: {
+              scales: {
+                y: {
+                  beginAtZero: true,
+                  ticks: {
+                    font: {
+                      size: 18,
+                    },
                   },
                 },
-              },
-              x: {
-                ticks: {
-                  font: {
-                    size: 18,
+                x: {
+                  ticks: {
+                    font: {
+                      size: 18,
+                    },
                   },
                 },
               },
-            },
-            plugins: {
-              legend: {
-                labels: {
-                  font: {
-                    size: 16,
+              plugins: {
+                legend: {
+                  labels: {
+                    font: {
+                      size: 16,
+                    },
                   },
                 },
-              },
-              tooltip: {
-                bodyFont: {
-                  size: 14,
+                tooltip: {
+                  bodyFont: {
+                    size: 14,
+                  },
                 },
               },
             },
-          },
-        }
-      );
-    })
-    .catch((error) => console.error('Error fetching production data:', error));
+          }
+        );
+      })
+      .catch((error) => console.error('Error fetching production data:', error));
+  }
+
+  if (document.getElementById('eggCollectionChart')) {
+    loadEggCollectionChart(bucketSelect ? bucketSelect.value : 'day');
+    if (bucketSelect) {
+      bucketSelect.addEventListener('change', () => loadEggCollectionChart(bucketSelect.value));
+    }
+  }
 
   // Initialize the Symptoms Overview Chart
   fetchData('/api/health-record-data')
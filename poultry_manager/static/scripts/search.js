@@ -0,0 +1,29 @@
+$(document).ready(function () {
+  // Offer matching values while the admin types, at most one request per pause
+  var timer = null;
+  var latest = null;
+
+  $(document).on('input', '.search-typeahead', function () {
+    var input = $(this);
+    var list = $('#' + input.attr('list'));
+    clearTimeout(timer);
+    if (input.val().trim().length < 2) {
+      list.empty();
+      return;
+    }
+    timer = setTimeout(function () {
+      var query = input.val();
+      latest = query;
+      $.getJSON(input.data('suggest-url'), { q: query }, function (data) {
+        // Ignore answers to queries the admin has already typed past
+        if (data.query !== latest) {
+          return;
+        }
+        list.empty();
+        $.each(data.suggestions, function (_, value) {
+          $('<option>', { value: value }).appendTo(list);
+        });
+      });
+    }, 250);
+  });
+});
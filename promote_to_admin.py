@@ -10,13 +10,14 @@ Usage:
 """
 
 import os
-from poultry_manager import create_app, db
-from poultry_manager.models.user import User, RoleEnum
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables before the configuration is read
 load_dotenv()
 
+from poultry_manager import create_app, db  # noqa: E402
+from poultry_manager.models.user import User, RoleEnum  # noqa: E402
+
 app = create_app()
 
 
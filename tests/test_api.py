@@ -0,0 +1,175 @@
+import unittest
+from datetime import date, datetime
+from poultry_manager import db, create_app
+from poultry_manager.models.user import User, RoleEnum, user_cache
+from poultry_manager.models.production import Production
+from poultry_manager.models.inventory import Inventory
+from poultry_manager.models.rollup import DailyProduction
+
+
+class TestApi(unittest.TestCase):
+    """Unit tests for the v1 JSON API."""
+
+    def setUp(self):
+        """Set up a temporary database with an admin and a worker."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        # Each request gets its own app context (and session), as in production
+        with self.app.app_context():
+            db.create_all()
+            admin = User(username='admin', email='admin@example.com', password='password')
+            admin.role = RoleEnum.ADMIN
+            worker = User(username='worker', email='worker@example.com', password='password')
+            db.session.add_all([admin, worker])
+            db.session.commit()
+        user_cache.clear()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        user_cache.clear()
+        with self.app.app_context():
+            db.drop_all()
+
+    def login(self, username='admin'):
+        """Log the test client in through the API."""
+        response = self.client.post('/api/v1/session', json={'username': username, 'password': 'password'})
+        self.assertEqual(response.status_code, 200)
+
+    def create_production(self, *eggs):
+        """Create production records in one batch and return their ids."""
+        items = [{'number_eggs_collected': count, 'date_collected': f'2024-03-0{index + 1}'}
+                 for index, count in enumerate(eggs)]
+        response = self.client.post('/api/v1/production', json={'items': items})
+        self.assertEqual(response.status_code, 201)
+        return [item['id'] for item in response.get_json()['items']]
+
+    def test_requires_login(self):
+        """Test that anonymous API calls get a JSON 401 instead of a login redirect."""
+        response = self.client.get('/api/v1/production')
+
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('error', response.get_json())
+        self.assertEqual(self.client.post('/api/v1/session', json={'username': 'admin'}).status_code, 401)
+
+    def test_batch_create_is_atomic(self):
+        """Test that a batch with one invalid item creates nothing and reports the item."""
+        self.login()
+        response = self.client.post('/api/v1/production', json={'items': [
+            {'number_eggs_collected': 10, 'date_collected': '2024-03-01'},
+            {'number_eggs_collected': -1, 'date_collected': '2024-03-01'},
+        ]})
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.get_json()['errors'][0]['index'], 1)
+        with self.app.app_context():
+            self.assertEqual(Production.query.count(), 0)
+
+    def test_batch_create_attributes_records(self):
+        """Test that workers can create a batch, attributed to them and folded into the rollups."""
+        self.login('worker')
+        self.create_production(10, 20)
+
+        with self.app.app_context():
+            self.assertEqual({record.created_by_username for record in Production.query}, {'worker'})
+            self.assertEqual(db.session.get(DailyProduction, date(2024, 3, 2)).eggs_collected, 20)
+        self.assertEqual(self.client.get('/api/v1/production').status_code, 403)
+
+    def test_list_and_read_with_etag(self):
+        """Test that unchanged reads are answered with 304 Not Modified."""
+        self.login()
+        first, second = self.create_production(10, 20)
+
+        response = self.client.get('/api/v1/production?per_page=1')
+        self.assertEqual(response.get_json()['items'][0]['id'], second)
+        self.assertIsNotNone(response.get_json()['next'])
+        etag = response.headers['ETag']
+        self.assertEqual(self.client.get('/api/v1/production?per_page=1',
+                                         headers={'If-None-Match': etag}).status_code, 304)
+
+        record = self.client.get(f'/api/v1/production/{first}')
+        self.assertEqual(record.get_json()['number_eggs_collected'], 10)
+        self.client.patch(f'/api/v1/production/{first}', json={'eggs_sold': 4})
+        changed = self.client.get(f'/api/v1/production/{first}', headers={'If-None-Match': record.headers['ETag']})
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.get_json()['eggs_sold'], 4)
+
+    def test_duplicate_creates_are_rejected(self):
+        """Test that items repeating a unique key of the batch or the table get per-item errors."""
+        self.login()
+        feed = {'item_name': 'Layer feed', 'category': 'Supplies', 'quantity': 10, 'unit': 'bags', 'cost': 20,
+                'currency': 'USD', 'purchase_date': '2024-03-01'}
+        response = self.client.post('/api/v1/inventory', json={'items': [feed, {**feed, 'quantity': 5}]})
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.get_json()['errors'],
+                         [{'index': 1, 'errors': {'__all__': ['Duplicate item_name, purchase_date']}}])
+        with self.app.app_context():
+            self.assertEqual(Inventory.query.count(), 0)
+
+        self.assertEqual(self.client.post('/api/v1/inventory', json=feed).status_code, 201)
+        response = self.client.post('/api/v1/inventory', json={'items': [
+            {**feed, 'purchase_date': '2024-03-02'}, feed]})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual([error['index'] for error in response.get_json()['errors']], [1])
+        with self.app.app_context():
+            self.assertEqual(Inventory.query.count(), 1)
+
+    def test_batch_update(self):
+        """Test that a batch update changes every listed record and keeps the rollups in step."""
+        self.login()
+        first, second = self.create_production(10, 20)
+
+        response = self.client.patch('/api/v1/production', json={'items': [
+            {'id': first, 'number_eggs_collected': 15},
+            {'id': second, 'date_collected': '2024-03-01'},
+        ]})
+
+        self.assertEqual(response.status_code, 200)
+        with self.app.app_context():
+            rollup = db.session.get(DailyProduction, date(2024, 3, 1))
+            self.assertEqual((rollup.records, rollup.eggs_collected), (2, 35))
+            self.assertIsNone(db.session.get(DailyProduction, date(2024, 3, 2)))
+
+        missing = self.client.patch('/api/v1/production', json={'items': [{'id': 999, 'eggs_sold': 1}]})
+        self.assertEqual(missing.status_code, 422)
+        self.assertEqual(self.client.patch('/api/v1/production/999', json={'eggs_sold': 1}).status_code, 404)
+
+        response = self.client.patch('/api/v1/production', json={'items': [
+            {'id': [first], 'eggs_sold': 3}, {'id': str(second), 'eggs_sold': 3}, {'id': True, 'eggs_sold': 3}]})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.get_json()['errors'],
+                         [{'index': index, 'errors': {'id': ['Record not found.']}} for index in range(3)])
+
+    def test_partial_update_keeps_the_time(self):
+        """Test that a PATCH leaving out a date column keeps its stored time of day."""
+        self.login()
+        with self.app.app_context():
+            record = Production(number_eggs_collected=10, eggs_sold=0, date_collected=datetime(2024, 5, 1, 14, 30))
+            db.session.add(record)
+            db.session.commit()
+            record_id = record.id
+
+        response = self.client.patch(f'/api/v1/production/{record_id}', json={'eggs_sold': 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['date_collected'], '2024-05-01T14:30:00')
+        self.assertEqual(response.get_json()['eggs_sold'], 2)
+
+    def test_batch_delete(self):
+        """Test that a batch delete removes every listed record, or nothing if an id is unknown."""
+        self.login()
+        ids = self.create_production(10, 20, 30)
+
+        self.assertEqual(self.client.delete('/api/v1/production', json={'ids': [ids[0], 999]}).status_code, 404)
+        response = self.client.delete('/api/v1/production', json={'ids': ids[:2]})
+
+        self.assertEqual(response.get_json(), {'deleted': ids[:2]})
+        self.assertEqual(self.client.delete(f'/api/v1/production/{ids[2]}').status_code, 200)
+        with self.app.app_context():
+            self.assertEqual(Production.query.count(), 0)
+            self.assertEqual(DailyProduction.query.count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
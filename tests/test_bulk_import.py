@@ -0,0 +1,158 @@
+import io
+import os
+import tempfile
+import unittest
+from datetime import date, datetime
+from poultry_manager import db, create_app
+from poultry_manager.models.user import User, RoleEnum
+from poultry_manager.models.production import Production
+from poultry_manager.models.health_record import HealthRecord
+from poultry_manager.models.inventory import Inventory
+from poultry_manager.models.rollup import DailyProduction
+from poultry_manager.services.bulk_import import RecordImporter, import_stream, iter_rows
+
+PRODUCTION_CSV = (
+    "number_eggs_collected,eggs_sold,date_collected\n"
+    "30,10,2024-03-01\n"
+    "20,,2024-03-01\n"
+    "-5,0,2024-03-02\n"
+    "40,5,not-a-date\n"
+    "25,5,2024-03-02\n"
+)
+
+
+class TestBulkImport(unittest.TestCase):
+    """Unit tests for the batched bulk record import."""
+
+    def setUp(self):
+        """Set up a temporary database and Flask test environment."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.admin = User(username='admin', email='admin@example.com', password='password')
+        self.admin.role = RoleEnum.ADMIN
+        db.session.add(self.admin)
+        db.session.commit()
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_csv_import_reports_invalid_rows(self):
+        """Test that valid rows are inserted and invalid rows are reported with their line numbers."""
+        report = import_stream('production', io.StringIO(PRODUCTION_CSV), 'csv', user=self.admin, batch_size=2)
+
+        self.assertTrue(report.committed)
+        self.assertEqual((report.total, report.inserted, report.error_count), (5, 3, 2))
+        self.assertEqual([error['row'] for error in report.errors], [4, 5])
+        self.assertIn('number_eggs_collected', report.errors[0]['errors'])
+        self.assertIn('date_collected', report.errors[1]['errors'])
+
+        records = Production.query.order_by(Production.id).all()
+        self.assertEqual([record.eggs_sold for record in records], [10, 0, 5])
+        self.assertEqual(records[0].date_collected, datetime(2024, 3, 1))
+        self.assertTrue(all(record.created_by_username == 'admin' for record in records))
+
+    def test_import_updates_rollups(self):
+        """Test that imported rows are folded into the daily rollups."""
+        import_stream('production', io.StringIO(PRODUCTION_CSV), 'csv', batch_size=2)
+
+        rollup = db.session.get(DailyProduction, date(2024, 3, 1))
+        self.assertEqual((rollup.records, rollup.eggs_collected, rollup.eggs_sold), (2, 50, 10))
+
+    def test_strict_import_inserts_nothing(self):
+        """Test that strict mode rolls back the whole import when any row is invalid."""
+        report = import_stream('production', io.StringIO(PRODUCTION_CSV), 'csv', strict=True, batch_size=2)
+
+        self.assertFalse(report.committed)
+        self.assertEqual(report.inserted, 0)
+        self.assertEqual(Production.query.count(), 0)
+        self.assertEqual(DailyProduction.query.count(), 0)
+
+    def test_json_formats(self):
+        """Test that JSON arrays and NDJSON are streamed row by row."""
+        array = ('[{"symptom": "Cough", "medication_given": "Tylosin", "number_sick": 3, "date_reported": "2024-03-01"},\n'
+                 ' {"symptom": "", "medication_given": "None", "number_sick": 1, "date_reported": "2024-03-02"}]')
+        ndjson = '{"symptom": "Diarrhea", "medication_given": "Amprolium", "number_sick": 2, "date_reported": "2024-03-03"}\n\n'
+
+        self.assertEqual(len(list(iter_rows(io.StringIO(array), 'json'))), 2)
+        first = import_stream('health_record', io.StringIO(array), 'json')
+        second = import_stream('health_record', io.StringIO(ndjson), 'ndjson')
+
+        self.assertEqual((first.inserted, first.error_count), (1, 1))
+        self.assertEqual(second.inserted, 1)
+        self.assertEqual(HealthRecord.query.count(), 2)
+
+    def test_non_object_items_are_rejected(self):
+        """Test that JSON items that are not objects are reported per row instead of failing the import."""
+        ndjson = '[1, 2]\n"text"\n{"number_eggs_collected": 10, "date_collected": "2024-03-01"}\n'
+        report = import_stream('production', io.StringIO(ndjson), 'ndjson')
+
+        self.assertTrue(report.committed)
+        self.assertEqual(report.inserted, 1)
+        self.assertEqual(report.errors, [{'row': 1, 'errors': {'__all__': ['Expected a JSON object']}},
+                                         {'row': 2, 'errors': {'__all__': ['Expected a JSON object']}}])
+        self.assertEqual(import_stream('production', io.StringIO('[null]'), 'json').error_count, 1)
+
+    def test_duplicate_rows_are_rejected(self):
+        """Test that rows duplicating a unique key are reported per row and the other rows are imported."""
+        header = 'item_name,category,quantity,unit,cost,currency,purchase_date\n'
+        import_stream('inventory', io.StringIO(header + 'Layer feed,Supplies,10,bags,20,USD,2024-03-01\n'), 'csv')
+        report = import_stream('inventory', io.StringIO(
+            header
+            + 'Vaccine,Supplies,2,vials,7.5,USD,2024-03-01\n'
+            + 'Layer feed,Supplies,5,bags,20,USD,2024-03-01\n'
+            + 'Vaccine,Supplies,3,vials,7.5,USD,2024-03-01\n'
+            + 'Vaccine,Supplies,3,vials,7.5,USD,2024-03-02\n'), 'csv', batch_size=3)
+
+        self.assertTrue(report.committed)
+        self.assertEqual(report.inserted, 2)
+        self.assertEqual([error['row'] for error in report.errors], [3, 4])
+        self.assertEqual(report.errors[0]['errors'], {'__all__': ['Duplicate item_name, purchase_date']})
+        self.assertEqual(Inventory.query.count(), 3)
+
+    def test_malformed_json_is_rejected(self):
+        """Test that a truncated JSON array rolls back instead of committing a partial import."""
+        report = RecordImporter('production').run(
+            iter_rows(io.StringIO('[{"number_eggs_collected": 1, "date_collected": "2024-03-01"}, {'), 'json'))
+
+        self.assertFalse(report.committed)
+        self.assertEqual(Production.query.count(), 0)
+
+    def test_cli_command(self):
+        """Test the flask import-records command."""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write(PRODUCTION_CSV)
+        try:
+            result = self.app.test_cli_runner().invoke(args=['import-records', 'production', handle.name,
+                                                             '--user', 'admin'])
+        finally:
+            os.unlink(handle.name)
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('3 of 5 production rows imported, 2 rejected', result.output)
+        self.assertEqual(Production.query.count(), 3)
+
+    def test_upload_endpoint_returns_json_report(self):
+        """Test that admins can upload a file and get the import report as JSON."""
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(self.admin.id)
+
+        response = client.post('/import-records', headers={'Accept': 'application/json'}, data={
+            'model': 'production',
+            'file': (io.BytesIO(PRODUCTION_CSV.encode()), 'production.csv'),
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['inserted'], 3)
+        self.assertEqual(response.get_json()['rejected'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
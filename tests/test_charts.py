@@ -0,0 +1,79 @@
+import unittest
+from datetime import datetime
+from poultry_manager import db, create_app
+from poultry_manager.models.flock import Flock
+from poultry_manager.models.health_record import HealthRecord
+from poultry_manager.models.production import Production
+from poultry_manager.services.charts import ChartParams, production_series, symptom_counts, breed_quantities
+
+
+class TestChartAggregations(unittest.TestCase):
+    """Unit tests for the SQL chart aggregations."""
+
+    def setUp(self):
+        """Set up a temporary database with records across two months."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        # Monday 2024-01-29 through Sunday 2024-02-04, two rows per day
+        for day in range(7):
+            date = datetime(2024, 1, 29 + day) if day < 3 else datetime(2024, 2, day - 2)
+            db.session.add(Production(number_eggs_collected=10, eggs_sold=1, date_collected=date))
+            db.session.add(Production(number_eggs_collected=5, eggs_sold=0, date_collected=date))
+        db.session.add_all([
+            HealthRecord(symptom='Cough', medication_given='A', date_reported=datetime(2024, 1, 30)),
+            HealthRecord(symptom='Cough', medication_given='B', date_reported=datetime(2024, 2, 2)),
+            HealthRecord(symptom='Diarrhea', medication_given='C', date_reported=datetime(2024, 2, 3)),
+            Flock(breed='Layer', quantity=100, age=3, entry_date=datetime(2024, 1, 1)),
+            Flock(breed='Layer', quantity=50, age=3, entry_date=datetime(2024, 2, 1)),
+            Flock(breed='Broiler', quantity=70, age=3, entry_date=datetime(2024, 2, 1)),
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_daily_series_is_sorted_and_capped(self):
+        """Test that daily buckets sum per day, come oldest first and keep the latest points."""
+        series = production_series(ChartParams(bucket='day', points=3))
+
+        self.assertEqual(series['labels'], ['2024-02-02', '2024-02-03', '2024-02-04'])
+        self.assertEqual(series['data'], [15, 15, 15])
+        self.assertEqual(series['sold'], [1, 1, 1])
+
+    def test_week_and_month_buckets(self):
+        """Test that week buckets start on Monday and month buckets on the first day."""
+        weekly = production_series(ChartParams(bucket='week'))
+        monthly = production_series(ChartParams(bucket='month'))
+
+        self.assertEqual(weekly['labels'], ['2024-01-29'])
+        self.assertEqual(weekly['data'], [105])
+        self.assertEqual(monthly['labels'], ['2024-01-01', '2024-02-01'])
+        self.assertEqual(monthly['data'], [45, 60])
+
+    def test_date_range(self):
+        """Test that the from/to range is inclusive on both ends."""
+        params = ChartParams(date_from=datetime(2024, 2, 1).date(), date_to=datetime(2024, 2, 2).date())
+
+        self.assertEqual(production_series(params)['labels'], ['2024-02-01', '2024-02-02'])
+        self.assertEqual(symptom_counts(params), {'labels': ['Cough'], 'data': [1]})
+
+    def test_categorical_counts(self):
+        """Test symptom counts and breed quantities are grouped in SQL, largest first."""
+        self.assertEqual(symptom_counts(ChartParams()), {'labels': ['Cough', 'Diarrhea'], 'data': [2, 1]})
+        self.assertEqual(breed_quantities(ChartParams()), {'labels': ['Layer', 'Broiler'], 'data': [150, 70]})
+
+    def test_invalid_bucket(self):
+        """Test that an unknown bucket is rejected."""
+        with self.assertRaises(ValueError):
+            ChartParams(bucket='year')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from datetime import datetime
+from poultry_manager import db, create_app
+from poultry_manager.models.flock import Flock
+from poultry_manager.models.health_record import HealthRecord
+from poultry_manager.models.production import Production
+from poultry_manager.models.user import User
+from poultry_manager.services.dashboard import DashboardSummary
+
+
+class TestDashboardSummary(unittest.TestCase):
+    """Unit tests for the admin dashboard summary service."""
+
+    def setUp(self):
+        """Set up a temporary database and Flask test environment."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.user = User(username='worker', email='worker@example.com', password='password')
+        db.session.add(self.user)
+        db.session.commit()
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_empty_database(self):
+        """Test that an empty farm yields zero totals and no latest rows."""
+        summary = DashboardSummary.build()
+
+        self.assertEqual(summary.counts['workers'], 1)
+        self.assertEqual(summary.counts['production'], 0)
+        self.assertEqual(summary.totals['eggs_collected'], 0)
+        self.assertEqual(summary.latest_production, [])
+
+    def test_totals_and_latest_rows(self):
+        """Test that KPI totals are aggregated and latest rows are newest first."""
+        for day in range(1, 8):
+            db.session.add(Production(number_eggs_collected=10, eggs_sold=2, date_collected=datetime(2024, 1, day),
+                                      user_id=self.user.id))
+        db.session.add(Flock(breed='Layer', quantity=100, age=5, deaths=4, sold=6, user_id=self.user.id))
+        db.session.add(HealthRecord(number_sick=3, symptom='Cough', medication_given='None', user_id=self.user.id))
+        db.session.commit()
+
+        summary = DashboardSummary.build(latest=3)
+
+        self.assertEqual(summary.counts['production'], 7)
+        self.assertEqual(summary.totals['eggs_collected'], 70)
+        self.assertEqual(summary.totals['eggs_sold'], 14)
+        self.assertEqual(summary.totals['live_birds'], 90)
+        self.assertEqual(summary.totals['sick_birds'], 3)
+        self.assertEqual([row.date_collected.day for row in summary.latest_production], [7, 6, 5])
+        self.assertEqual(len(summary.latest_health_records), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool
+from poultry_manager import db, create_app
+from poultry_manager.models.user import User, RoleEnum
+from poultry_manager.services.db_pool import engine_options, pool_metrics, TimedQueuePool
+
+POOL_CONFIG = {
+    'SQLALCHEMY_DATABASE_URI': 'postgresql://fowltrak@db.example.com/fowltrak',
+    'DB_POOL_SIZE': 3,
+    'DB_MAX_OVERFLOW': 2,
+    'DB_POOL_TIMEOUT': 10.0,
+    'DB_POOL_RECYCLE': 1800,
+    'DB_POOL_PRE_PING': True,
+    'DB_STATEMENT_TIMEOUT_MS': 5000,
+    'DB_PGBOUNCER': False,
+}
+
+
+class TestDbPool(unittest.TestCase):
+    """Unit tests for the connection pool configuration and metrics."""
+
+    def setUp(self):
+        """Start every test with zeroed pool metrics."""
+        pool_metrics.reset()
+
+    def test_engine_options_for_postgres(self):
+        """Test that pool sizing, health checks and the statement timeout come from the config."""
+        options = engine_options(POOL_CONFIG)
+
+        self.assertIs(options['poolclass'], TimedQueuePool)
+        self.assertEqual((options['pool_size'], options['max_overflow']), (3, 2))
+        self.assertTrue(options['pool_pre_ping'])
+        self.assertEqual(options['pool_recycle'], 1800)
+        self.assertEqual(options['connect_args'], {'options': '-c statement_timeout=5000'})
+
+    def test_engine_options_for_pgbouncer_and_sqlite(self):
+        """Test that PgBouncer mode disables the client-side pool and SQLite keeps the defaults."""
+        self.assertEqual(engine_options(dict(POOL_CONFIG, DB_PGBOUNCER=True)), {'poolclass': NullPool})
+        self.assertEqual(engine_options(dict(POOL_CONFIG, SQLALCHEMY_DATABASE_URI='sqlite://')), {})
+
+    def test_wait_and_timeout_metrics(self):
+        """Test that checkouts, waits and pool timeouts are counted."""
+        handle, path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        engine = create_engine(f'sqlite:///{path}', poolclass=TimedQueuePool, pool_size=1, max_overflow=0,
+                               pool_timeout=0.05)
+        pool_metrics.instrument(engine)
+        try:
+            with engine.connect():
+                with self.assertRaises(PoolTimeoutError):
+                    engine.connect()
+                stats = pool_metrics.snapshot(engine)
+        finally:
+            engine.dispose()
+            os.unlink(path)
+
+        self.assertEqual((stats['connects'], stats['checkouts'], stats['timeouts']), (1, 1, 1))
+        self.assertEqual(stats['checked_out'], 1)
+        self.assertGreaterEqual(stats['wait_seconds_max'], 0.05)
+
+    def test_pool_stats_endpoint(self):
+        """Test that admins can read the pool metrics of their worker process."""
+        app = create_app('testing')
+        app.config['TESTING'] = True
+        with app.app_context():
+            db.create_all()
+            admin = User(username='admin', email='admin@example.com', password='password')
+            admin.role = RoleEnum.ADMIN
+            db.session.add(admin)
+            db.session.commit()
+            admin_id = admin.id
+        try:
+            client = app.test_client()
+            with client.session_transaction() as session:
+                session['_user_id'] = str(admin_id)
+            response = client.get('/api/pool-stats')
+
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('checkouts', response.get_json())
+        finally:
+            with app.app_context():
+                db.drop_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import io
+import unittest
+from datetime import datetime, date
+from poultry_manager import db, create_app
+from poultry_manager.models.dimension import Symptom, Medication, Breed
+from poultry_manager.models.flock import Flock
+from poultry_manager.models.health_record import HealthRecord
+from poultry_manager.models.rollup import DailySymptomCases
+from poultry_manager.services.bulk_import import import_stream
+from poultry_manager.services.charts import ChartParams, symptom_counts, breed_quantities
+from poultry_manager.services.dimensions import canonical_key
+from poultry_manager.services.records import RECORD_TYPES
+from poultry_manager.services.rollups import rebuild_rollups
+
+
+def counters(dimension):
+    """Return `{name: records}` for the rows of a dimension table."""
+    return {row.name: row.records for row in dimension.query.all()}
+
+
+class TestDimensions(unittest.TestCase):
+    """Unit tests for the symptom, medication and breed dimension tables."""
+
+    def setUp(self):
+        """Set up a temporary database and Flask test environment."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_health_records(self, *symptoms, day=datetime(2024, 3, 1)):
+        """Add one health record per symptom and return them."""
+        records = [HealthRecord(number_sick=1, symptom=symptom, medication_given='Tylosin', date_reported=day)
+                   for symptom in symptoms]
+        db.session.add_all(records)
+        db.session.commit()
+        return records
+
+    def test_canonical_key(self):
+        """Test that spelling variants share a key and distinct values do not."""
+        self.assertEqual({canonical_key(text) for text in ('Cough', 'cough ', 'Coughing', 'COUGHS')}, {'cough'})
+        self.assertEqual(canonical_key('Bloody  droppings!'), canonical_key('bloody dropping'))
+        self.assertEqual(canonical_key('Layers'), canonical_key('layer'))
+        self.assertEqual(canonical_key('Bleeding'), canonical_key('bleed'))
+        self.assertEqual(canonical_key('Coccidiosis'), 'coccidiosis')
+        self.assertNotEqual(canonical_key('Swelling'), canonical_key('Sneezing'))
+
+    def test_variants_share_a_dimension_row(self):
+        """Test that records with spelling variants reference one row, named as first entered."""
+        records = self.add_health_records('Cough', 'cough ', 'Coughing', 'Diarrhea')
+
+        self.assertEqual(len({record.symptom_id for record in records[:3]}), 1)
+        self.assertEqual(counters(Symptom), {'Cough': 3, 'Diarrhea': 1})
+        self.assertEqual(counters(Medication), {'Tylosin': 4})
+        self.assertEqual(records[1].symptom, 'cough ')
+
+    def test_counters_follow_edits_and_deletes(self):
+        """Test that the record counters move with edited values and drop with deletes."""
+        first, second = self.add_health_records('Cough', 'Cough')
+
+        second.symptom = 'Diarrhea'
+        db.session.commit()
+        self.assertEqual(counters(Symptom), {'Cough': 1, 'Diarrhea': 1})
+
+        db.session.delete(first)
+        db.session.commit()
+        self.assertEqual(counters(Symptom), {'Cough': 0, 'Diarrhea': 1})
+        self.assertEqual(symptom_counts(ChartParams()), {'labels': ['Diarrhea'], 'data': [1]})
+
+    def test_charts_group_variants(self):
+        """Test that charts group spelling variants under one label, with and without a date range."""
+        self.add_health_records('Cough', 'coughing', day=datetime(2024, 3, 1))
+        self.add_health_records('Diarrhea', day=datetime(2024, 3, 2))
+        db.session.add_all([Flock(breed='Layer', quantity=100, age=3, entry_date=datetime(2024, 3, 1)),
+                            Flock(breed='layers', quantity=50, age=3, entry_date=datetime(2024, 3, 1)),
+                            Flock(breed='Broiler', quantity=70, age=3, entry_date=datetime(2024, 3, 1))])
+        db.session.commit()
+
+        self.assertEqual(symptom_counts(ChartParams()), {'labels': ['Cough', 'Diarrhea'], 'data': [2, 1]})
+        self.assertEqual(symptom_counts(ChartParams(date_from=date(2024, 3, 2))),
+                         {'labels': ['Diarrhea'], 'data': [1]})
+        self.assertEqual(breed_quantities(ChartParams()), {'labels': ['Layer', 'Broiler'], 'data': [150, 70]})
+        self.assertEqual(len(DailySymptomCases.query.all()), 2)
+
+    def test_statement_writes_are_canonicalized(self):
+        """Test that bulk imports and single-statement edits set the foreign keys and counters."""
+        report = import_stream('health_record', io.StringIO(
+            'symptom,medication_given,number_sick,date_reported\n'
+            'Coughing,Tylosin,2,2024-03-01\n'
+            'Sneezing,tylosin ,1,2024-03-01\n'), 'csv')
+        self.assertTrue(report.committed)
+        self.assertEqual(counters(Symptom), {'Coughing': 1, 'Sneezing': 1})
+        self.assertEqual(counters(Medication), {'Tylosin': 2})
+
+        record_type = RECORD_TYPES['health_record']
+        sneezing = HealthRecord.query.filter_by(symptom='Sneezing').one()
+        record_type.update(sneezing.id, {'symptom': 'cough'})
+        db.session.commit()
+        db.session.expire_all()
+
+        self.assertEqual(counters(Symptom), {'Coughing': 2, 'Sneezing': 0})
+        self.assertEqual(db.session.get(HealthRecord, sneezing.id).symptom_id,
+                         Symptom.query.filter_by(name='Coughing').one().id)
+        self.assertEqual(symptom_counts(ChartParams(date_from=date(2024, 3, 1))),
+                         {'labels': ['Coughing'], 'data': [2]})
+
+    def test_rebuild_recomputes_counters(self):
+        """Test that a rollup rebuild also recomputes the dimension counters."""
+        self.add_health_records('Cough', 'Cough')
+        db.session.add(Flock(breed='Layer', quantity=10, age=1, entry_date=datetime(2024, 3, 1)))
+        db.session.commit()
+        db.session.execute(db.update(Symptom).values(records=99))
+        db.session.execute(db.update(Breed).values(records=0))
+
+        rebuild_rollups()
+        db.session.commit()
+
+        self.assertEqual(counters(Symptom), {'Cough': 2})
+        self.assertEqual(counters(Breed), {'Layer': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
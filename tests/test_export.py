@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+import unittest
+from datetime import datetime, date
+from unittest import mock
+from poultry_manager import db, create_app
+from poultry_manager.models.user import User, RoleEnum
+from poultry_manager.models.production import Production
+from poultry_manager.services import export
+from poultry_manager.services.bulk_import import import_stream
+from poultry_manager.services.export import RecordExport
+from poultry_manager.services.listing import ListingFilters
+
+
+class TestExport(unittest.TestCase):
+    """Unit tests for the streaming record export."""
+
+    def setUp(self):
+        """Set up a temporary database with production records on consecutive days."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.admin = User(username='admin', email='admin@example.com', password='password')
+        self.admin.role = RoleEnum.ADMIN
+        db.session.add(self.admin)
+        for day in range(1, 8):
+            db.session.add(Production(number_eggs_collected=day * 10, eggs_sold=day,
+                                      date_collected=datetime(2024, 1, day, 9), created_by_username='admin'))
+        db.session.commit()
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_csv_chunks_are_filtered_and_ordered(self):
+        """Test that the CSV export applies the date range and is chunked oldest first."""
+        filters = ListingFilters(date_from=date(2024, 1, 2), date_to=date(2024, 1, 6))
+        with mock.patch.object(export, 'CHUNK_ROWS', 2):
+            chunks = list(RecordExport('production', filters).iter_chunks('csv'))
+
+        self.assertTrue(chunks[0].startswith('id,'))
+        self.assertEqual(len(chunks), 4)
+        rows = list(csv.DictReader(io.StringIO(''.join(chunks))))
+        self.assertEqual([row['number_eggs_collected'] for row in rows], ['20', '30', '40', '50', '60'])
+        self.assertEqual(rows[0]['date_collected'], '2024-01-02T09:00:00')
+
+    def test_ndjson_rows(self):
+        """Test that every NDJSON line is one JSON record."""
+        lines = ''.join(RecordExport('production', ListingFilters()).iter_chunks('ndjson')).splitlines()
+
+        self.assertEqual(len(lines), 7)
+        self.assertEqual(json.loads(lines[-1])['eggs_sold'], 7)
+
+    def test_csv_export_can_be_imported(self):
+        """Test that an exported CSV round-trips through the bulk import."""
+        exported = ''.join(RecordExport('production', ListingFilters()).iter_chunks('csv'))
+        original = [(record.date_collected, record.number_eggs_collected)
+                    for record in Production.query.order_by(Production.date_collected)]
+        Production.query.delete()
+        db.session.commit()
+
+        report = import_stream('production', io.StringIO(exported), 'csv')
+
+        self.assertEqual(report.inserted, 7)
+        self.assertEqual([(record.date_collected, record.number_eggs_collected)
+                          for record in Production.query.order_by(Production.date_collected)], original)
+
+    def test_export_endpoint_streams_attachment(self):
+        """Test that the export route streams an attachment and rejects unknown formats."""
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(self.admin.id)
+
+        response = client.get('/export/production?format=csv&from=2024-01-07')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.mimetype, 'text/csv')
+        self.assertIn('attachment; filename="production-', response.headers['Content-Disposition'])
+        self.assertEqual(len(response.get_data(as_text=True).splitlines()), 2)
+        self.assertEqual(client.get('/export/production?format=xml').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
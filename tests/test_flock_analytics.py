@@ -0,0 +1,127 @@
+import unittest
+from datetime import date, datetime
+from poultry_manager import db, create_app
+from poultry_manager.models.user import User, RoleEnum, user_cache
+from poultry_manager.models.flock import Flock
+from poultry_manager.models.production import Production
+from poultry_manager.services.charts import ChartParams
+from poultry_manager.services.flock_analytics import flock_analytics
+from poultry_manager.services.response_cache import response_cache
+from poultry_manager.services.rollups import rebuild_rollups
+
+
+class TestFlockAnalytics(unittest.TestCase):
+    """Unit tests for the flock headcount, mortality and hen-day analytics."""
+
+    def setUp(self):
+        """Set up two breeds and a week of production, Monday 2024-01-01 through Sunday 2024-01-07."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        db.session.add_all([
+            Flock(breed='Layer', quantity=100, age=18, deaths=10, sold=0, entry_date=datetime(2024, 1, 1)),
+            Flock(breed='Layer', quantity=50, age=18, deaths=0, sold=10, entry_date=datetime(2024, 1, 4)),
+            Flock(breed='Broiler', quantity=40, age=2, deaths=4, sold=6, entry_date=datetime(2024, 1, 3)),
+        ])
+        for day in range(1, 8):
+            db.session.add(Production(number_eggs_collected=80, eggs_sold=0, date_collected=datetime(2024, 1, day)))
+        db.session.commit()
+        flock_analytics.clear()
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        flock_analytics.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_breed_summary(self):
+        """Test live birds, deaths, sales and mortality per breed over the whole axis and a range."""
+        summary = {entry['breed']: entry for entry in flock_analytics.snapshot().breed_summary()}
+
+        self.assertEqual(summary['Layer'], {'breed': 'Layer', 'entered': 150, 'deaths': 10, 'sold': 10,
+                                            'live': 130, 'mortality_rate': 6.67})
+        self.assertEqual(summary['Broiler']['live'], 30)
+        self.assertEqual(summary['Broiler']['mortality_rate'], 10.0)
+
+        # Up to Jan 3 the second Layer flock has not arrived yet
+        early = {entry['breed']: entry for entry in
+                 flock_analytics.snapshot().breed_summary(date(2024, 1, 1), date(2024, 1, 3))}
+        self.assertEqual(early['Layer']['live'], 90)
+        self.assertEqual(early['Layer']['entered'], 100)
+
+    def test_hen_day_rate(self):
+        """Test eggs per 100 live birds per day over a range."""
+        snapshot = flock_analytics.snapshot()
+
+        # Jan 1-2: 90 live birds each day, 160 eggs
+        self.assertEqual(snapshot.hen_day_rate(date(2024, 1, 1), date(2024, 1, 2)),
+                         {'eggs': 160, 'hen_days': 180, 'rate': 88.89})
+        # Jan 1: 90, Jan 2: 90, Jan 3: 120, Jan 4-7: 160 each
+        self.assertEqual(snapshot.hen_day_rate()['hen_days'], 90 + 90 + 120 + 4 * 160)
+
+    def test_hen_day_series_buckets(self):
+        """Test that day buckets are capped to the most recent points and weeks start on Monday."""
+        snapshot = flock_analytics.snapshot()
+
+        daily = snapshot.hen_day_series(ChartParams(points=2))
+        self.assertEqual(daily['labels'], ['2024-01-06', '2024-01-07'])
+        self.assertEqual(daily['data'], [50.0, 50.0])
+
+        weekly = snapshot.hen_day_series(ChartParams(bucket='week', date_from=date(2024, 1, 3)))
+        self.assertEqual(weekly['labels'], ['2024-01-01'])
+        self.assertEqual(weekly['eggs'], [5 * 80])
+        self.assertEqual(weekly['hen_days'], [120 + 4 * 160])
+
+    def test_snapshot_is_rebuilt_only_after_writes(self):
+        """Test that the snapshot is reused until flock or production records change."""
+        first = flock_analytics.snapshot()
+        self.assertIs(flock_analytics.snapshot(), first)
+
+        db.session.add(Flock(breed='Broiler', quantity=10, age=2, entry_date=datetime(2024, 1, 7)))
+        db.session.commit()
+
+        rebuilt = flock_analytics.snapshot()
+        self.assertIsNot(rebuilt, first)
+        self.assertEqual({entry['breed']: entry['live'] for entry in rebuilt.breed_summary()}['Broiler'], 40)
+
+    def test_empty_snapshot(self):
+        """Test that an empty farm yields empty analytics."""
+        db.session.query(Flock).delete()
+        db.session.query(Production).delete()
+        rebuild_rollups()
+        db.session.commit()
+        flock_analytics.clear()
+
+        snapshot = flock_analytics.snapshot()
+        self.assertEqual(snapshot.breed_summary(), [])
+        self.assertEqual(snapshot.hen_day_rate()['rate'], 0.0)
+        self.assertEqual(snapshot.hen_day_series(ChartParams())['labels'], [])
+
+    def test_endpoints(self):
+        """Test the chart endpoints serving the analytics."""
+        admin = User(username='admin', email='admin@example.com', password='password')
+        admin.role = RoleEnum.ADMIN
+        db.session.add(admin)
+        db.session.commit()
+        user_cache.clear()
+        response_cache.backend.clear()
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(admin.id)
+
+        analytics = client.get('/api/flock-analytics').get_json()
+        self.assertEqual(analytics['labels'], ['Layer', 'Broiler'])
+        self.assertEqual(analytics['live'], [130, 30])
+        self.assertEqual(analytics['hen_day']['eggs'], 7 * 80)
+
+        series = client.get('/api/hen-day-production?bucket=month').get_json()
+        self.assertEqual(series['labels'], ['2024-01-01'])
+        self.assertEqual(series['bucket'], 'month')
+        self.assertEqual(client.get('/api/hen-day-production?bucket=year').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
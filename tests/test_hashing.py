@@ -0,0 +1,90 @@
+import threading
+import unittest
+from poultry_manager import db, create_app
+from poultry_manager.models.user import User, user_cache
+from poultry_manager.services.hashing import password_hasher, HashingOverloaded
+
+
+class TestPasswordHasher(unittest.TestCase):
+    """Unit tests for the bounded bcrypt hashing pool."""
+
+    def setUp(self):
+        """Set up a temporary database with a cheap bcrypt cost factor."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        password_hasher.configure(rounds=4, workers=2, max_pending=4, timeout=5)
+        with self.app.app_context():
+            db.create_all()
+        user_cache.clear()
+
+    def tearDown(self):
+        """Tear down the temporary database and restore the configured pool."""
+        password_hasher.configure(
+            rounds=self.app.config['BCRYPT_LOG_ROUNDS'],
+            workers=self.app.config['HASH_POOL_WORKERS'],
+            max_pending=self.app.config['HASH_POOL_MAX_PENDING'],
+            timeout=self.app.config['HASH_POOL_TIMEOUT']
+        )
+        user_cache.clear()
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_hash_and_verify(self):
+        """Test that hashes use the configured cost and verify on the pool and inline."""
+        password_hash = password_hasher.hash('secret')
+
+        self.assertTrue(password_hash.startswith('$2b$04$'))
+        self.assertTrue(password_hasher.verify(password_hash, 'secret'))
+        self.assertFalse(password_hasher.verify(password_hash, 'wrong'))
+        password_hasher.configure(rounds=4, workers=0)
+        self.assertTrue(password_hasher.verify(password_hash, 'secret'))
+        self.assertEqual(password_hasher.pending, 0)
+
+    def test_overload_fails_fast_with_503(self):
+        """Test that hashes beyond `max_pending` are rejected immediately with a 503."""
+        password_hasher.configure(rounds=4, workers=1, max_pending=1, timeout=5)
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow_hash(*args):
+            started.set()
+            release.wait(5)
+            return b'$2b$04$blocked'
+
+        blocker = threading.Thread(target=password_hasher._run, args=(slow_hash,))
+        blocker.start()
+        started.wait(5)
+        try:
+            with self.app.app_context():
+                with self.assertRaises(HashingOverloaded):
+                    password_hasher.hash('secret')
+            response = self.app.test_client().post('/register-account', data={
+                'username': 'newworker', 'email_address': 'new@example.com',
+                'password1': 'password123', 'password2': 'password123'})
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.headers['Retry-After'], '1')
+        finally:
+            release.set()
+            blocker.join()
+        self.assertEqual(password_hasher.pending, 0)
+
+    def test_login_rehashes_outdated_cost(self):
+        """Test that logging in upgrades a hash made with a different cost factor."""
+        with self.app.app_context():
+            user = User(username='worker', email='worker@example.com', password='password')
+            db.session.add(user)
+            db.session.commit()
+        password_hasher.configure(rounds=5, workers=2)
+
+        response = self.app.test_client().post('/api/v1/session', json={'username': 'worker', 'password': 'password'})
+
+        self.assertEqual(response.status_code, 200)
+        with self.app.app_context():
+            user = User.query.filter_by(username='worker').first()
+            self.assertTrue(user.password_hash.startswith('$2b$05$'))
+            self.assertTrue(user.check_password('password'))
+
+
+if __name__ == '__main__':
+    unittest.main()
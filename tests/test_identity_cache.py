@@ -0,0 +1,99 @@
+import unittest
+from sqlalchemy import event
+from poultry_manager import db, create_app
+from poultry_manager.models.user import User, RoleEnum, user_cache
+
+
+class TestIdentityCache(unittest.TestCase):
+    """Unit tests for the cached Flask-Login user loader."""
+
+    def setUp(self):
+        """Set up a temporary database with an admin and a worker."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        # Each request gets its own app context (and session), as in production
+        with self.app.app_context():
+            db.create_all()
+            admin = User(username='admin', email='admin@example.com', password='password')
+            admin.role = RoleEnum.ADMIN
+            worker = User(username='worker', email='worker@example.com', password='password')
+            db.session.add_all([admin, worker])
+            db.session.commit()
+            self.admin_id, self.worker_id = admin.id, worker.id
+            self.engine = db.engine
+        user_cache.clear()
+
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+        user_cache.clear()
+        with self.app.app_context():
+            db.drop_all()
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        """Remember every statement sent to the database."""
+        self.statements.append(statement)
+
+    def _user_selects(self):
+        """Count the statements that read the users table by primary key."""
+        return sum(1 for statement in self.statements
+                   if statement.lstrip().startswith('SELECT') and 'FROM users' in statement
+                   and 'users.id = ?' in statement)
+
+    def _client(self, user_id):
+        """Return a test client logged in as `user_id`."""
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+        return client
+
+    def test_repeated_requests_skip_users_query(self):
+        """Test that only the first authenticated request loads the user from the database."""
+        client = self._client(self.worker_id)
+        for _ in range(3):
+            self.assertEqual(client.get('/workers-dashboard').status_code, 200)
+
+        self.assertEqual(self._user_selects(), 1)
+        self.assertGreaterEqual(user_cache.hits, 2)
+
+    def test_promotion_invalidates_cached_role(self):
+        """Test that promoting a worker takes effect on their next request."""
+        worker_client = self._client(self.worker_id)
+        self.assertEqual(worker_client.get('/workers-dashboard').status_code, 200)
+        self.assertEqual(worker_client.get('/admin-dashboard').status_code, 403)
+
+        admin_client = self._client(self.admin_id)
+        self.assertEqual(admin_client.get(f'/promote/{self.worker_id}').status_code, 302)
+
+        self.assertEqual(worker_client.get('/admin-dashboard').status_code, 200)
+
+    def test_expired_entries_are_reloaded(self):
+        """Test that a zero TTL disables caching."""
+        user_cache.configure(ttl=0)
+        try:
+            client = self._client(self.worker_id)
+            client.get('/workers-dashboard')
+            client.get('/workers-dashboard')
+            self.assertEqual(self._user_selects(), 2)
+        finally:
+            user_cache.configure(ttl=self.app.config['USER_CACHE_TTL'])
+
+    def test_lru_eviction(self):
+        """Test that the least recently used identity is evicted beyond the size limit."""
+        user_cache.configure(maxsize=1)
+        try:
+            with self.app.app_context():
+                user_cache.get(self.admin_id, lambda key: db.session.get(User, key))
+                user_cache.get(self.worker_id, lambda key: db.session.get(User, key))
+                loads = []
+                user_cache.get(self.admin_id, lambda key: loads.append(key) or db.session.get(User, key))
+                self.assertEqual(loads, [self.admin_id])
+        finally:
+            user_cache.configure(ttl=self.app.config['USER_CACHE_TTL'], maxsize=self.app.config['USER_CACHE_SIZE'])
+
+
+if __name__ == '__main__':
+    unittest.main()
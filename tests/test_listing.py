@@ -0,0 +1,102 @@
+import unittest
+from datetime import datetime, timedelta
+from werkzeug.datastructures import MultiDict
+from poultry_manager import db, create_app
+from poultry_manager.models.production import Production
+from poultry_manager.models.user import User, RoleEnum
+from poultry_manager.services.listing import LISTINGS, ListingFilters, encode_cursor, decode_cursor
+
+
+class TestRecordListing(unittest.TestCase):
+    """Unit tests for the keyset-paginated record listings."""
+
+    def setUp(self):
+        """Set up a temporary database with production records spread over several days."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.admin = User(username='admin', email='admin@example.com', password='password')
+        self.admin.role = RoleEnum.ADMIN
+        self.worker = User(username='worker', email='worker@example.com', password='password')
+        db.session.add_all([self.admin, self.worker])
+        db.session.commit()
+
+        # Two records per day for ten days, alternating between the two users
+        start = datetime(2024, 1, 1)
+        for day in range(10):
+            for user in (self.admin, self.worker):
+                db.session.add(Production(number_eggs_collected=day, date_collected=start + timedelta(days=day),
+                                          user_id=user.id, created_by_username=user.username))
+        db.session.commit()
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_cursor_round_trip(self):
+        """Test that a cursor decodes to the position it was built from and bad tokens are ignored."""
+        position = (datetime(2024, 5, 1, 12, 30), 42)
+        self.assertEqual(decode_cursor(encode_cursor(*position)), position)
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+        self.assertIsNone(decode_cursor(None))
+
+    def test_pages_cover_every_row_once(self):
+        """Test that following next cursors visits every row exactly once, newest first."""
+        listing = LISTINGS['production']
+        filters = ListingFilters(per_page=6)
+        seen = []
+        page = listing.paginate(filters)
+        self.assertFalse(page.has_prev)
+        while True:
+            seen.extend(page.items)
+            if not page.has_next:
+                break
+            page = listing.paginate(filters, after=page.next_cursor)
+
+        self.assertEqual(len(seen), 20)
+        self.assertEqual(len({record.id for record in seen}), 20)
+        keys = [(record.date_collected, record.id) for record in seen]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_before_cursor_returns_previous_page(self):
+        """Test that the newer-page cursor leads back to the page that was left."""
+        listing = LISTINGS['production']
+        filters = ListingFilters(per_page=5)
+        first = listing.paginate(filters)
+        second = listing.paginate(filters, after=first.next_cursor)
+        third = listing.paginate(filters, after=second.next_cursor)
+        back = listing.paginate(filters, before=third.prev_cursor)
+
+        self.assertEqual([r.id for r in back.items], [r.id for r in second.items])
+        self.assertTrue(back.has_prev)
+
+    def test_filters_are_applied(self):
+        """Test that date-range and worker filters restrict the listing."""
+        args = MultiDict({'from': '2024-01-03', 'to': '2024-01-05', 'worker': str(self.worker.id)})
+        page = LISTINGS['production'].paginate(ListingFilters.from_args(args))
+
+        self.assertEqual(len(page.items), 3)
+        self.assertTrue(all(record.user_id == self.worker.id for record in page.items))
+        self.assertFalse(page.has_next)
+
+    def test_view_production_renders_one_page(self):
+        """Test that the production browser only renders the requested page size."""
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(self.admin.id)
+
+        response = client.get('/view-production?per_page=4')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data.count(b'delete-button'), 4)
+        self.assertIn(b'after=', response.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
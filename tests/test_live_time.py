@@ -0,0 +1,85 @@
+import threading
+import time
+import unittest
+from datetime import timezone
+from unittest import mock
+from poultry_manager import db, create_app
+from poultry_manager.live_time import NetworkTime
+from poultry_manager.models.production import Production
+
+
+class TestNetworkTime(unittest.TestCase):
+    """Unit tests for the cached, background-refreshed time source."""
+
+    def setUp(self):
+        """Remember the configured time source so each test can change it."""
+        self.saved = (NetworkTime.source, NetworkTime.server, NetworkTime.refresh_interval, NetworkTime.timeout)
+
+    def tearDown(self):
+        """Restore the configured time source."""
+        source, server, refresh_interval, timeout = self.saved
+        NetworkTime.configure(source, server, refresh_interval, timeout)
+        NetworkTime._refreshed_at = None
+
+    def test_local_mode_never_queries_ntp(self):
+        """Test that local mode returns UTC time without any NTP request."""
+        NetworkTime.configure(source='local')
+        with mock.patch('ntplib.NTPClient') as client:
+            now = NetworkTime.now()
+
+        client.assert_not_called()
+        self.assertEqual(now.tzinfo, timezone.utc)
+        self.assertEqual(NetworkTime.offset(), 0.0)
+
+    def test_ntp_mode_does_not_block(self):
+        """Test that a slow NTP server delays the offset refresh, not the caller."""
+        NetworkTime.configure(source='ntp', refresh_interval=3600)
+        NetworkTime._refreshed_at = None
+        released = threading.Event()
+
+        def slow_request(*args, **kwargs):
+            released.wait(5)
+            return mock.Mock(offset=30.0)
+
+        with mock.patch('ntplib.NTPClient') as client:
+            client.return_value.request.side_effect = slow_request
+            started = time.monotonic()
+            NetworkTime.now()
+            self.assertLess(time.monotonic() - started, 0.5)
+
+            released.set()
+            for _ in range(50):
+                if NetworkTime.offset() == 30.0:
+                    break
+                time.sleep(0.02)
+
+        self.assertEqual(NetworkTime.offset(), 30.0)
+        self.assertEqual(client.return_value.request.call_count, 1)
+
+    def test_invalid_source(self):
+        """Test that an unknown time source is rejected."""
+        with self.assertRaises(ValueError):
+            NetworkTime.configure(source='gps')
+
+    def test_row_defaults_are_evaluated_per_row(self):
+        """Test that timestamp defaults reflect insertion time rather than process start."""
+        app = create_app('testing')
+        NetworkTime.configure(source='local')
+        with app.app_context():
+            db.create_all()
+            first = Production(number_eggs_collected=1)
+            db.session.add(first)
+            db.session.commit()
+            time.sleep(0.01)
+            second = Production(number_eggs_collected=2)
+            db.session.add(second)
+            db.session.commit()
+
+            self.assertLess(first.created_at, second.created_at)
+            self.assertLess(first.date_collected, second.date_collected)
+            db.session.remove()
+            db.drop_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import re
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy.exc import InvalidRequestError
+from poultry_manager import db, create_app
+from poultry_manager.models.user import User, RoleEnum, user_cache
+from poultry_manager.models.inventory import Inventory
+from poultry_manager.models.production import Production
+from poultry_manager.models.flock import Flock
+from poultry_manager.models.health_record import HealthRecord
+from poultry_manager.services.listing import LISTINGS, ListingFilters
+from poultry_manager.services.response_cache import response_cache
+
+LISTING_URLS = ['/view-inventory', '/view-flock', '/view-production', '/view-health_record', '/api/v1/flock']
+
+
+class TestLoading(unittest.TestCase):
+    """Unit tests for the loader strategies of the listing and worker pages."""
+
+    def setUp(self):
+        """Set up a temporary database with an admin and strict relationship loading."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        self.app.config['STRICT_LOADING'] = True
+        with self.app.app_context():
+            db.create_all()
+            admin = User(username='admin', email='admin@example.com', password='password')
+            admin.role = RoleEnum.ADMIN
+            db.session.add(admin)
+            db.session.commit()
+            self.admin_id = admin.id
+        self.workers = 0
+        user_cache.clear()
+        response_cache.backend.clear()
+        self.client = self.app.test_client()
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.admin_id)
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        response_cache.backend.clear()
+        user_cache.clear()
+        with self.app.app_context():
+            db.drop_all()
+
+    def add_records(self, count):
+        """Add `count` records of every type, each entered by a new worker."""
+        with self.app.app_context():
+            for _ in range(count):
+                self.workers += 1
+                worker = User(username=f'worker{self.workers}', email=f'worker{self.workers}@example.com',
+                              password='password')
+                db.session.add(worker)
+                db.session.flush()
+                moment = datetime(2024, 1, 1) + timedelta(days=self.workers)
+                common = {'user_id': worker.id, 'created_by_username': worker.username}
+                db.session.add_all([
+                    Inventory(item_name=f'Feed {self.workers}', category='Supplies', quantity=5, unit='bags',
+                              cost=20.0, currency='USD', purchase_date=moment, **common),
+                    Production(number_eggs_collected=30, eggs_sold=10, date_collected=moment, **common),
+                    Flock(breed='Layer', quantity=100, age=20, deaths=0, sold=0, entry_date=moment, **common),
+                    HealthRecord(number_sick=2, symptom='Cough', medication_given='Tylosin', date_reported=moment,
+                                 **common),
+                ])
+            db.session.commit()
+
+    def query_count(self, url):
+        """Request a page and return the number of SQL statements it issued."""
+        response_cache.backend.clear()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return int(re.search(r'desc="(\d+) queries"', response.headers['Server-Timing']).group(1))
+
+    def test_listings_use_a_constant_number_of_queries(self):
+        """Test that listing pages cost the same number of queries for 2 and 20 records and creators."""
+        self.add_records(2)
+        self.client.get('/view-production')  # Loads the admin into the identity cache
+        few = {url: self.query_count(url) for url in LISTING_URLS + ['/manage_workers']}
+        self.add_records(18)
+        many = {url: self.query_count(url) for url in LISTING_URLS + ['/manage_workers']}
+
+        self.assertEqual(few, many)
+
+    def test_listing_rows_load_only_rendered_columns(self):
+        """Test that listing rows defer unrendered columns and refuse lazy relationship loads."""
+        self.add_records(1)
+        with self.app.test_request_context():
+            record = LISTINGS['inventory'].paginate(ListingFilters()).items[0]
+
+            self.assertNotIn('purchase_order_number', record.__dict__)
+            self.assertEqual(record.created_by_username, 'worker1')
+            with self.assertRaises(InvalidRequestError):
+                record.user
+
+    def test_user_record_collections_are_never_lazy_loaded(self):
+        """Test that a user's record collections raise instead of loading every record."""
+        self.add_records(1)
+        with self.app.app_context():
+            worker = User.query.filter_by(username='worker1').one()
+            with self.assertRaises(InvalidRequestError):
+                worker.productions
+
+    def test_removing_a_worker_detaches_their_records(self):
+        """Test that deleting a worker keeps their records and clears the owner in bulk."""
+        self.add_records(2)
+        with self.app.app_context():
+            worker_id = User.query.filter_by(username='worker1').one().id
+
+        response = self.client.post(f'/remove-worker/{worker_id}')
+
+        self.assertEqual(response.status_code, 302)
+        with self.app.app_context():
+            self.assertIsNone(db.session.get(User, worker_id))
+            for model in (Inventory, Production, Flock, HealthRecord):
+                self.assertEqual(model.query.count(), 2)
+                self.assertEqual(model.query.filter_by(user_id=worker_id).count(), 0)
+                self.assertEqual(model.query.filter_by(created_by_username='worker1').count(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from poultry_manager import db, create_app
+from poultry_manager.models.user import User, RoleEnum, user_cache
+from poultry_manager.models.production import Production
+from poultry_manager.models.base_model import current_time
+from poultry_manager.services.metrics import request_metrics, RequestMetrics
+
+
+def sample(body, name, **labels):
+    """Return the value of one sample of a scrape, or None if it is missing."""
+    label_text = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    series = f'{name}{{{label_text}}}' if labels else name
+    match = re.search(rf'^{re.escape(series)} (\S+)$', body, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+class TestMetrics(unittest.TestCase):
+    """Unit tests for the /metrics endpoint."""
+
+    def setUp(self):
+        """Set up a temporary database with an admin, a worker and today's production."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        self.app.config['METRICS_TOKEN'] = 'scrape-token'
+        with self.app.app_context():
+            db.create_all()
+            admin = User(username='admin', email='admin@example.com', password='password')
+            admin.role = RoleEnum.ADMIN
+            worker = User(username='worker', email='worker@example.com', password='password')
+            db.session.add_all([admin, worker])
+            db.session.add(Production(number_eggs_collected=30, eggs_sold=12, date_collected=current_time()))
+            db.session.add(Production(number_eggs_collected=50, eggs_sold=5, date_collected=datetime(2020, 1, 1)))
+            db.session.commit()
+            self.admin_id, self.worker_id = admin.id, worker.id
+        user_cache.clear()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        """Tear down the temporary database and the shared metrics state."""
+        request_metrics.configure()
+        user_cache.clear()
+        with self.app.app_context():
+            db.drop_all()
+
+    def scrape(self):
+        """Scrape /metrics with the bearer token."""
+        response = self.client.get('/metrics', headers={'Authorization': 'Bearer scrape-token'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain; version=0.0.4'))
+        return response.get_data(as_text=True)
+
+    def test_scrape_requires_token_or_admin(self):
+        """Test that anonymous and worker scrapes are refused while token and admin scrapes succeed."""
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code, 401)
+
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.worker_id)
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.admin_id)
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    def test_request_counters_and_histograms(self):
+        """Test that handled requests show up in the counters and latency histograms."""
+        self.client.get('/login-user')
+        self.client.get('/login-user')
+        self.client.get('/does-not-exist')
+
+        body = self.scrape()
+
+        self.assertEqual(sample(body, 'fowltrak_http_requests_total',
+                                endpoint='main.login_page', method='GET', status='200'), 2)
+        self.assertEqual(sample(body, 'fowltrak_http_requests_total',
+                                endpoint='unmatched', method='GET', status='404'), 1)
+        self.assertEqual(sample(body, 'fowltrak_http_request_duration_seconds_bucket',
+                                endpoint='main.login_page', method='GET', le='+Inf'), 2)
+        self.assertEqual(sample(body, 'fowltrak_http_request_duration_seconds_count',
+                                endpoint='main.login_page', method='GET'), 2)
+        # The scrape itself is the only request in flight
+        self.assertEqual(sample(body, 'fowltrak_http_requests_in_flight'), 1)
+        self.assertIsNotNone(sample(body, 'fowltrak_db_pool_checkouts_total'))
+        self.assertIsNotNone(sample(body, 'fowltrak_cache_hits_total', cache='response'))
+
+    def test_farm_kpis(self):
+        """Test that the KPI gauges come from the rollups."""
+        body = self.scrape()
+
+        self.assertEqual(sample(body, 'fowltrak_eggs_collected_today'), 30)
+        self.assertEqual(sample(body, 'fowltrak_eggs_sold_today'), 12)
+        self.assertEqual(sample(body, 'fowltrak_sick_cases_recent'), 0)
+
+    def test_workers_are_merged_through_the_metrics_directory(self):
+        """Test that counters of other (even exited) workers are summed and their gauges only while alive."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        request_metrics.configure(directory=directory)
+
+        with self.app.app_context():
+            other = RequestMetrics()
+            other.observe('main.login_page', 'GET', 200, 0.02)
+            state = other.state()
+        for pid, in_flight in ((2 ** 22 + 1, 0), (os.getppid(), 3)):
+            state.update(pid=pid, in_flight=in_flight)
+            with open(os.path.join(directory, f'{pid}.json'), 'w') as handle:
+                json.dump(state, handle)
+
+        self.client.get('/login-user')
+        body = self.scrape()
+
+        self.assertEqual(sample(body, 'fowltrak_http_requests_total',
+                                endpoint='main.login_page', method='GET', status='200'), 3)
+        self.assertGreaterEqual(sample(body, 'fowltrak_http_request_duration_seconds_bucket',
+                                       endpoint='main.login_page', method='GET', le='0.025'), 2)
+        self.assertEqual(sample(body, 'fowltrak_processes'), 2)
+        self.assertEqual(sample(body, 'fowltrak_http_requests_in_flight'), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,7 @@ class TestProductionModel(unittest.TestCase):
 
     def setUp(self):
         """Set up a temporary database and Flask test environment."""
-        self.app = create_app()
+        self.app = create_app('testing')
         self.app.config['TESTING'] = True
         self.app_context = self.app.app_context()
         self.app_context.push()
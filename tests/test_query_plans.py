@@ -0,0 +1,130 @@
+import os
+import unittest
+from datetime import date, datetime
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from poultry_manager import db, create_app
+from poultry_manager.services.charts import ChartParams, production_series, symptom_counts
+from poultry_manager.services.listing import LISTINGS, ListingFilters, encode_cursor
+
+# Set to a disposable Postgres database (e.g. a local container) to run the Postgres plan checks
+POSTGRES_TEST_URL = os.getenv('POSTGRES_TEST_URL')
+
+CURSOR = encode_cursor(datetime(2024, 1, 1), 5)
+
+# (description, callable issuing the query, index expected in the plan)
+ACCESS_PATHS = [
+    ('production first page', lambda: LISTINGS['production'].paginate(ListingFilters()),
+     'ix_production_date_collected_id'),
+    ('production next page', lambda: LISTINGS['production'].paginate(ListingFilters(), after=CURSOR),
+     'ix_production_date_collected_id'),
+    ('production by worker', lambda: LISTINGS['production'].paginate(ListingFilters(worker_id=1), after=CURSOR),
+     'ix_production_user_id_date_collected_id'),
+    ('flocks by breed', lambda: LISTINGS['flock'].paginate(ListingFilters(category='Layer')),
+     'ix_flocks_breed_entry_date_id'),
+    ('flocks by worker', lambda: LISTINGS['flock'].paginate(ListingFilters(worker_id=1)),
+     'ix_flocks_user_id_entry_date_id'),
+    ('health records by date', lambda: LISTINGS['health_record'].paginate(ListingFilters(date_from=date(2024, 1, 1))),
+     'ix_health_records_date_reported_id'),
+    ('health records by symptom', lambda: LISTINGS['health_record'].paginate(ListingFilters(category='Cough')),
+     'ix_health_records_symptom_date_reported_id'),
+    ('inventory by category', lambda: LISTINGS['inventory'].paginate(ListingFilters(category='Supplies')),
+     'ix_inventory_category_purchase_date_id'),
+    ('inventory by worker', lambda: LISTINGS['inventory'].paginate(ListingFilters(worker_id=1)),
+     'ix_inventory_user_id_purchase_date_id'),
+    ('production chart', lambda: production_series(ChartParams(date_from=date(2024, 1, 1))),
+     'rollup_daily_production'),
+    ('symptom chart', lambda: symptom_counts(ChartParams(date_from=date(2024, 1, 1))),
+     'rollup_daily_symptom_cases'),
+]
+
+
+def capture_statements(engine, issue):
+    """Run `issue` and return the (statement, parameters) pairs it sent to `engine`."""
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        issue()
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    return captured
+
+
+def explain(connection, prefix, statement, parameters):
+    """Return the query plan of a captured statement as a single string."""
+    cursor = connection.connection.cursor()
+    cursor.execute(prefix + statement, parameters)
+    return '\n'.join(' '.join(str(part) for part in row) for row in cursor.fetchall())
+
+
+class TestSQLiteQueryPlans(unittest.TestCase):
+    """Query-plan regression tests: listing and chart queries must use their indexes on SQLite."""
+
+    def setUp(self):
+        """Set up a temporary database and Flask test environment."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_access_paths_use_indexes(self):
+        """Test that every listing and chart access path searches an index instead of scanning."""
+        if db.engine.dialect.name != 'sqlite':
+            self.skipTest('SQLite plan checks need a SQLite DATABASE_URL')
+        for description, issue, index in ACCESS_PATHS:
+            with self.subTest(description):
+                statement, parameters = capture_statements(db.engine, issue)[0]
+                plan = explain(db.session.connection(), 'EXPLAIN QUERY PLAN ', statement, parameters)
+                self.assertIn(index, plan)
+                self.assertIn('USING', plan)
+                self.assertNotIn('TEMP B-TREE FOR ORDER BY', plan.split('GROUP BY')[0])
+
+
+@unittest.skipUnless(POSTGRES_TEST_URL, 'POSTGRES_TEST_URL not set')
+class TestPostgresQueryPlans(unittest.TestCase):
+    """Query-plan regression tests: listing and chart queries must be able to use their indexes on Postgres."""
+
+    def setUp(self):
+        """Create the schema on the Postgres test database."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.engine = create_engine(POSTGRES_TEST_URL)
+        db.metadata.create_all(self.engine)
+
+    def tearDown(self):
+        """Drop the schema from the Postgres test database."""
+        db.metadata.drop_all(self.engine)
+        self.engine.dispose()
+        self.app_context.pop()
+
+    def test_access_paths_use_indexes(self):
+        """Test that, with sequential scans disabled, every access path is served by its index."""
+        with self.engine.connect() as connection:
+            connection.exec_driver_sql('SET enable_seqscan = off')
+            # Route the scoped session through the Postgres connection so the services emit Postgres SQL
+            db.session.registry.set(Session(bind=connection))
+            try:
+                for description, issue, index in ACCESS_PATHS:
+                    with self.subTest(description):
+                        statement, parameters = capture_statements(self.engine, issue)[0]
+                        plan = explain(connection, 'EXPLAIN ', statement, parameters)
+                        self.assertIn(index, plan)
+                        self.assertIn('Index', plan)
+            finally:
+                db.session.remove()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import logging
+import unittest
+from datetime import datetime
+from poultry_manager import db, create_app
+from poultry_manager.models.user import User, RoleEnum, user_cache
+from poultry_manager.models.production import Production
+from poultry_manager.models.flock import Flock
+from poultry_manager.models.health_record import HealthRecord
+from poultry_manager.models.inventory import Inventory
+from poultry_manager.middleware.query_stats import QueryBudgetExceeded, RequestQueryStats, query_budget
+from poultry_manager.services.response_cache import response_cache
+
+# Read-only pages and APIs an admin uses; each must stay within the default query budget
+BUDGETED_ROUTES = [
+    '/admin-dashboard',
+    '/manage_workers',
+    '/view-inventory',
+    '/view-flock',
+    '/view-production',
+    '/view-health_record',
+    '/api/production-data',
+    '/api/health-record-data',
+    '/api/flock-data',
+    '/api/v1/production',
+    '/export/production',
+]
+
+
+class TestQueryStats(unittest.TestCase):
+    """Unit tests for the per-request SQL instrumentation."""
+
+    def setUp(self):
+        """Set up a temporary database with an admin, a worker and a few records of every type."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        self.app.config['QUERY_BUDGET_STRICT'] = True
+        with self.app.app_context():
+            db.create_all()
+            admin = User(username='admin', email='admin@example.com', password='password')
+            admin.role = RoleEnum.ADMIN
+            worker = User(username='worker', email='worker@example.com', password='password')
+            db.session.add_all([admin, worker])
+            db.session.commit()
+            for day in range(1, 6):
+                moment = datetime(2024, 3, day)
+                db.session.add_all([
+                    Production(number_eggs_collected=30, eggs_sold=10, date_collected=moment, user_id=worker.id),
+                    Flock(breed='Layer', quantity=100, age=20, entry_date=moment, user_id=worker.id),
+                    HealthRecord(number_sick=2, symptom='Cough', medication_given='Tylosin', date_reported=moment,
+                                 user_id=worker.id),
+                    Inventory(item_name=f'Feed {day}', category='Supplies', quantity=5, unit='bags', cost=20.0,
+                              currency='USD', purchase_date=moment, user_id=worker.id),
+                ])
+            db.session.commit()
+            self.admin_id = admin.id
+        user_cache.clear()
+        response_cache.backend.clear()
+        self.client = self.app.test_client()
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.admin_id)
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        response_cache.backend.clear()
+        user_cache.clear()
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_server_timing_header_reports_queries(self):
+        """Test that responses carry the number of statements and the database time."""
+        response = self.client.get('/view-production')
+
+        self.assertEqual(response.status_code, 200)
+        timing = response.headers['Server-Timing']
+        self.assertTrue(timing.startswith('db;dur='))
+        self.assertRegex(timing, r'desc="[1-9]\d* queries"')
+
+    def test_log_line_lists_slowest_statements(self):
+        """Test that one structured log line is written per request."""
+        with self.assertLogs('poultry_manager.query_stats', level=logging.INFO) as logs:
+            self.client.get('/api/production-data')
+
+        lines = [record.getMessage() for record in logs.records if record.levelno == logging.INFO]
+        self.assertEqual(len(lines), 1)
+        self.assertIn('"endpoint": "main.production_data"', lines[0])
+        self.assertIn('"sql": "SELECT', lines[0])
+
+    def test_routes_stay_within_query_budget(self):
+        """Test that the main read routes do not issue more statements than their budget."""
+        for url in BUDGETED_ROUTES:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                response.get_data()
+
+    def test_budget_exceeded_fails_in_strict_mode(self):
+        """Test that a request over its budget fails when the budget is strict."""
+        self.app.config['QUERY_BUDGET'] = 1
+
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get('/view-production')
+
+    def test_budget_exceeded_warns_by_default(self):
+        """Test that a request over its budget is only logged outside strict mode."""
+        self.app.config['QUERY_BUDGET'] = 1
+        self.app.config['QUERY_BUDGET_STRICT'] = False
+
+        with self.assertLogs('poultry_manager.query_stats', level=logging.WARNING) as logs:
+            response = self.client.get('/view-production')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(any('over its budget of 1' in record.getMessage() for record in logs.records))
+
+    def test_query_budget_decorator(self):
+        """Test that the decorator records the view's own budget."""
+        @query_budget(4)
+        def view():
+            pass
+
+        self.assertEqual(view.query_budget, 4)
+
+    def test_slowest_statements_are_kept_in_order(self):
+        """Test that only the slowest statements are kept, slowest first."""
+        stats = RequestQueryStats(keep=2)
+        for seconds, statement in [(0.01, 'A'), (0.03, 'B'), (0.02, 'C'), (0.001, 'D')]:
+            stats.record(statement, seconds)
+
+        self.assertEqual(stats.count, 4)
+        self.assertAlmostEqual(stats.total_ms, 61)
+        self.assertEqual([statement for _, statement in stats.slowest], ['B', 'C'])
+
+
+if __name__ == '__main__':
+    unittest.main()
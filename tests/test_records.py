@@ -0,0 +1,290 @@
+import re
+import unittest
+from datetime import datetime, date
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from poultry_manager import db, create_app
+from poultry_manager.models.user import User, RoleEnum, user_cache
+from poultry_manager.models.flock import Flock
+from poultry_manager.models.inventory import Inventory
+from poultry_manager.models.production import Production
+from poultry_manager.models.rollup import DailyProduction, DailyFlockStock
+from poultry_manager.services.records import RECORD_TYPES
+from poultry_manager.services.response_cache import response_cache
+from poultry_manager.services.rollups import rebuild_rollups
+
+
+class TestRecordTypes(unittest.TestCase):
+    """Unit tests for the record type registry and the generic edit and delete handlers."""
+
+    def setUp(self):
+        """Set up a temporary database with an admin and one record of three types."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        admin = User(username='admin', email='admin@example.com', password='password')
+        admin.role = RoleEnum.ADMIN
+        production = Production(number_eggs_collected=30, eggs_sold=10, date_collected=datetime(2024, 3, 1))
+        flock = Flock(breed='Layer', quantity=100, age=20, deaths=5, sold=0, entry_date=datetime(2024, 3, 1))
+        inventory = Inventory(item_name='Feed', category='Supplies', quantity=5, unit='bags', cost=20.0,
+                              currency='USD', purchase_order_number='PO-1', purchase_date=datetime(2024, 3, 1))
+        db.session.add_all([admin, production, flock, inventory])
+        db.session.commit()
+        self.production_id, self.flock_id, self.inventory_id = production.id, flock.id, inventory.id
+        user_cache.clear()
+        response_cache.backend.clear()
+        self.client = self.app.test_client()
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(admin.id)
+        db.session.remove()
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        response_cache.backend.clear()
+        user_cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def record_statements(self, table, send):
+        """Send a request and return the statements it ran against one record table."""
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = send()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        pattern = re.compile(rf'^(SELECT .* FROM|UPDATE|DELETE FROM) {table}\b', re.DOTALL)
+        return response, [statement for statement in statements if pattern.match(statement)]
+
+    def test_edit_is_a_single_update(self):
+        """Test that an edit writes the record with one UPDATE and moves its rollup contribution."""
+        response, statements = self.record_statements('production', lambda: self.client.post(
+            f'/edit-record/production/{self.production_id}',
+            data={'number_eggs_collected': 40, 'eggs_sold': 5, 'date_collected': '2024-03-02'}))
+
+        self.assertEqual(response.status_code, 302)
+        updates = [statement for statement in statements if statement.startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        record = db.session.get(Production, self.production_id)
+        self.assertEqual((record.number_eggs_collected, record.eggs_sold), (40, 5))
+        self.assertIsNone(db.session.get(DailyProduction, date(2024, 3, 1)))
+        moved = db.session.get(DailyProduction, date(2024, 3, 2))
+        self.assertEqual((moved.records, moved.eggs_collected, moved.eggs_sold), (1, 40, 5))
+
+    def test_delete_is_a_single_statement(self):
+        """Test that a delete issues one DELETE and removes the rollup contribution."""
+        response, statements = self.record_statements(
+            'flocks', lambda: self.client.get(f'/delete-record/flock/{self.flock_id}'))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(statements), 1)
+        self.assertTrue(statements[0].startswith('DELETE'))
+        self.assertIsNone(db.session.get(Flock, self.flock_id))
+        self.assertIsNone(db.session.get(DailyFlockStock, (date(2024, 3, 1), 'Layer')))
+
+    def test_edit_without_rollup(self):
+        """Test that editing a record type without a rollup needs no prior read."""
+        data = {'item_name': 'Grower feed', 'category': 'Supplies', 'quantity': 8, 'unit': 'bags', 'cost': 22.5,
+                'currency': 'USD', 'purchase_order_number': '', 'purchase_date': '2024-03-01'}
+        response, statements = self.record_statements('inventory', lambda: self.client.post(
+            f'/edit-record/inventory/{self.inventory_id}', data=data))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(statements), 1)
+        record = db.session.get(Inventory, self.inventory_id)
+        self.assertEqual((record.item_name, record.quantity, record.cost), ('Grower feed', 8, 22.5))
+
+    def test_writes_invalidate_cached_responses(self):
+        """Test that generic edits and deletes bump the record type's cache generation."""
+        before = response_cache.generations(['production'])['production']
+        self.client.get(f'/delete-record/production/{self.production_id}')
+
+        self.assertEqual(response_cache.generations(['production'])['production'], before + 1)
+
+    def test_missing_and_unknown_records(self):
+        """Test missing records and unregistered record types."""
+        response = self.client.get('/delete-record/production/999', follow_redirects=True)
+        self.assertIn(b'Record not found.', response.data)
+        self.assertEqual(self.client.get('/edit/production/999').status_code, 404)
+        self.assertEqual(self.client.post('/edit-record/production/999', data={
+            'number_eggs_collected': 1, 'eggs_sold': 0, 'date_collected': '2024-03-02'}).status_code, 404)
+        self.assertEqual(self.client.get('/edit/eggs/1').status_code, 404)
+        response = self.client.get('/delete-record/eggs/1', follow_redirects=True)
+        self.assertIn(b'Invalid model.', response.data)
+
+    def test_edit_form_loads_only_edited_columns(self):
+        """Test that the edit modal is rendered from the form's columns only."""
+        response = self.client.get(f'/edit/inventory/{self.inventory_id}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'value="PO-1"', response.data)
+        record = RECORD_TYPES['inventory'].load(self.inventory_id)
+        self.assertNotIn('created_by_username', record.__dict__)
+
+    def test_invalid_submission_is_rendered_with_errors(self):
+        """Test that an invalid form is returned without touching the record."""
+        response = self.client.post(f'/edit-record/flock/{self.flock_id}', data={'breed': ''})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'editForm', response.data)
+        self.assertEqual(db.session.get(Flock, self.flock_id).breed, 'Layer')
+
+    def test_postgresql_update_returns_previous_values(self):
+        """Test that on PostgreSQL the update reads the previous rollup attributes in the same statement."""
+        record_type = RECORD_TYPES['flock']
+        statement = record_type.update_statement([record_type.table.c.id == 1], {'breed': 'Broiler'}, 'postgresql')
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+
+        self.assertIn('FOR UPDATE) AS "old"', sql)
+        self.assertIn('RETURNING "old".entry_date, "old".breed', sql)
+
+
+class TestBulkRecordActions(unittest.TestCase):
+    """Unit tests for the bulk delete and bulk field update of a selection of records."""
+
+    def setUp(self):
+        """Set up a temporary database with an admin, a worker and a bad import of production records."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        admin = User(username='admin', email='admin@example.com', password='password')
+        admin.role = RoleEnum.ADMIN
+        worker = User(username='worker', email='worker@example.com', password='password')
+        db.session.add_all([admin, worker])
+        db.session.commit()
+        self.worker_id = worker.id
+        # A good week, then 60 rows imported for the wrong month
+        for day in range(1, 8):
+            db.session.add(Production(number_eggs_collected=30, eggs_sold=10, date_collected=datetime(2024, 3, day)))
+        for index in range(60):
+            db.session.add(Production(number_eggs_collected=999, eggs_sold=0, user_id=worker.id,
+                                      date_collected=datetime(2024, 5, 1 + index % 20, 6)))
+        db.session.commit()
+        user_cache.clear()
+        response_cache.backend.clear()
+        self.client = self.app.test_client()
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(admin.id)
+        db.session.remove()
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        response_cache.backend.clear()
+        user_cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def assert_rollups_consistent(self):
+        """Check that the incrementally maintained rollup matches a rebuild from the records."""
+        incremental = sorted((row.day, row.records, row.eggs_collected, row.eggs_sold)
+                             for row in DailyProduction.query.all())
+        rebuild_rollups()
+        rebuilt = sorted((row.day, row.records, row.eggs_collected, row.eggs_sold)
+                         for row in DailyProduction.query.all())
+        db.session.rollback()
+        self.assertEqual(incremental, rebuilt)
+
+    def test_preview_counts_without_changing(self):
+        """Test that the preview reports the size of the selection."""
+        selection = {'scope': 'filtered', 'action': 'delete', 'from': '2024-05-01', 'to': '2024-05-31'}
+        response = self.client.post('/bulk/production/preview', data=selection)
+
+        self.assertEqual(response.get_json(), {'model': 'production', 'count': 60})
+        self.assertEqual(Production.query.count(), 67)
+        self.assertEqual(self.client.post('/bulk/production/preview', data={
+            'scope': 'selected', 'action': 'delete', 'ids': '1,2,3'}).get_json()['count'], 3)
+
+    def test_bulk_delete_by_filter(self):
+        """Test that a filtered selection is deleted with one statement and the rollups follow."""
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = self.client.post('/bulk/production', data={
+                'scope': 'filtered', 'action': 'delete', 'worker': self.worker_id, 'expected': 60})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(f'/view-production?worker={self.worker_id}', response.location)
+        deletes = [statement for statement in statements if statement.startswith('DELETE FROM production')]
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(Production.query.count(), 7)
+        self.assertIsNone(db.session.get(DailyProduction, date(2024, 5, 1)))
+        self.assert_rollups_consistent()
+
+    def test_bulk_delete_by_ids(self):
+        """Test that only the checked rows are deleted."""
+        ids = [record.id for record in Production.query.filter(Production.number_eggs_collected == 30).limit(2)]
+        response = self.client.post('/bulk/production', data={'scope': 'selected', 'action': 'delete',
+                                                              'ids': [str(record_id) for record_id in ids]},
+                                    follow_redirects=True)
+
+        self.assertIn(b'2 production records deleted.', response.data)
+        self.assertEqual(Production.query.count(), 65)
+        self.assert_rollups_consistent()
+
+    def test_bulk_update_sets_field(self):
+        """Test that one field is set across the selection and the rollups follow."""
+        response = self.client.post('/bulk/production', data={
+            'scope': 'filtered', 'action': 'update', 'from': '2024-05-01', 'field': 'date_collected',
+            'value': '2024-03-01'}, follow_redirects=True)
+
+        self.assertIn(b'60 production records updated.', response.data)
+        self.assertEqual(Production.query.filter(Production.date_collected >= datetime(2024, 4, 1)).count(), 0)
+        moved = db.session.get(DailyProduction, date(2024, 3, 1))
+        self.assertEqual((moved.records, moved.eggs_collected), (61, 30 + 60 * 999))
+        self.assert_rollups_consistent()
+
+    def test_stale_preview_changes_nothing(self):
+        """Test that the action is rolled back when the selection no longer matches the preview."""
+        response = self.client.post('/bulk/production', data={
+            'scope': 'filtered', 'action': 'delete', 'from': '2024-05-01', 'expected': 59}, follow_redirects=True)
+
+        self.assertIn(b'nothing was changed', response.data)
+        self.assertEqual(Production.query.count(), 67)
+        self.assert_rollups_consistent()
+
+    def test_rejected_selections_and_values(self):
+        """Test that empty selections, invalid values and unknown fields change nothing."""
+        response = self.client.post('/bulk/production/preview', data={'scope': 'filtered', 'action': 'delete'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Select some records', response.get_json()['error'])
+
+        response = self.client.post('/bulk/production', data={
+            'scope': 'filtered', 'action': 'update', 'from': '2024-05-01', 'field': 'eggs_sold', 'value': '-4'},
+            follow_redirects=True)
+        self.assertIn(b'Invalid value', response.data)
+        response = self.client.post('/bulk/production', data={
+            'scope': 'filtered', 'action': 'update', 'from': '2024-05-01', 'field': 'user_id', 'value': '1'},
+            follow_redirects=True)
+        self.assertIn(b'user_id cannot be edited.', response.data)
+        self.assertEqual(Production.query.filter_by(eggs_sold=0).count(), 60)
+        self.assertEqual(self.client.post('/bulk/eggs', data={'scope': 'selected', 'ids': '1'}).status_code, 404)
+
+    def test_bulk_form_renders(self):
+        """Test that the modal form carries the listing filters and the editable fields."""
+        response = self.client.get('/bulk/flock?category=Layer')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'name="category" value="Layer"', response.data)
+        self.assertIn(b'<option value="entry_date">Date Entered</option>', response.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
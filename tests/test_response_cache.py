@@ -0,0 +1,115 @@
+import io
+import unittest
+from datetime import datetime
+from sqlalchemy import event
+from poultry_manager import db, create_app
+from poultry_manager.models.user import User, RoleEnum, user_cache
+from poultry_manager.models.production import Production
+from poultry_manager.services.bulk_import import import_stream
+from poultry_manager.services.response_cache import response_cache, MemoryCache
+
+
+class TestResponseCache(unittest.TestCase):
+    """Unit tests for the generation-keyed response cache."""
+
+    def setUp(self):
+        """Set up a temporary database with an admin and one production record."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        # Each request gets its own app context (and session), as in production
+        with self.app.app_context():
+            db.create_all()
+            admin = User(username='admin', email='admin@example.com', password='password')
+            admin.role = RoleEnum.ADMIN
+            db.session.add(admin)
+            db.session.add(Production(number_eggs_collected=30, date_collected=datetime(2024, 3, 1)))
+            db.session.commit()
+            self.admin_id = admin.id
+            self.engine = db.engine
+        user_cache.clear()
+        response_cache.backend.clear()
+        self.client = self.app.test_client()
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.admin_id)
+
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+        response_cache.backend.clear()
+        user_cache.clear()
+        with self.app.app_context():
+            db.drop_all()
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        """Remember every statement sent to the database."""
+        self.statements.append(statement)
+
+    def _rollup_reads(self):
+        """Count the statements that read the production rollup."""
+        return sum(1 for statement in self.statements if 'FROM rollup_daily_production' in statement)
+
+    def test_chart_response_is_cached_until_a_write(self):
+        """Test that repeated chart requests skip the aggregation until production changes."""
+        first = self.client.get('/api/production-data')
+        second = self.client.get('/api/production-data')
+
+        self.assertEqual(first.get_json(), second.get_json())
+        self.assertEqual(self._rollup_reads(), 1)
+        self.assertEqual(second.headers['Cache-Control'], 'private, no-cache')
+
+        with self.app.app_context():
+            db.session.add(Production(number_eggs_collected=20, date_collected=datetime(2024, 3, 1)))
+            db.session.commit()
+        third = self.client.get('/api/production-data')
+
+        self.assertEqual(self._rollup_reads(), 2)
+        self.assertEqual(third.get_json()['data'], [50])
+
+    def test_query_arguments_are_part_of_the_key(self):
+        """Test that different chart parameters are cached separately."""
+        self.client.get('/api/production-data?bucket=day')
+        monthly = self.client.get('/api/production-data?bucket=month')
+
+        self.assertEqual(monthly.get_json()['bucket'], 'month')
+        self.assertEqual(self._rollup_reads(), 2)
+
+    def test_etag_revalidation(self):
+        """Test that an unchanged chart or page answers If-None-Match with 304."""
+        for url in ('/api/production-data', '/view-production'):
+            with self.subTest(url):
+                etag = self.client.get(url).headers['ETag']
+                revalidated = self.client.get(url, headers={'If-None-Match': etag})
+                self.assertEqual(revalidated.status_code, 304)
+
+                with self.app.app_context():
+                    record = Production.query.first()
+                    record.eggs_sold = record.eggs_sold + 1
+                    db.session.commit()
+                self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 200)
+
+    def test_bulk_import_invalidates(self):
+        """Test that Core bulk inserts also change the generation."""
+        self.client.get('/api/production-data')
+        with self.app.app_context():
+            import_stream('production', io.StringIO('number_eggs_collected,date_collected\n5,2024-03-01\n'), 'csv')
+
+        self.assertEqual(self.client.get('/api/production-data').get_json()['data'], [35])
+
+    def test_memory_backend_evicts_least_recently_used(self):
+        """Test the LRU limit and TTL of the memory backend."""
+        backend = MemoryCache(maxsize=2)
+        backend.set('a', 1, 60)
+        backend.set('b', 2, 60)
+        backend.get('a')
+        backend.set('c', 3, 60)
+        self.assertEqual((backend.get('a'), backend.get('b'), backend.get('c')), (1, None, 3))
+
+        backend.set('expired', 4, 0)
+        self.assertIsNone(backend.get('expired'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+from datetime import datetime, date
+from poultry_manager import db, create_app
+from poultry_manager.models.flock import Flock
+from poultry_manager.models.health_record import HealthRecord
+from poultry_manager.models.production import Production
+from poultry_manager.models.rollup import DailyProduction, DailyFlockStock, DailySymptomCases
+from poultry_manager.services.rollups import rebuild_rollups
+
+
+def snapshot(model):
+    """Return the rows of a rollup table as comparable tuples."""
+    columns = model.__table__.columns
+    return sorted(tuple(getattr(row, column.key) for column in columns) for row in model.query.all())
+
+
+class TestRollups(unittest.TestCase):
+    """Unit tests for the incrementally maintained daily rollups."""
+
+    def setUp(self):
+        """Set up a temporary database and Flask test environment."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_insert_updates_daily_production(self):
+        """Test that added production records are summed into their day."""
+        db.session.add(Production(number_eggs_collected=30, eggs_sold=10, date_collected=datetime(2024, 3, 1, 8)))
+        db.session.add(Production(number_eggs_collected=20, date_collected=datetime(2024, 3, 1, 17)))
+        db.session.commit()
+
+        rollup = db.session.get(DailyProduction, date(2024, 3, 1))
+        self.assertEqual((rollup.records, rollup.eggs_collected, rollup.eggs_sold), (2, 50, 10))
+
+    def test_edit_moves_contribution(self):
+        """Test that editing a record's date and breed moves it between rollup rows."""
+        flock = Flock(breed='Layer', quantity=100, age=3, deaths=5, entry_date=datetime(2024, 3, 1))
+        db.session.add(flock)
+        db.session.commit()
+
+        layer_id = flock.breed_id
+
+        flock.breed = 'Broiler'
+        flock.entry_date = datetime(2024, 3, 2)
+        flock.sold = 15
+        db.session.commit()
+
+        self.assertNotEqual(flock.breed_id, layer_id)
+        self.assertIsNone(db.session.get(DailyFlockStock, (date(2024, 3, 1), layer_id)))
+        moved = db.session.get(DailyFlockStock, (date(2024, 3, 2), flock.breed_id))
+        self.assertEqual((moved.records, moved.quantity, moved.live_birds), (1, 100, 80))
+
+    def test_delete_removes_contribution(self):
+        """Test that deleting records decrements and finally removes the rollup row."""
+        first = HealthRecord(number_sick=2, symptom='Cough', medication_given='A', date_reported=datetime(2024, 3, 1))
+        second = HealthRecord(number_sick=3, symptom='Cough', medication_given='B', date_reported=datetime(2024, 3, 1))
+        db.session.add_all([first, second])
+        db.session.commit()
+        cough_id = first.symptom_id
+
+        db.session.delete(first)
+        db.session.commit()
+        remaining = db.session.get(DailySymptomCases, (date(2024, 3, 1), cough_id))
+        self.assertEqual((remaining.records, remaining.birds_sick), (1, 3))
+
+        db.session.delete(second)
+        db.session.commit()
+        self.assertIsNone(db.session.get(DailySymptomCases, (date(2024, 3, 1), cough_id)))
+
+    def test_rebuild_matches_incremental(self):
+        """Test that a rebuild from scratch reproduces the incrementally maintained rows."""
+        for day in range(1, 6):
+            db.session.add(Production(number_eggs_collected=day * 10, eggs_sold=day, date_collected=datetime(2024, 4, day)))
+            db.session.add(Flock(breed='Layer' if day % 2 else 'Broiler', quantity=50, age=1, deaths=day,
+                                 entry_date=datetime(2024, 4, day)))
+            db.session.add(HealthRecord(number_sick=day, symptom='Cough', medication_given='A',
+                                        date_reported=datetime(2024, 4, day)))
+        db.session.commit()
+        incremental = [snapshot(model) for model in (DailyProduction, DailyFlockStock, DailySymptomCases)]
+
+        runner = self.app.test_cli_runner()
+        result = runner.invoke(args=['rollups', 'rebuild'])
+        db.session.expire_all()
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('rollup_daily_production: 5 rows', result.output)
+        self.assertEqual([snapshot(model) for model in (DailyProduction, DailyFlockStock, DailySymptomCases)],
+                         incremental)
+        self.assertEqual(rebuild_rollups()['rollup_daily_flock_stock'], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import unittest
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from poultry_manager import db, create_app
+from poultry_manager.models.user import User, RoleEnum, user_cache
+from poultry_manager.models.flock import Flock
+from poultry_manager.models.health_record import HealthRecord
+from poultry_manager.models.inventory import Inventory
+from poultry_manager.services.records import RECORD_TYPES
+from poultry_manager.services.response_cache import response_cache
+from poultry_manager.services.search import SOURCES, search, search_terms, suggest
+
+
+class TestSearch(unittest.TestCase):
+    """Unit tests for the full-text search over health records, flocks and inventory."""
+
+    def setUp(self):
+        """Set up a temporary database with an admin and records of every searchable type."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        admin = User(username='admin', email='admin@example.com', password='password')
+        admin.role = RoleEnum.ADMIN
+        db.session.add(admin)
+        db.session.add_all([
+            HealthRecord(number_sick=4, symptom='Coccidiosis', medication_given='Amprolium',
+                         date_reported=datetime(2024, 3, 1)),
+            HealthRecord(number_sick=2, symptom='Bloody droppings, suspected coccidiosis',
+                         medication_given='Toltrazuril', date_reported=datetime(2024, 3, 5)),
+            HealthRecord(number_sick=1, symptom='Cough', medication_given='Tylosin', date_reported=datetime(2024, 3, 2)),
+            Flock(breed='Rhode Island Red', quantity=100, age=20, entry_date=datetime(2024, 3, 1)),
+            Inventory(item_name='Coccidiostat feed', category='Supplies', quantity=5, unit='bags', cost=20.0,
+                      currency='USD', purchase_order_number='PO-2024-017', purchase_date=datetime(2024, 3, 3)),
+        ])
+        db.session.commit()
+        self.admin_id = admin.id
+        user_cache.clear()
+        response_cache.backend.clear()
+        self.client = self.app.test_client()
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(admin.id)
+        db.session.remove()
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        response_cache.backend.clear()
+        user_cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def titles(self, query, **kwargs):
+        """Return the titles of the results of a search, best first."""
+        return [row.title for row in search(query, **kwargs).items]
+
+    def test_prefix_search_ranks_across_types(self):
+        """Test that words match as prefixes in every record type and exact matches rank first."""
+        self.assertEqual(self.titles('coccidiosis'), ['Coccidiosis', 'Bloody droppings, suspected coccidiosis'])
+        self.assertEqual(set(self.titles('cocc')),
+                         {'Coccidiosis', 'Bloody droppings, suspected coccidiosis', 'Coccidiostat feed'})
+        self.assertEqual(self.titles('cocc', kinds=['inventory']), ['Coccidiostat feed'])
+        self.assertEqual(self.titles('rhode red'), ['Rhode Island Red'])
+        self.assertEqual(self.titles('po 2024 017'), ['Coccidiostat feed'])
+        self.assertEqual(self.titles('tylo'), ['Cough'])
+
+    def test_query_syntax_is_not_interpreted(self):
+        """Test that operators and quotes in the search string are treated as word separators."""
+        self.assertEqual(search_terms('"cocc" OR * -(tylo:*)'), ['cocc', 'or', 'tylo'])
+        self.assertEqual(self.titles('cocc" NEAR('), [])
+        self.assertEqual(self.titles('   '), [])
+
+    def test_results_are_paginated(self):
+        """Test that pages are consecutive slices of the ranked results."""
+        first = search('cocc', per_page=2)
+        second = search('cocc', page=2, per_page=2)
+
+        self.assertTrue(first.has_next)
+        self.assertFalse(second.has_next)
+        self.assertTrue(second.has_prev)
+        self.assertEqual(len(first.items) + len(second.items), 3)
+        self.assertFalse({row.id for row in first.items if row.kind == 'health_record'}
+                         & {row.id for row in second.items if row.kind == 'health_record'})
+
+    def test_index_follows_writes(self):
+        """Test that ORM edits, set-based edits and deletes are reflected in the results."""
+        record = db.session.execute(db.select(HealthRecord).filter_by(symptom='Cough')).scalar_one()
+        record.symptom = 'Coryza'
+        db.session.commit()
+        self.assertEqual(self.titles('coryza'), ['Coryza'])
+        self.assertEqual(self.titles('cough'), [])
+
+        record_type = RECORD_TYPES['health_record']
+        record_type.update(record.id, {'medication_given': 'Erythromycin'})
+        db.session.commit()
+        self.assertEqual(self.titles('erythro'), ['Coryza'])
+        self.assertEqual(self.titles('tylo'), [])
+
+        record_type.delete_where([record_type.table.c.symptom.like('%occidiosis')])
+        db.session.commit()
+        self.assertEqual(self.titles('cocc'), ['Coccidiostat feed'])
+
+    def test_sqlite_search_uses_fts_table(self):
+        """Test that SQLite matches through the FTS5 index rather than scanning the records."""
+        plan = db.session.execute(text(
+            "EXPLAIN QUERY PLAN SELECT rowid FROM health_records_search WHERE health_records_search MATCH 'cocc*'"
+        )).all()
+
+        self.assertTrue(any('VIRTUAL TABLE INDEX' in row[-1] for row in plan))
+
+    def test_suggest_offers_matching_values(self):
+        """Test that suggestions are distinct values containing a word starting with the last term."""
+        self.assertEqual(suggest('tyl'), ['Tylosin'])
+        self.assertIn('Coccidiosis', suggest('cocc'))
+        self.assertIn('Coccidiostat feed', suggest('cocc'))
+        self.assertEqual(suggest(''), [])
+
+    def test_postgresql_query_matches_index(self):
+        """Test that the PostgreSQL query repeats the expression of its GIN index."""
+        source = SOURCES['health_record']
+        sql = str(source.select_matches('postgresql', ['cocc']).compile(
+            dialect=postgresql.dialect(), compile_kwargs={'render_postcompile': True}))
+
+        self.assertIn("USING gin (to_tsvector('simple', coalesce(symptom, '') || ' ' || "
+                      "coalesce(medication_given, '')))", source.postgresql_ddl())
+        self.assertIn("to_tsvector('simple', (coalesce(health_records.symptom, '') || ' ') || "
+                      "coalesce(health_records.medication_given, '')) @@ to_tsquery('simple', ", sql)
+
+    def test_search_endpoints(self):
+        """Test the search page, the JSON API and the typeahead endpoint."""
+        page = self.client.get('/search?q=cocc&kind=health_record')
+        self.assertEqual(page.status_code, 200)
+        self.assertIn(b'Bloody droppings, suspected coccidiosis', page.data)
+        self.assertNotIn(b'Coccidiostat feed', page.data)
+
+        data = self.client.get('/api/search?q=cocc&per_page=1').get_json()
+        self.assertEqual(data['query'], 'cocc')
+        self.assertEqual(len(data['items']), 1)
+        self.assertTrue(data['has_next'])
+        self.assertEqual(set(data['items'][0]), {'kind', 'id', 'title', 'detail', 'date', 'entered_by', 'rank'})
+
+        suggestions = self.client.get('/api/search/suggest?q=amp').get_json()
+        self.assertEqual(suggestions, {'query': 'amp', 'suggestions': ['Amprolium']})
+
+    def test_search_requires_admin(self):
+        """Test that workers cannot search records."""
+        with self.app.app_context():
+            worker = User(username='worker', email='worker@example.com', password='password')
+            db.session.add(worker)
+            db.session.commit()
+            worker_id = worker.id
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(worker_id)
+
+        self.assertNotEqual(self.client.get('/api/search?q=cocc').status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
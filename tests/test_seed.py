@@ -0,0 +1,39 @@
+import unittest
+from poultry_manager import db, create_app
+from poultry_manager.models.dimension import Breed
+from poultry_manager.models.flock import Flock
+from poultry_manager.models.health_record import HealthRecord
+from poultry_manager.models.inventory import Inventory
+from poultry_manager.models.production import Production
+from benchmarks.seed import seed_database, WORKERS
+
+
+class TestSeed(unittest.TestCase):
+    """Smoke test for the benchmark seeder, so schema changes cannot silently break the benchmarks."""
+
+    def setUp(self):
+        """Set up a temporary database and Flask test environment."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_seed_database(self):
+        """Test that every record table is seeded and the dimension rows are linked."""
+        users = seed_database(rows=30, days=10)
+
+        self.assertEqual(len(users), WORKERS + 1)
+        for model in (Production, Flock, HealthRecord, Inventory):
+            self.assertEqual(model.query.count(), 30)
+        self.assertEqual(sum(breed.records for breed in Breed.query.all()), 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
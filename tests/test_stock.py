@@ -0,0 +1,230 @@
+import io
+import unittest
+from datetime import datetime, date
+from poultry_manager import db, create_app
+from poultry_manager.models.user import User, RoleEnum, user_cache
+from poultry_manager.models.inventory import Inventory
+from poultry_manager.models.stock import StockItem, StockMovement, StockLot
+from poultry_manager.services.bulk_import import import_stream
+from poultry_manager.services.records import RECORD_TYPES
+from poultry_manager.services.response_cache import response_cache
+from poultry_manager.services.stock import InsufficientStock, post, history, balance_as_of
+
+
+class TestStock(unittest.TestCase):
+    """Unit tests for the inventory stock ledger."""
+
+    def setUp(self):
+        """Set up a temporary database with an admin and two purchases of one item."""
+        self.app = create_app('testing')
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        admin = User(username='admin', email='admin@example.com', password='password')
+        admin.role = RoleEnum.ADMIN
+        db.session.add(admin)
+        db.session.add(Inventory(item_name='Layer feed', category='Supplies', quantity=10, unit='bags', cost=20.0,
+                                 currency='USD', purchase_date=datetime(2024, 3, 1)))
+        db.session.commit()
+        db.session.add(Inventory(item_name='layer Feed ', category='Supplies', quantity=5, unit='bag', cost=26.0,
+                                 currency='USD', purchase_date=datetime(2024, 3, 2)))
+        db.session.commit()
+        self.item_id = StockItem.query.one().id
+        self.admin_id = admin.id
+        user_cache.clear()
+        response_cache.backend.clear()
+        self.client = self.app.test_client()
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(admin.id)
+
+    def tearDown(self):
+        """Tear down the temporary database."""
+        response_cache.backend.clear()
+        user_cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def item(self):
+        """Reload the stock item."""
+        db.session.expire_all()
+        return db.session.get(StockItem, self.item_id)
+
+    def post(self, *entries):
+        """Post entries to the item's ledger and commit."""
+        ids = post(db.session.connection(), self.item_id, list(entries))
+        db.session.commit()
+        return ids
+
+    def test_purchases_are_posted(self):
+        """Test that inventory purchases of one item open lots and add to its balance."""
+        item = self.item()
+        self.assertEqual((item.name, item.unit_label, item.on_hand), ('Layer feed', 'bags', 15))
+        self.assertEqual((item.fifo_value, item.average_value), (330.0, 330.0))
+        self.assertAlmostEqual(item.average_cost, 22.0)
+        self.assertEqual([(lot.unit_cost, lot.remaining) for lot in StockLot.query.order_by(StockLot.id)],
+                         [(20.0, 10), (26.0, 5)])
+        self.assertEqual([movement.on_hand for movement in history(self.item_id)], [15, 10])
+
+    def test_purchases_are_dated_when_posted(self):
+        """Test that backdated purchases are posted at the posting time and keep their purchase date."""
+        movements = history(self.item_id)
+        self.assertEqual([movement.purchase_date for movement in movements],
+                         [datetime(2024, 3, 2), datetime(2024, 3, 1)])
+        self.assertTrue(all(movement.occurred_at > datetime(2024, 3, 2) for movement in movements))
+        self.assertEqual(history(self.item_id, date_to=date(2024, 3, 5)), [])
+        self.assertEqual(balance_as_of(self.item_id, datetime(2024, 3, 5))['on_hand'], 0)
+
+    def test_consumption_is_valued_fifo_and_average(self):
+        """Test that issued stock consumes the oldest lots and is valued at the average cost as well."""
+        self.post({'kind': 'consumption', 'quantity': -12})
+
+        item = self.item()
+        self.assertEqual(item.on_hand, 3)
+        self.assertEqual(item.fifo_value, 78.0)
+        self.assertEqual(item.average_value, 66.0)
+        self.assertEqual([(lot.unit_cost, lot.remaining) for lot in StockLot.query.all()], [(26.0, 3)])
+        movement = history(self.item_id, limit=1)[0]
+        self.assertEqual((movement.quantity, movement.fifo_value, movement.average_value), (-12, -252.0, -264.0))
+        self.assertEqual(movement.unit_cost, 21.0)
+
+        self.post({'kind': 'consumption', 'quantity': -3})
+        item = self.item()
+        self.assertEqual((item.on_hand, item.fifo_value, item.average_value), (0, 0.0, 0.0))
+        self.assertEqual(StockLot.query.count(), 0)
+
+    def test_insufficient_stock_is_rejected(self):
+        """Test that issuing more than is on hand writes nothing."""
+        with self.assertRaises(InsufficientStock):
+            self.post({'kind': 'consumption', 'quantity': -5}, {'kind': 'consumption', 'quantity': -11})
+        db.session.rollback()
+
+        self.assertEqual(self.item().on_hand, 15)
+        self.assertEqual(StockMovement.query.count(), 2)
+        with self.assertRaises(ValueError):
+            self.post({'kind': 'purchase', 'quantity': -1})
+
+    def test_adjustments(self):
+        """Test that positive adjustments default to the average cost and negative ones consume lots."""
+        self.post({'kind': 'adjustment', 'quantity': 5, 'note': 'Recount'})
+        item = self.item()
+        self.assertEqual((item.on_hand, item.average_value), (20, 440.0))
+        self.assertEqual(StockLot.query.order_by(StockLot.id.desc()).first().unit_cost, 22.0)
+
+        self.post({'kind': 'adjustment', 'quantity': -10, 'note': 'Spoiled'})
+        item = self.item()
+        self.assertEqual((item.on_hand, item.fifo_value), (10, 240.0))
+        self.assertEqual(history(self.item_id, limit=1)[0].note, 'Spoiled')
+
+    def test_history_and_balance_as_of(self):
+        """Test date range history and the balance at a past moment."""
+        first, = self.post({'kind': 'consumption', 'quantity': -4})
+        db.session.execute(db.update(StockMovement).where(StockMovement.id == first)
+                           .values(occurred_at=datetime(2030, 1, 10, 8)))
+        self.post({'kind': 'consumption', 'quantity': -1, 'occurred_at': datetime(2030, 1, 12, 8)})
+
+        self.assertEqual([movement.quantity for movement in history(self.item_id, date_from=date(2030, 1, 10))],
+                         [-1, -4])
+        self.assertEqual([movement.quantity for movement in history(self.item_id, date_from=date(2030, 1, 10),
+                                                                    date_to=date(2030, 1, 10))], [-4])
+        self.assertEqual(balance_as_of(self.item_id, datetime(2030, 1, 11))['on_hand'], 11)
+        self.assertEqual(balance_as_of(self.item_id, datetime(2030, 1, 12, 9)),
+                         {'on_hand': 10, 'fifo_value': 230.0, 'average_value': 220.0})
+        self.assertEqual(balance_as_of(self.item_id, datetime(2000, 1, 1))['on_hand'], 0)
+
+    def test_imported_purchases_are_posted(self):
+        """Test that bulk imported inventory is posted, creating items for new names."""
+        report = import_stream('inventory', io.StringIO(
+            'item_name,category,quantity,unit,cost,currency,purchase_date\n'
+            'Layer Feed,Supplies,5,bags,30,USD,2024-03-05\n'
+            'Vaccine,Supplies,2,vials,7.5,NGN,2024-03-05\n'), 'csv')
+        self.assertTrue(report.committed)
+
+        self.assertEqual(self.item().on_hand, 20)
+        vaccine = StockItem.query.filter_by(name='Vaccine').one()
+        self.assertEqual((vaccine.on_hand, vaccine.fifo_value, vaccine.currency), (2, 15.0, 'NGN'))
+        self.assertEqual({movement.inventory_id for movement in StockMovement.query.all()},
+                         {record.id for record in Inventory.query.all()})
+
+    def test_edits_post_corrections(self):
+        """Test that ORM, single-statement and bulk edits of purchases post compensating adjustments."""
+        first, second = Inventory.query.order_by(Inventory.id).all()
+        first.cost = 30.0
+        db.session.commit()
+        item = self.item()
+        self.assertEqual((item.on_hand, item.fifo_value), (15, 430.0))
+        self.assertEqual([(lot.unit_cost, lot.remaining) for lot in StockLot.query.order_by(StockLot.id)],
+                         [(26.0, 5), (30.0, 10)])
+        self.assertEqual([movement.quantity for movement in history(self.item_id, limit=2)], [-10, 10])
+
+        record_type = RECORD_TYPES['inventory']
+        record_type.update(second.id, {'quantity': 8})
+        db.session.commit()
+        self.assertEqual((self.item().on_hand, self.item().fifo_value), (18, 508.0))
+
+        record_type.update_where([Inventory.id == first.id], {'item_name': 'Grower feed'})
+        db.session.commit()
+        grower = StockItem.query.filter_by(name='Grower feed').one()
+        self.assertEqual((grower.on_hand, grower.fifo_value), (10, 300.0))
+        self.assertEqual((self.item().on_hand, self.item().fifo_value), (8, 208.0))
+
+        movements = StockMovement.query.count()
+        record_type.update(second.id, {'category': 'Livestock'})
+        db.session.commit()
+        self.assertEqual(StockMovement.query.count(), movements)
+
+    def test_deletes_post_corrections(self):
+        """Test that deleted purchases are reversed from their own lots."""
+        first, second = Inventory.query.order_by(Inventory.id).all()
+        RECORD_TYPES['inventory'].delete(second.id)
+        db.session.commit()
+        self.assertEqual((self.item().on_hand, self.item().fifo_value), (10, 200.0))
+
+        db.session.delete(db.session.get(Inventory, first.id))
+        db.session.commit()
+        self.assertEqual((self.item().on_hand, self.item().fifo_value), (0, 0.0))
+        self.assertEqual(StockLot.query.count(), 0)
+
+    def test_corrections_of_consumed_purchases(self):
+        """Test that corrections removing stock already issued are rejected and others are posted."""
+        first_id = Inventory.query.order_by(Inventory.id).first().id
+        self.post({'kind': 'consumption', 'quantity': -12})
+
+        self.client.get(f'/delete-record/inventory/{first_id}')
+        self.assertIsNotNone(db.session.get(Inventory, first_id))
+        self.assertEqual(self.client.delete(f'/api/v1/inventory/{first_id}').status_code, 409)
+        self.assertEqual(self.client.patch(f'/api/v1/inventory/{first_id}', json={'quantity': 1}).status_code, 409)
+        self.assertEqual(self.item().on_hand, 3)
+
+        # A cost correction receives the new lot before reversing, so only the net change must be on hand
+        self.assertEqual(self.client.patch(f'/api/v1/inventory/{first_id}', json={'cost': 30}).status_code, 200)
+        item = self.item()
+        self.assertEqual((item.on_hand, item.fifo_value), (3, 90.0))
+
+    def test_routes(self):
+        """Test the stock pages, the movement form and the JSON endpoints."""
+        page = self.client.get('/stock')
+        self.assertEqual(page.status_code, 200)
+        self.assertIn(b'Layer feed', page.data)
+
+        response = self.client.post(f'/stock/{self.item_id}/movements',
+                                    data={'kind': 'consumption', 'quantity': 3, 'note': 'Morning feed'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.item().on_hand, 12)
+        self.assertEqual(history(self.item_id, limit=1)[0].created_by_username, 'admin')
+
+        self.client.post(f'/stock/{self.item_id}/movements', data={'kind': 'consumption', 'quantity': 50})
+        self.assertEqual(self.item().on_hand, 12)
+
+        data = self.client.get('/api/stock').get_json()
+        self.assertEqual([item['on_hand'] for item in data['items']], [12])
+        data = self.client.get(f'/api/stock/{self.item_id}/movements?limit=2').get_json()
+        self.assertEqual([movement['quantity'] for movement in data['movements']], [-3, 5])
+        self.assertIn(b'Morning feed', self.client.get(f'/stock/{self.item_id}').data)
+        self.assertEqual(self.client.get('/stock/999').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,7 +10,7 @@ class TestUserModel(unittest.TestCase):
         """
         Set up a temporary database and Flask test environment.
         """
-        self.app = create_app()
+        self.app = create_app('testing')
         self.app.config['TESTING'] = True
         self.app_context = self.app.app_context()
         self.app_context.push()